@@ -6,7 +6,39 @@ from bench.run import run
 
 if __name__ == "__main__":
     try:
-        asyncio.run(run(output_dir=os.getenv("OUTPUT_DIR")))
+        asyncio.run(run(
+            output_dir=os.getenv("OUTPUT_DIR"),
+            fake_apiserver=os.getenv("FAKE_APISERVER", "") not in ("", "0", "false"),
+            fake_apiserver_latency=float(os.getenv("FAKE_APISERVER_LATENCY", "0")),
+            fake_apiserver_tls=os.getenv("FAKE_APISERVER_TLS", "") not in ("", "0", "false"),
+            benchmark_size=int(os.getenv("BENCHMARK_SIZE", "5000")),
+            warmup=int(os.getenv("WARMUP", "0")),
+            trials=int(os.getenv("TRIALS", "1")),
+            sweep=[int(c) for c in os.getenv("CONCURRENCY_SWEEP", "").split(",") if c.strip()] or None,
+            shards=[int(k) for k in os.getenv("SHARDS", "").split(",") if k.strip()] or None,
+            thread_sweep=[int(t) for t in os.getenv("THREAD_SWEEP", "").split(",") if t.strip()] or None,
+            size_sweep=[int(s) for s in os.getenv("SIZE_SWEEP", "").split(",") if s.strip()] or None,
+            payload_size=int(os.getenv("PAYLOAD_SIZE", "0")) or None,
+            churn_rate=float(os.getenv("CHURN_RATE", "0")),
+            list_limits=[int(n) for n in os.environ["LIST_LIMITS"].split(",") if n.strip()]
+            if "LIST_LIMITS" in os.environ else None,
+            open_loop=[float(r) for r in os.getenv("OPEN_LOOP_RATES", "").split(",") if r.strip()] or None,
+            open_loop_duration=float(os.getenv("OPEN_LOOP_DURATION", "10")),
+            open_loop_ramp=float(os.getenv("OPEN_LOOP_RAMP", "2")),
+            faults=[f.strip() for f in os.getenv("FAULTS", "").split(",") if f.strip()] or None,
+            event_loops=[loop.strip() for loop in os.getenv("EVENT_LOOPS", "").split(",") if loop.strip()] or None,
+            codecs=[codec.strip() for codec in os.getenv("CODECS", "").split(",") if codec.strip()] or None,
+            transports=[t.strip() for t in os.getenv("TRANSPORTS", "").split(",") if t.strip()] or None,
+            calibrate=os.getenv("CALIBRATE", "") not in ("", "0", "false"),
+            verify=os.getenv("VERIFY", "") not in ("", "0", "false"),
+            cold_start=os.getenv("COLD_START", "") not in ("", "0", "false"),
+            isolate=os.getenv("ISOLATE", "") not in ("", "0", "false"),
+            track_memory=os.getenv("TRACK_MEMORY", "") not in ("", "0", "false"),
+            profile=os.getenv("PROFILE") or None,
+            profile_dir=os.getenv("PROFILE_DIR"),
+            results_dir=os.getenv("RESULTS_DIR"),
+            cpu_affinity=[int(c) for c in os.getenv("CPU_AFFINITY", "").split(",") if c.strip()] or None,
+        ))
     finally:
         print("A few clients just crashing their unclosed sessions (they want us to manage them). "
               "That's not our fault, benchmark results are not affected.")
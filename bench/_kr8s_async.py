@@ -1,84 +1,82 @@
 from __future__ import annotations
 
+import json
 import logging
 import os
+import importlib
 from dataclasses import dataclass
 from typing import Any, AsyncIterable
 
+import httpx
 from kr8s.asyncio import api
 from kr8s.asyncio.objects import Deployment
 
-from .benchmark import Benchmark
+from .benchmark import Benchmark, label_selector
+from .churn import WatchEvent
+from .codecs import CODECS, JsonModule, loads
+from .payloads import large_pod_template, update_patch
+
+# The module, not the `kr8s._api` attribute: that's the api() function of the same name
+_kr8s_api = importlib.import_module("kr8s._api")
 
 
 @dataclass
 class Kr8sAsyncBenchmark(Benchmark):
     client: str = "kr8s (async)"
+    distribution = "kr8s"
 
     api = None
+    _json_modules = None  # httpx's and kr8s' own json modules while a codec stands in for them
 
-    @staticmethod
-    def _large_pod_template(name: str) -> dict[str, Any]:
-        common_env = [{"name": f"ENV_{i}", "value": f"value_{i}"} for i in range(50)]
-
-        c1 = {
-            "name": "c1",
-            "image": "busybox:stable",
-            "command": ["/bin/sh", "-c"],
-            "args": ["sleep 3600"],
-            "env": common_env + [{"name": "C1_ONLY", "value": "x"}],
-            "volumeMounts": [{"name": "work", "mountPath": "/work"}],
-            "resources": {
-                "limits": {"cpu": "100m", "memory": "128Mi"},
-                "requests": {"cpu": "50m", "memory": "64Mi"},
-            },
-            "livenessProbe": {
-                "exec": {"command": ["/bin/true"]},
-                "initialDelaySeconds": 5,
-                "periodSeconds": 30,
-            },
-        }
-        c2 = {
-            "name": "c2",
-            "image": "busybox:stable",
-            "command": ["/bin/sh", "-c"],
-            "args": ["sleep 3600"],
-            "env": common_env + [{"name": "C2_ONLY", "value": "y"}],
-            "volumeMounts": [{"name": "work", "mountPath": "/data"}],
-            "resources": {
-                "limits": {"cpu": "100m", "memory": "128Mi"},
-                "requests": {"cpu": "50m", "memory": "64Mi"},
-            },
-        }
-        c3 = {
-            "name": "c3",
-            "image": "busybox:stable",
-            "command": ["/bin/sh", "-c"],
-            "args": ["sleep 3600"],
-            "env": [{"name": "IMPORTANT", "value": "bench_value"}] + common_env,
-            "volumeMounts": [{"name": "work", "mountPath": "/cache"}],
-        }
+    # No PUT or server-side apply, and patch() only speaks merge and JSON patches
+    updates = ("merge", "json")
+    # Objects wrap plain dicts, whatever decoded them
+    codecs = tuple(CODECS)
+    # httpx underneath, see init_client
+    transports = ("http1", "http2")
 
-        return {
-            "metadata": {"labels": {"app": name}},
-            "spec": {
-                "containers": [c1, c2, c3],
-                "volumes": [{"name": "work", "emptyDir": {}}],
-            },
-        }
+    def _large_pod_template(self, name: str, revision: int = 0) -> dict[str, Any]:
+        return large_pod_template(name, self.payload, revision)
 
     async def init_client(self):
         kubeconfig = os.getenv("KUBECONFIG")
         kwargs: dict[str, Any] = {}
         if kubeconfig:
             kwargs["kubeconfig"] = kubeconfig
+        if self.codec:
+            # Responses go through httpx's Response.json(), watch lines through kr8s' own json.loads. Process-wide,
+            # so close_client puts them back
+            if self._json_modules is None:
+                self._json_modules = httpx._models.jsonlib, _kr8s_api.json
+            httpx._models.jsonlib = _kr8s_api.json = JsonModule(self.codec)
         self.api = await api(**kwargs)
+        if self.transport:
+            # api() hands back the Api cached for this thread and loop, with whatever session the last transport
+            # left on it. A fresh one of kr8s' own (closing the old) is HTTP/1.1
+            await self.api._create_session()
+        if self.transport == "http2":
+            # kr8s builds its httpx session without http2, rebuild it the same way with it
+            session = self.api._session
+            self.api._session = httpx.AsyncClient(
+                base_url=session.base_url,
+                headers=session.headers,
+                verify=await self.api.auth.ssl_context(),
+                timeout=session.timeout,
+                follow_redirects=True,
+                http2=True,
+            )
+            await session.aclose()
 
         # Don't misbehave
         for name in ("lightkube", "lightkube.core", "httpx", "urllib3", "websockets"):
             logging.getLogger(name).setLevel(logging.WARNING)
 
-    async def create_one(self, name: str):
+    async def close_client(self):
+        if self._json_modules is not None:
+            httpx._models.jsonlib, _kr8s_api.json = self._json_modules
+            self._json_modules = None
+
+    def build_body(self, name: str, revision: int = 0) -> Deployment:
         body = {
             "apiVersion": "apps/v1",
             "kind": "Deployment",
@@ -90,10 +88,19 @@ class Kr8sAsyncBenchmark(Benchmark):
             "spec": {
                 "replicas": 0,
                 "selector": {"matchLabels": {"app": name}},
-                "template": self._large_pod_template(name),
+                "template": self._large_pod_template(name, revision),
             },
         }
-        dep = await Deployment(body, namespace=self.namespace)
+        # Wrapping into a Box-backed object is kr8s' model construction; the api is bound on await
+        return Deployment(body, namespace=self.namespace)
+
+    def serialize_body(self, body: Deployment) -> bytes: return json.dumps(body.raw_template).encode()
+
+    def deserialize_body(self, raw: bytes) -> Deployment:
+        return Deployment(loads(self.codec or "json")(raw), api=self.api)
+
+    async def create_one(self, name: str):
+        dep = await self.build_body(name)
         await dep.create()
         return dep
 
@@ -107,6 +114,40 @@ class Kr8sAsyncBenchmark(Benchmark):
         dep = await Deployment.get(name, namespace=self.namespace)
         await dep.delete()
 
+    async def delete_collection(self, labels: dict[str, str]):
+        # No collection delete on the objects API, same raw call it makes for a single one
+        async with self.api.call_api(
+            "DELETE", version=Deployment.version, url=Deployment.endpoint, namespace=self.namespace,
+            params={"labelSelector": label_selector(labels)},
+        ):
+            pass
+
     async def watch_all(self) -> AsyncIterable[Any]:
         async for dep in Deployment.list(namespace=self.namespace):
             yield dep
+
+    async def list_all(self, limit: int | None = None) -> AsyncIterable[Any]:
+        # Deployment.list always pages by 100, so follow the continue tokens ourselves, the way it does internally
+        params: dict[str, Any] = {"limit": limit} if limit else {}
+        while True:
+            async with self.api.call_api(
+                "GET", version=Deployment.version, url=Deployment.endpoint, namespace=self.namespace, params=params,
+            ) as resp:
+                page = resp.json()
+            for item in page["items"]:
+                yield Deployment(item, api=self.api)
+            if not (token := page["metadata"].get("continue")):
+                return
+            params["continue"] = token
+
+    async def annotate_one(self, name: str, annotations: dict[str, str]):
+        dep = Deployment({"metadata": {"name": name}}, namespace=self.namespace, api=self.api)
+        await dep.patch({"metadata": {"annotations": annotations}})
+
+    async def patch_one(self, name: str, patch_type: str, revision: int):
+        dep = Deployment({"metadata": {"name": name}}, namespace=self.namespace, api=self.api)
+        await dep.patch(update_patch(patch_type, name, revision, self.payload), type=patch_type)
+
+    async def watch_events(self) -> AsyncIterable[WatchEvent]:
+        async for event_type, dep in self.api.watch("deployments.apps", namespace=self.namespace):
+            yield WatchEvent(event_type, dep.name, dep.metadata.resourceVersion, dep.metadata.get("annotations"))
@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+import os
+import json
+from types import SimpleNamespace
 from dataclasses import dataclass
 from typing import Any, AsyncIterable
 
@@ -21,72 +24,64 @@ from kubernetes_asyncio.client import (
     V1ResourceRequirements,
 )
 
-from .benchmark import Benchmark
+from .benchmark import Benchmark, label_selector
+from .churn import WatchEvent
+from .payloads import FIELD_MANAGER, PATCH_CONTENT_TYPES, large_pod_template, reuse, update_patch
 
 
 @dataclass
 class KubernetesAsyncioBenchmark(Benchmark):
     client: str = "kubernetes_asyncio"
+    distribution = "kubernetes_asyncio"
+    updates = ("replace", "merge", "strategic", "json", "apply")
 
     api_client = None
     apps_client = None
 
-    @staticmethod
-    def _large_pod_template(name: str) -> V1PodTemplateSpec:
-        common = [V1EnvVar(name=f"ENV_{i}", value=f"value_{i}") for i in range(50)]
-        c1 = V1Container(
-            name="c1",
-            image="busybox:stable",
-            command=["/bin/sh", "-c"],
-            args=["sleep 3600"],
-            env=common + [V1EnvVar(name="C1_ONLY", value="x")],
-            volume_mounts=[V1VolumeMount(name="work", mount_path="/work")],
-            resources=V1ResourceRequirements(
-                limits={"cpu": "100m", "memory": "128Mi"},
-                requests={"cpu": "50m", "memory": "64Mi"},
-            ),
-            liveness_probe=V1Probe(
-                _exec=V1ExecAction(command=["/bin/true"]),
-                initial_delay_seconds=5,
-                period_seconds=30,
-            ),
-        )
-        c2 = V1Container(
-            name="c2",
-            image="busybox:stable",
-            command=["/bin/sh", "-c"],
-            args=["sleep 3600"],
-            env=common + [V1EnvVar(name="C2_ONLY", value="y")],
-            volume_mounts=[V1VolumeMount(name="work", mount_path="/data")],
-            resources=V1ResourceRequirements(
-                limits={"cpu": "100m", "memory": "128Mi"},
-                requests={"cpu": "50m", "memory": "64Mi"},
-            ),
-        )
-        c3 = V1Container(
-            name="c3",
-            image="busybox:stable",
-            command=["/bin/sh", "-c"],
-            args=["sleep 3600"],
-            env=[V1EnvVar(name="IMPORTANT", value="bench_value")] + common,
-            volume_mounts=[V1VolumeMount(name="work", mount_path="/cache")],
-        )
-        vols = [V1Volume(name="work", empty_dir=V1EmptyDirVolumeSource())]
+    def _large_pod_template(self, name: str, revision: int = 0) -> V1PodTemplateSpec:
+        tpl = large_pod_template(name, self.payload, revision)
+        env_var = reuse(lambda e: V1EnvVar(name=e["name"], value=e["value"]))
+        resources = reuse(lambda r: V1ResourceRequirements(limits=r["limits"], requests=r["requests"]))
+
+        containers = [
+            V1Container(
+                name=c["name"],
+                image=c["image"],
+                command=c["command"],
+                args=c["args"],
+                env=[env_var(e) for e in c["env"]],
+                volume_mounts=[V1VolumeMount(name=m["name"], mount_path=m["mountPath"]) for m in c["volumeMounts"]],
+                resources=resources(c["resources"]) if "resources" in c else None,
+                liveness_probe=V1Probe(
+                    _exec=V1ExecAction(command=p["exec"]["command"]),
+                    initial_delay_seconds=p["initialDelaySeconds"],
+                    period_seconds=p["periodSeconds"],
+                ) if (p := c.get("livenessProbe")) else None,
+            )
+            for c in tpl["spec"]["containers"]
+        ]
+        vols = [V1Volume(name=v["name"], empty_dir=V1EmptyDirVolumeSource()) for v in tpl["spec"]["volumes"]]
+        meta = tpl["metadata"]
         return V1PodTemplateSpec(
-            metadata=V1ObjectMeta(labels={"app": name}),
-            spec=V1PodSpec(containers=[c1, c2, c3], volumes=vols),
+            metadata=V1ObjectMeta(labels=meta["labels"], annotations=meta.get("annotations")),
+            spec=V1PodSpec(containers=containers, volumes=vols),
         )
 
     async def init_client(self):
         try:
-            await config.load_kube_config()
+            await config.load_kube_config(config_file=os.getenv("KUBECONFIG"))
         except Exception:
             config.load_incluster_config()
         self.api_client = client.ApiClient()
         self.apps_client = client.AppsV1Api(self.api_client)
 
-    async def create_one(self, name: str):
-        body = V1Deployment(
+    def init_models(self):
+        # Needs a running loop, the aiohttp connector is created right away
+        if self.api_client is None:
+            self.api_client = client.ApiClient()
+
+    def build_body(self, name: str, revision: int = 0) -> V1Deployment:
+        return V1Deployment(
             metadata=V1ObjectMeta(
                 name=name,
                 namespace=self.namespace,
@@ -95,9 +90,18 @@ class KubernetesAsyncioBenchmark(Benchmark):
             spec=V1DeploymentSpec(
                 replicas=0,
                 selector=V1LabelSelector(match_labels={"app": name}),
-                template=self._large_pod_template(name),
+                template=self._large_pod_template(name, revision),
             ),
         )
+
+    def serialize_body(self, body: V1Deployment) -> bytes:
+        return json.dumps(self.api_client.sanitize_for_serialization(body)).encode()
+
+    def deserialize_body(self, raw: bytes) -> V1Deployment:
+        return self.api_client.deserialize(SimpleNamespace(data=raw), "V1Deployment")
+
+    async def create_one(self, name: str):
+        body = self.build_body(name)
         return await self.apps_client.create_namespaced_deployment(namespace=self.namespace, body=body)
 
     async def get_one(self, name: str):
@@ -108,8 +112,49 @@ class KubernetesAsyncioBenchmark(Benchmark):
     async def delete_one(self, name: str):
         await self.apps_client.delete_namespaced_deployment(name=name, namespace=self.namespace)
 
+    async def delete_collection(self, labels: dict[str, str]):
+        await self.apps_client.delete_collection_namespaced_deployment(
+            namespace=self.namespace, label_selector=label_selector(labels))
+
     async def watch_all(self) -> AsyncIterable[Any]:
         watcher = watch.Watch()
         async for event in watcher.stream(self.apps_client.list_namespaced_deployment, namespace=self.namespace):
             deploy = event["object"]
             yield deploy
+
+    async def list_all(self, limit: int | None = None) -> AsyncIterable[Any]:
+        token = None
+        while True:
+            page = await self.apps_client.list_namespaced_deployment(
+                namespace=self.namespace, limit=limit, _continue=token)
+            for deploy in page.items:
+                yield deploy
+            if not (token := page.metadata._continue):
+                return
+
+    async def annotate_one(self, name: str, annotations: dict[str, str]):
+        return await self.apps_client.patch_namespaced_deployment(
+            name=name, namespace=self.namespace, body={"metadata": {"annotations": annotations}})
+
+    async def replace_one(self, name: str, revision: int):
+        return await self.apps_client.replace_namespaced_deployment(
+            name=name, namespace=self.namespace, body=self.build_body(name, revision))
+
+    async def patch_one(self, name: str, patch_type: str, revision: int):
+        return await self.apps_client.patch_namespaced_deployment(
+            name=name, namespace=self.namespace, body=update_patch(patch_type, name, revision, self.payload),
+            _content_type=PATCH_CONTENT_TYPES[patch_type])
+
+    async def apply_one(self, name: str, revision: int):
+        # Apply configurations must name their type, the generated models leave it out unless asked
+        body = self.build_body(name, revision)
+        body.api_version, body.kind = "apps/v1", "Deployment"
+        return await self.apps_client.patch_namespaced_deployment(
+            name=name, namespace=self.namespace, body=body, field_manager=FIELD_MANAGER, force=True,
+            _content_type=PATCH_CONTENT_TYPES["apply"])
+
+    async def watch_events(self) -> AsyncIterable[WatchEvent]:
+        watcher = watch.Watch()
+        async for event in watcher.stream(self.apps_client.list_namespaced_deployment, namespace=self.namespace):
+            meta = event["object"].metadata
+            yield WatchEvent(event["type"], meta.name, meta.resource_version, meta.annotations)
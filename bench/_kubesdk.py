@@ -1,4 +1,5 @@
 import time
+import json
 import asyncio
 import os
 from dataclasses import dataclass
@@ -8,76 +9,179 @@ from kube_models.apis_apps_v1.io.k8s.api.apps.v1 import *
 from kube_models.api_v1.io.k8s.apimachinery.pkg.apis.meta.v1 import *
 from kube_models.api_v1.io.k8s.api.core.v1 import Container
 
-from kubesdk.login import login
+from kubesdk.login import login, KubeConfig
 from kubesdk.client import *
+from kubesdk.path_picker import PathPicker
 
-from .benchmark import Benchmark
+from .benchmark import Benchmark, Teardown
+from .churn import WatchEvent
+from .payloads import PATCH_CONTENT_TYPES, large_pod_template, reuse, update_patch
+
+TEARDOWN_TIMEOUT = 60.0
 
 
 @dataclass
 class KubesdkBenchmark(Benchmark):
     client: str = "kubesdk"
+    distribution = "kubesdk"
+    # update_k8s_resource picks the patch type itself (strategic merge for Deployments), the others go through
+    # kubesdk's raw request API. There's no apply
+    updates = ("replace", "merge", "strategic", "json")
 
-    @staticmethod
-    def _large_pod_template(name: str) -> PodTemplateSpec:
-        common_env = [EnvVar(name=f"ENV_{i}", value=f"value_{i}") for i in range(50)]
-
-        c1 = Container(
-            name="c1",
-            image="busybox:stable",
-            command=["/bin/sh", "-c"],
-            args=["sleep 3600"],
-            env=common_env + [EnvVar(name="C1_ONLY", value="x")],
-            volumeMounts=[VolumeMount(name="work", mountPath="/work")],
-            resources=ResourceRequirements(limits={"cpu": "100m", "memory": "128Mi"}, requests={"cpu": "50m", "memory": "64Mi"}),
-            livenessProbe=Probe(exec=ExecAction(command=["/bin/true"]), initialDelaySeconds=5, periodSeconds=30),
-        )
-        c2 = Container(
-            name="c2",
-            image="busybox:stable",
-            command=["/bin/sh", "-c"],
-            args=["sleep 3600"],
-            env=common_env + [EnvVar(name="C2_ONLY", value="y")],
-            volumeMounts=[VolumeMount(name="work", mountPath="/data")],
-            resources=ResourceRequirements(limits={"cpu": "100m", "memory": "128Mi"}, requests={"cpu": "50m", "memory": "64Mi"}),
-        )
-        c3 = Container(
-            name="c3",
-            image="busybox:stable",
-            command=["/bin/sh", "-c"],
-            args=["sleep 3600"],
-            env=[EnvVar(name="IMPORTANT", value="bench_value")] + common_env,
-            volumeMounts=[VolumeMount(name="work", mountPath="/cache")],
-        )
-
-        vols = [Volume(name="work", emptyDir=EmptyDirVolumeSource())]
-
-        pod_spec = PodSpec(containers=[c1, c2, c3], volumes=vols)
-        labels = {"app": name}
-        return PodTemplateSpec(metadata=ObjectMeta(labels=labels), spec=pod_spec)
+    _built_from = None  # name -> Deployment the strategic patch phase diffs against
+
+    def _large_pod_template(self, name: str, revision: int = 0) -> PodTemplateSpec:
+        tpl = large_pod_template(name, self.payload, revision)
+        env_var = reuse(lambda e: EnvVar(name=e["name"], value=e["value"]))
+        resources = reuse(lambda r: ResourceRequirements(limits=r["limits"], requests=r["requests"]))
+
+        containers = [
+            Container(
+                name=c["name"],
+                image=c["image"],
+                command=c["command"],
+                args=c["args"],
+                env=[env_var(e) for e in c["env"]],
+                volumeMounts=[VolumeMount(name=m["name"], mountPath=m["mountPath"]) for m in c["volumeMounts"]],
+                resources=resources(c["resources"]) if "resources" in c else None,
+                livenessProbe=Probe(
+                    exec=ExecAction(command=p["exec"]["command"]),
+                    initialDelaySeconds=p["initialDelaySeconds"],
+                    periodSeconds=p["periodSeconds"]) if (p := c.get("livenessProbe")) else None,
+            )
+            for c in tpl["spec"]["containers"]
+        ]
+        vols = [Volume(name=v["name"], emptyDir=EmptyDirVolumeSource()) for v in tpl["spec"]["volumes"]]
+
+        pod_spec = PodSpec(containers=containers, volumes=vols)
+        meta = tpl["metadata"]
+        return PodTemplateSpec(metadata=ObjectMeta(labels=meta["labels"], annotations=meta.get("annotations")),
+                               spec=pod_spec)
+
+    def build_body(self, name: str, revision: int = 0) -> Deployment:
+        return Deployment(
+            metadata=ObjectMeta(name=name, namespace=self.namespace, labels=self.build_bench_labels(name)),
+            spec=DeploymentSpec(
+                replicas=0,
+                selector=LabelSelector(matchLabels={"app": name}),
+                template=self._large_pod_template(name, revision)))
+
+    # Same as kubesdk does on the wire: compact json.dumps of to_dict(), from_dict() of the decoded response
+    def serialize_body(self, body: Deployment) -> bytes:
+        return json.dumps(body.to_dict(), separators=(",", ":")).encode()
+
+    def deserialize_body(self, raw: bytes) -> Deployment: return Deployment.from_dict(json.loads(raw))
 
     async def create_one(self, name: str):
-        return await create_k8s_resource(
-            Deployment(
-                metadata=ObjectMeta(name=name, namespace=self.namespace, labels=self.build_bench_labels(name)),
-                spec=DeploymentSpec(
-                    replicas=0,
-                    selector=LabelSelector(matchLabels={"app": name}),
-                    template=self._large_pod_template(name))))
+        return await create_k8s_resource(self.build_body(name))
 
     async def get_one(self, name: str):
         deploy = await get_k8s_resource(Deployment, name, self.namespace)
         self.check_bench_labels(name, deploy.metadata.labels)
+        return deploy
 
     async def watch_all(self) -> AsyncIterable[Any]:
         async for event in watch_k8s_resources(Deployment, namespace=self.namespace):
             deploy = event.object
             yield deploy
 
+    async def list_all(self, limit: int | None = None) -> AsyncIterable[Any]:
+        token = None
+        while True:
+            page = await get_k8s_resource(
+                Deployment, namespace=self.namespace, params=K8sQueryParams(limit=limit, _continue=token))
+            for deploy in page.items:
+                yield deploy
+            if not (token := self._continue_token(page)):
+                return
+
+    @staticmethod
+    def _list_meta(page: DeploymentList) -> ListMeta:
+        # kube-models 0.0.x can't decode the `continue` key into ListMeta.continue_ (page.metadata fails, logs and
+        # hands back the dict the second time), so decode the page's raw metadata ourselves
+        raw = page._lazy_src.get("metadata") or {}
+        return ListMeta(continue_=raw.get("continue"), remainingItemCount=raw.get("remainingItemCount"),
+                        resourceVersion=raw.get("resourceVersion"), selfLink=raw.get("selfLink"))
+
+    def _continue_token(self, page: DeploymentList) -> str | None: return self._list_meta(page).continue_
+
+    async def annotate_one(self, name: str, annotations: dict[str, str]):
+        body = Deployment(metadata=ObjectMeta(name=name, namespace=self.namespace, annotations=annotations))
+        return await update_k8s_resource(body, paths=[PathPicker(["metadata", "annotations"])])
+
+    async def replace_one(self, name: str, revision: int):
+        return await update_k8s_resource(self.build_body(name, revision), force=True)
+
+    def prepare_update(self, update: str, revision: int):
+        # The objects as the previous update left them, built before the clock starts: kubesdk's diff is measured,
+        # building the old object to diff against isn't
+        self._built_from = {name: self.build_body(name, revision - 1) for name in self.all_objects_names} \
+            if update == "strategic" else None
+
+    async def patch_one(self, name: str, patch_type: str, revision: int):
+        if patch_type == "strategic":
+            # The kubesdk way: diff the new object against the one it was built from and send the strategic merge
+            # patch it computes
+            return await update_k8s_resource(self.build_body(name, revision), built_from_latest=self._built_from.pop(name))
+        url = f"/{Deployment.api_path_.format(namespace=self.namespace)}/{name}"
+        response = await rest_api_request(HTTPMethod.PATCH, url, update_patch(patch_type, name, revision, self.payload),
+                                          headers={"Content-Type": PATCH_CONTENT_TYPES[patch_type]})
+        return Deployment.from_dict(response)
+
+    async def watch_events(self) -> AsyncIterable[WatchEvent]:
+        async for event in watch_k8s_resources(Deployment, namespace=self.namespace):
+            meta = event.object.metadata
+            yield WatchEvent(event.type, meta.name, meta.resourceVersion, meta.annotations)
+
     async def init_client(self):
-        await login()
+        # kubesdk reads $KUBECONFIG at import time, so pick up one set later (e.g., by the fake apiserver)
+        kubeconfig = os.getenv("KUBECONFIG")
+        await login(KubeConfig(path=kubeconfig) if kubeconfig else None)
 
     async def delete_one(self, name: str): await delete_k8s_resource(Deployment, name, self.namespace)
 
+    async def delete_collection(self, labels: dict[str, str]):
+        await delete_k8s_resource(Deployment, namespace=self.namespace,
+                                  params=K8sQueryParams(labelSelector=QueryLabelSelector(matchLabels=labels)))
+
+    async def wait_until_empty(self, timeout: float = TEARDOWN_TIMEOUT) -> int:
+        """Return once there are no Deployments left in the namespace, with how many there were to wait for.
+
+        One LIST, then a watch from its resourceVersion that ticks names off as they're DELETED, so nothing is
+        missed between the two and there's no polling. Raises TimeoutError if objects are still there after `timeout`.
+        """
+        page = await get_k8s_resource(Deployment, namespace=self.namespace)
+        left = {deploy.metadata.name for deploy in page.items}
+        waiting = len(left)
+        if not left:
+            return 0
+        rv = self._list_meta(page).resourceVersion
+
+        async def drain():
+            params = K8sQueryParams(resourceVersion=rv)
+            async for event in watch_k8s_resources(Deployment, namespace=self.namespace, params=params):
+                if event.type == WatchEventType.ERROR:
+                    raise RuntimeError(f"Watch failed while waiting for an empty namespace: {event.object}")
+                if event.type == WatchEventType.DELETED:
+                    left.discard(event.object.metadata.name)
+                else:
+                    left.add(event.object.metadata.name)
+                if not left:
+                    return
+
+        try:
+            await asyncio.wait_for(drain(), timeout)
+        except TimeoutError:
+            raise TimeoutError(f"{len(left)} Deployments still in {self.namespace} after {timeout}s, "
+                               f"e.g. {sorted(left)[:5]}") from None
+        return waiting
+
+    async def empty_namespace(self) -> Teardown:
+        """Delete whatever is left in the namespace and wait until it's verifiably gone."""
+        t0 = time.perf_counter()
+        await self.cleanup()
+        waited = await self.wait_until_empty()
+        return Teardown(time.perf_counter() - t0, waited)
+
     # We use this to have clean namespace in the beginning
     async def cleanup(self): await delete_k8s_resource(Deployment, namespace=self.namespace)
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import os
+import json
 import tempfile
 import logging
 from pathlib import Path
@@ -9,6 +10,7 @@ from typing import Any, AsyncIterable, Optional
 
 import yaml
 from lightkube import AsyncClient, ApiError
+from lightkube.types import PatchType
 from lightkube.resources.apps_v1 import Deployment
 from lightkube.models.meta_v1 import ObjectMeta, LabelSelector
 from lightkube.models.apps_v1 import DeploymentSpec
@@ -25,7 +27,9 @@ from lightkube.models.core_v1 import (
     ResourceRequirements,
 )
 
-from .benchmark import Benchmark
+from .benchmark import Benchmark, label_selector
+from .churn import WatchEvent
+from .payloads import FIELD_MANAGER, large_pod_template, reuse, update_patch
 
 
 # We do this stuff ONLY to skip TLS without breaking our normal config
@@ -77,7 +81,8 @@ def _build_client(
     insecure_skip_tls_verify: bool,
     trust_env: bool = True,
     verify_path: Optional[str] = None,
-    kubeconfig: Optional[str] = None
+    kubeconfig: Optional[str] = None,
+    http2: bool = False,
 ) -> AsyncClient:
     # Prepare a patched kubeconfig to avoid CA file permission issues on Windows
     patched = _patch_kubeconfig_file(
@@ -87,64 +92,50 @@ def _build_client(
     )
     if patched:
         os.environ["KUBECONFIG"] = patched
-    return AsyncClient(namespace=namespace, trust_env=trust_env)
+    return AsyncClient(namespace=namespace, trust_env=trust_env, http2=http2)
 
 
 @dataclass
 class LightkubeAsyncBenchmark(Benchmark):
     client: str = "lightkube (async)"
+    distribution = "lightkube"
+    updates = ("replace", "merge", "strategic", "json", "apply")
+    # httpx negotiates HTTP/2 over TLS when asked to
+    transports = ("http1", "http2")
 
     api_client = None
     verify_path: str | None = None
     trust_env: bool = True
 
-    @staticmethod
-    def _large_pod_template(name: str) -> PodTemplateSpec:
-        common = [EnvVar(name=f"ENV_{i}", value=f"value_{i}") for i in range(50)]
-
-        c1 = Container(
-            name="c1",
-            image="busybox:stable",
-            command=["/bin/sh", "-c"],
-            args=["sleep 3600"],
-            env=common + [EnvVar(name="C1_ONLY", value="x")],
-            volumeMounts=[VolumeMount(name="work", mountPath="/work")],
-            resources=ResourceRequirements(
-                limits={"cpu": "100m", "memory": "128Mi"},
-                requests={"cpu": "50m", "memory": "64Mi"},
-            ),
-            livenessProbe=Probe(
-                exec=ExecAction(command=["/bin/true"]),
-                initialDelaySeconds=5,
-                periodSeconds=30,
-            ),
-        )
-        c2 = Container(
-            name="c2",
-            image="busybox:stable",
-            command=["/bin/sh", "-c"],
-            args=["sleep 3600"],
-            env=common + [EnvVar(name="C2_ONLY", value="y")],
-            volumeMounts=[VolumeMount(name="work", mountPath="/data")],
-            resources=ResourceRequirements(
-                limits={"cpu": "100m", "memory": "128Mi"},
-                requests={"cpu": "50m", "memory": "64Mi"},
-            ),
-        )
-        c3 = Container(
-            name="c3",
-            image="busybox:stable",
-            command=["/bin/sh", "-c"],
-            args=["sleep 3600"],
-            env=[EnvVar(name="IMPORTANT", value="bench_value")] + common,
-            volumeMounts=[VolumeMount(name="work", mountPath="/cache")],
-        )
-
-        vols = [Volume(name="work", emptyDir=EmptyDirVolumeSource())]
-
+    def _large_pod_template(self, name: str, revision: int = 0) -> PodTemplateSpec:
+        tpl = large_pod_template(name, self.payload, revision)
+        env_var = reuse(lambda e: EnvVar(name=e["name"], value=e["value"]))
+        resources = reuse(lambda r: ResourceRequirements(limits=r["limits"], requests=r["requests"]))
+
+        containers = [
+            Container(
+                name=c["name"],
+                image=c["image"],
+                command=c["command"],
+                args=c["args"],
+                env=[env_var(e) for e in c["env"]],
+                volumeMounts=[VolumeMount(name=m["name"], mountPath=m["mountPath"]) for m in c["volumeMounts"]],
+                resources=resources(c["resources"]) if "resources" in c else None,
+                livenessProbe=Probe(
+                    exec=ExecAction(command=p["exec"]["command"]),
+                    initialDelaySeconds=p["initialDelaySeconds"],
+                    periodSeconds=p["periodSeconds"],
+                ) if (p := c.get("livenessProbe")) else None,
+            )
+            for c in tpl["spec"]["containers"]
+        ]
+
+        vols = [Volume(name=v["name"], emptyDir=EmptyDirVolumeSource()) for v in tpl["spec"]["volumes"]]
+
+        meta = tpl["metadata"]
         return PodTemplateSpec(
-            metadata=ObjectMeta(labels={"app": name}),
-            spec=PodSpec(containers=[c1, c2, c3], volumes=vols),
+            metadata=ObjectMeta(labels=meta["labels"], annotations=meta.get("annotations")),
+            spec=PodSpec(containers=containers, volumes=vols),
         )
 
     async def init_client(self):
@@ -153,14 +144,15 @@ class LightkubeAsyncBenchmark(Benchmark):
             insecure_skip_tls_verify=True,
             verify_path=self.verify_path,
             trust_env=self.trust_env,
+            http2=self.transport == "http2",
         )
 
         # Don't misbehave
         for name in ("kr8s", "kr8s.asyncio", "httpx", "urllib3", "websockets"):
             logging.getLogger(name).setLevel(logging.WARNING)
 
-    async def create_one(self, name: str):
-        body = Deployment(
+    def build_body(self, name: str, revision: int = 0) -> Deployment:
+        return Deployment(
             metadata=ObjectMeta(
                 name=name,
                 namespace=self.namespace,
@@ -169,9 +161,18 @@ class LightkubeAsyncBenchmark(Benchmark):
             spec=DeploymentSpec(
                 replicas=0,
                 selector=LabelSelector(matchLabels={"app": name}),
-                template=self._large_pod_template(name),
+                template=self._large_pod_template(name, revision),
             ),
         )
+
+    # lightkube sends to_dict() through httpx's compact JSON encoder and decodes with from_dict()
+    def serialize_body(self, body: Deployment) -> bytes:
+        return json.dumps(body.to_dict(), ensure_ascii=False, separators=(",", ":")).encode()
+
+    def deserialize_body(self, raw: bytes) -> Deployment: return Deployment.from_dict(json.loads(raw))
+
+    async def create_one(self, name: str):
+        body = self.build_body(name)
         dep: Deployment = await self.api_client.create(body)
         # Ensure labels round-trip correctly
         self.check_bench_labels(name, dep.metadata.labels)
@@ -189,6 +190,36 @@ class LightkubeAsyncBenchmark(Benchmark):
     async def delete_one(self, name: str):
         await self.api_client.delete(Deployment, name=name, namespace=self.namespace)
 
+    async def delete_collection(self, labels: dict[str, str]):
+        # AsyncClient.deletecollection takes no selector, this is the request it builds plus one
+        await self.api_client._client.request(
+            "deletecollection", res=Deployment, namespace=self.namespace,
+            params={"labelSelector": label_selector(labels)})
+
     async def watch_all(self) -> AsyncIterable[Any]:
         async for op, dep in self.api_client.watch(Deployment, namespace=self.namespace):
             yield dep
+
+    async def list_all(self, limit: int | None = None) -> AsyncIterable[Any]:
+        async for dep in self.api_client.list(Deployment, namespace=self.namespace, chunk_size=limit):
+            yield dep
+
+    async def annotate_one(self, name: str, annotations: dict[str, str]):
+        return await self.api_client.patch(
+            Deployment, name, {"metadata": {"annotations": annotations}}, namespace=self.namespace)
+
+    async def replace_one(self, name: str, revision: int):
+        return await self.api_client.replace(self.build_body(name, revision))
+
+    async def patch_one(self, name: str, patch_type: str, revision: int):
+        return await self.api_client.patch(
+            Deployment, name, update_patch(patch_type, name, revision, self.payload), namespace=self.namespace,
+            patch_type=PatchType[patch_type.upper()])
+
+    async def apply_one(self, name: str, revision: int):
+        return await self.api_client.apply(self.build_body(name, revision), field_manager=FIELD_MANAGER, force=True)
+
+    async def watch_events(self) -> AsyncIterable[WatchEvent]:
+        async for op, dep in self.api_client.watch(Deployment, namespace=self.namespace):
+            meta = dep.metadata
+            yield WatchEvent(op, meta.name, meta.resourceVersion, meta.annotations)
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import json
+import asyncio
+from types import SimpleNamespace
+from dataclasses import dataclass
+from typing import Any, AsyncIterable
+
+from .benchmark import Benchmark, BenchmarkResult, UPDATE_PHASES
+from .churn import WatchEvent
+from .payloads import deployment_manifest
+
+
+@dataclass
+class NullBenchmark(Benchmark):
+    """No client and no server: every request is a single trip through the event loop.
+
+    What it reaches is the harness's own ceiling, and its time per request is what the harness adds to every other
+    client's numbers.
+    """
+    client: str = "null (harness)"
+    updates = tuple(UPDATE_PHASES)
+    # Its objects only have a name and labels
+    verifiable = False
+
+    _objects: list[Any] | None = None
+
+    async def init_client(self):
+        self._objects = [SimpleNamespace(metadata=SimpleNamespace(name=name, labels=self.build_bench_labels(name)))
+                         for name in self.all_objects_names]
+
+    # The least a networked call costs: give the loop a turn
+    async def _op(self): await asyncio.sleep(0)
+
+    async def create_one(self, name: str): await self._op()
+    async def get_one(self, name: str): await self._op()
+    async def delete_one(self, name: str): await self._op()
+    async def delete_collection(self, labels: dict[str, str]): await self._op()
+    async def annotate_one(self, name: str, annotations: dict[str, str]): await self._op()
+    async def replace_one(self, name: str, revision: int): await self._op()
+    async def patch_one(self, name: str, patch_type: str, revision: int): await self._op()
+    async def apply_one(self, name: str, revision: int): await self._op()
+
+    async def list_all(self, limit: int | None = None) -> AsyncIterable[Any]:
+        limit = limit or len(self._objects)
+        for i in range(0, len(self._objects), limit):
+            await self._op()
+            for obj in self._objects[i:i + limit]:
+                yield obj
+
+    async def watch_all(self) -> AsyncIterable[Any]:
+        for obj in self._objects:
+            yield obj
+        await asyncio.Event().wait()
+
+    async def watch_events(self) -> AsyncIterable[WatchEvent]:
+        await asyncio.Event().wait()
+        yield
+
+    async def _run_churn(self):
+        # Nothing would ever answer the writes with watch events
+        print(f"Skipping Churn for {self.client} client")
+        self.results.append(BenchmarkResult("Churn", 0, 0.0, concurrency=self.concurrency, unsupported=True))
+
+    def build_body(self, name: str, revision: int = 0) -> dict[str, Any]:
+        return deployment_manifest(name, self.namespace, self.build_bench_labels(name), self.payload, revision)
+
+    def serialize_body(self, body: dict[str, Any]) -> bytes: return json.dumps(body).encode()
+
+    def deserialize_body(self, raw: bytes) -> dict[str, Any]: return json.loads(raw)
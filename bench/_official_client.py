@@ -1,8 +1,11 @@
 from __future__ import annotations
 
+import os
+import json
 import asyncio
-import threading
-from dataclasses import dataclass
+from types import SimpleNamespace
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from typing import Any, AsyncIterable
 
 from kubernetes import client, config, watch
@@ -24,82 +27,118 @@ from kubernetes.client import (
     ApiException,
 )
 
-from .benchmark import Benchmark
+from .benchmark import Benchmark, BenchmarkResult, label_selector
+from .churn import WatchEvent
+from .payloads import large_pod_template, reuse, update_patch
+
+THREAD_SWEEP = [4, 16, 64, 256, 500]
 
 
 @dataclass
 class OfficialClientBenchmark(Benchmark):
     client: str = "official"
+    distribution = "kubernetes"
+    # The generated PATCH always asks for a JSON patch, which the REST layer turns into a strategic merge patch for
+    # anything but a list: merge patches and apply can't be sent through the typed API
+    updates = ("replace", "strategic", "json")
+
+    # Worker threads running the blocking calls, and urllib3 connections per host. None: one of each per request the
+    # concurrency limit lets in flight, so neither starves the client (the loop's default executor has
+    # min(32, cpus + 4) threads, urllib3 keeps 4 connections)
+    threads: int | None = None
 
     api_client = None
     apps_client = None
-
-    @staticmethod
-    def _large_pod_template(name: str) -> V1PodTemplateSpec:
-        common = [V1EnvVar(name=f"ENV_{i}", value=f"value_{i}") for i in range(50)]
-
-        c1 = V1Container(
-            name="c1",
-            image="busybox:stable",
-            command=["/bin/sh", "-c"],
-            args=["sleep 3600"],
-            env=common + [V1EnvVar(name="C1_ONLY", value="x")],
-            volume_mounts=[V1VolumeMount(name="work", mount_path="/work")],
-            resources=V1ResourceRequirements(
-                limits={"cpu": "100m", "memory": "128Mi"},
-                requests={"cpu": "50m", "memory": "64Mi"},
-            ),
-            liveness_probe=V1Probe(
-                _exec=V1ExecAction(command=["/bin/true"]),
-                initial_delay_seconds=5,
-                period_seconds=30,
-            ),
-        )
-
-        c2 = V1Container(
-            name="c2",
-            image="busybox:stable",
-            command=["/bin/sh", "-c"],
-            args=["sleep 3600"],
-            env=common + [V1EnvVar(name="C2_ONLY", value="y")],
-            volume_mounts=[V1VolumeMount(name="work", mount_path="/data")],
-            resources=V1ResourceRequirements(
-                limits={"cpu": "100m", "memory": "128Mi"},
-                requests={"cpu": "50m", "memory": "64Mi"},
-            ),
-        )
-
-        c3 = V1Container(
-            name="c3",
-            image="busybox:stable",
-            command=["/bin/sh", "-c"],
-            args=["sleep 3600"],
-            env=[V1EnvVar(name="IMPORTANT", value="bench_value")] + common,
-            volume_mounts=[V1VolumeMount(name="work", mount_path="/cache")],
-        )
-
-        vols = [V1Volume(name="work", empty_dir=V1EmptyDirVolumeSource())]
-
+    _executor: ThreadPoolExecutor | None = field(default=None, init=False, repr=False)
+    _pool_size: int = field(default=0, init=False, repr=False)
+
+    def _large_pod_template(self, name: str, revision: int = 0) -> V1PodTemplateSpec:
+        tpl = large_pod_template(name, self.payload, revision)
+        env_var = reuse(lambda e: V1EnvVar(name=e["name"], value=e["value"]))
+        resources = reuse(lambda r: V1ResourceRequirements(limits=r["limits"], requests=r["requests"]))
+
+        containers = [
+            V1Container(
+                name=c["name"],
+                image=c["image"],
+                command=c["command"],
+                args=c["args"],
+                env=[env_var(e) for e in c["env"]],
+                volume_mounts=[V1VolumeMount(name=m["name"], mount_path=m["mountPath"]) for m in c["volumeMounts"]],
+                resources=resources(c["resources"]) if "resources" in c else None,
+                liveness_probe=V1Probe(
+                    _exec=V1ExecAction(command=p["exec"]["command"]),
+                    initial_delay_seconds=p["initialDelaySeconds"],
+                    period_seconds=p["periodSeconds"],
+                ) if (p := c.get("livenessProbe")) else None,
+            )
+            for c in tpl["spec"]["containers"]
+        ]
+        vols = [V1Volume(name=v["name"], empty_dir=V1EmptyDirVolumeSource()) for v in tpl["spec"]["volumes"]]
+        meta = tpl["metadata"]
         return V1PodTemplateSpec(
-            metadata=V1ObjectMeta(labels={"app": name}),
-            spec=V1PodSpec(containers=[c1, c2, c3], volumes=vols),
+            metadata=V1ObjectMeta(labels=meta["labels"], annotations=meta.get("annotations")),
+            spec=V1PodSpec(containers=containers, volumes=vols),
         )
 
     async def init_client(self):
         try:
-            config.load_kube_config()
+            config.load_kube_config(config_file=os.getenv("KUBECONFIG"))
         except Exception:
             config.load_incluster_config()
-
-        self.api_client = client.ApiClient()
+        self.resize_pools()
+
+    def resize_pools(self):
+        """New executor and ApiClient, both sized for `threads` (or the concurrency level) calls at once."""
+        size = self.threads or self.concurrency
+        if size == self._pool_size:
+            return
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+        if self.api_client is not None:
+            self.api_client.close()
+        self._executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="official-client")
+        configuration = client.Configuration.get_default_copy()
+        configuration.connection_pool_maxsize = size
+        self.api_client = client.ApiClient(configuration)
         self.apps_client = client.AppsV1Api(self.api_client)
+        self._pool_size = size
 
     async def _run_sync(self, func, *args, **kwargs):
         loop = asyncio.get_running_loop()
-        return await loop.run_in_executor(None, lambda: func(*args, **kwargs))
-
-    async def create_one(self, name: str):
-        body = V1Deployment(
+        return await loop.run_in_executor(self._executor, lambda: func(*args, **kwargs))
+
+    async def run_thread_sweep(self, levels: list[int] = THREAD_SWEEP, concurrency: list[int] | None = None
+                               ) -> list[BenchmarkResult]:
+        """Rerun POST, GET and DELETE with each number of worker threads (and as many pooled connections), at each
+        `concurrency` level (default: just the current one)."""
+        concurrency = concurrency or [self.concurrency]
+        print(f"Running {self.client} client thread sweep {levels} x concurrency {concurrency} "
+              f"for {self.benchmark_size} objects...")
+        await self.init_client()
+        for level in concurrency:
+            self.concurrency = level
+            self._semaphore = asyncio.Semaphore(level)
+            for threads in levels:
+                self.threads = threads
+                self.resize_pools()
+                print(f"Concurrency {level}, {threads} threads")
+                start = len(self.results)
+                await self._run_phase("POST", self.create_batch)
+                await self._run_phase("GET", self.get_batch)
+                await self._run_phase("DELETE", self.delete_batch)
+                for res in self.results[start:]:
+                    res.threads = threads
+
+        self.print_results()
+        return self.results
+
+    def init_models(self):
+        if self.api_client is None:
+            self.api_client = client.ApiClient()
+
+    def build_body(self, name: str, revision: int = 0) -> V1Deployment:
+        return V1Deployment(
             metadata=V1ObjectMeta(
                 name=name,
                 namespace=self.namespace,
@@ -108,9 +147,18 @@ class OfficialClientBenchmark(Benchmark):
             spec=V1DeploymentSpec(
                 replicas=0,
                 selector=V1LabelSelector(match_labels={"app": name}),
-                template=self._large_pod_template(name),
+                template=self._large_pod_template(name, revision),
             ),
         )
+
+    def serialize_body(self, body: V1Deployment) -> bytes:
+        return json.dumps(self.api_client.sanitize_for_serialization(body)).encode()
+
+    def deserialize_body(self, raw: bytes) -> V1Deployment:
+        return self.api_client.deserialize(SimpleNamespace(data=raw), "V1Deployment")
+
+    async def create_one(self, name: str):
+        body = self.build_body(name)
         return await self._run_sync(
             self.apps_client.create_namespaced_deployment,
             namespace=self.namespace,
@@ -129,30 +177,69 @@ class OfficialClientBenchmark(Benchmark):
     async def delete_one(self, name: str):
         await self._run_sync(self.apps_client.delete_namespaced_deployment, name=name, namespace=self.namespace)
 
-    async def watch_all(self) -> AsyncIterable[Any]:
-        """Async wrapper around the blocking watch.Watch().stream API."""
-        loop = asyncio.get_running_loop()
-        queue: asyncio.Queue[Any] = asyncio.Queue()
-        sentinel = object()
-
-        def producer():
-            w = watch.Watch()
-            try:
-                for event in w.stream(
-                    self.apps_client.list_namespaced_deployment,
-                    namespace=self.namespace,
-                    timeout_seconds=0,
-                ):
-                    asyncio.run_coroutine_threadsafe(queue.put(event), loop)
-            finally:
-                asyncio.run_coroutine_threadsafe(queue.put(sentinel), loop)
-
-        thread = threading.Thread(target=producer, daemon=True)
-        thread.start()
+    async def delete_collection(self, labels: dict[str, str]):
+        await self._run_sync(self.apps_client.delete_collection_namespaced_deployment,
+                             namespace=self.namespace, label_selector=label_selector(labels))
 
+    async def list_all(self, limit: int | None = None) -> AsyncIterable[Any]:
+        token = None
         while True:
-            event = await queue.get()
-            if event is sentinel:
-                break
-            deploy = event["object"]
-            yield deploy
+            page = await self._run_sync(
+                self.apps_client.list_namespaced_deployment,
+                namespace=self.namespace,
+                limit=limit,
+                _continue=token,
+            )
+            for deploy in page.items:
+                yield deploy
+            if not (token := page.metadata._continue):
+                return
+
+    async def annotate_one(self, name: str, annotations: dict[str, str]):
+        return await self._run_sync(
+            self.apps_client.patch_namespaced_deployment,
+            name=name,
+            namespace=self.namespace,
+            body={"metadata": {"annotations": annotations}},
+        )
+
+    async def replace_one(self, name: str, revision: int):
+        return await self._run_sync(
+            self.apps_client.replace_namespaced_deployment,
+            name=name,
+            namespace=self.namespace,
+            body=self.build_body(name, revision),
+        )
+
+    async def patch_one(self, name: str, patch_type: str, revision: int):
+        return await self._run_sync(
+            self.apps_client.patch_namespaced_deployment,
+            name=name,
+            namespace=self.namespace,
+            body=update_patch(patch_type, name, revision, self.payload),
+        )
+
+    async def watch_all(self) -> AsyncIterable[Any]:
+        async for event in self._stream_events():
+            yield event["object"]
+
+    async def watch_events(self) -> AsyncIterable[WatchEvent]:
+        async for event in self._stream_events():
+            meta = event["object"].metadata
+            yield WatchEvent(event["type"], meta.name, meta.resource_version, meta.annotations)
+
+    async def _stream_events(self) -> AsyncIterable[dict[str, Any]]:
+        """Async wrapper around the blocking watch.Watch().stream API."""
+        w = watch.Watch()
+        stream = aiter(self.bridge(w.stream(
+            self.apps_client.list_namespaced_deployment,
+            namespace=self.namespace,
+            timeout_seconds=0,
+        )))
+        try:
+            async for event in stream:
+                yield event
+        finally:
+            # The producer notices on its next event; the blocking read can't be interrupted from here
+            w.stop()
+            await stream.aclose()
@@ -1,19 +1,72 @@
 import asyncio
 import time
+from pathlib import Path
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
 from functools import cached_property
-from typing import Any, AsyncIterable
+from typing import Any, AsyncIterable, Awaitable, Callable, ClassVar, Iterable, TypeVar
 
 import pandas as pd
 
+from .fake_apiserver import ConnectionStats, read_connection_stats, set_faults
+from .faults import PhaseFaults, parse_profile
+from .churn import WatchEvent, DeliveryStats, DeliveryTracker, CHURN_UPDATES, CHURN_DRAIN_SECONDS, WRITTEN_AT
+from .histogram import LatencyHistogram
+from .open_loop import arrival_offsets, OPEN_LOOP_RATES, OPEN_LOOP_DURATION, OPEN_LOOP_RAMP
+from .memory import MemoryStats, PhaseMemoryTracker, MiB, rss_bytes
+from .profiling import make_profiler, slug
+from .payloads import PayloadShape, SIZE_SWEEP, PATCH_TYPES, deployment_manifest, manifest_bytes
+from .sync_bridge import BridgeStats, SyncStreamBridge
+from .verify import Verifier, VerifyStats
+
+T = TypeVar("T")
+
 CONCURRENCY = 500
-_semaphore = asyncio.Semaphore(CONCURRENCY)
+LIST_LIMITS = [100, 500, 2000]
+RSS_SAMPLE_EVERY = 100
+SWEEP_LEVELS = [1, 8, 32, 128, 500, 2000]
+# Update phases, in run() order: name in `Benchmark.updates` -> phase name
+UPDATE_PHASES = {"replace": "PUT", **{t: f"PATCH {t}" for t in PATCH_TYPES}, "apply": "APPLY"}
+# Every benchmark object carries these, for collection deletes and the empty-namespace barrier between clients
+BENCH_LABELS = {"bench/suite": "python-client-bench"}
+LATENCY_COLUMNS = ["p50", "p95", "p99", "max"]
+MEMORY_COLUMNS = ["Peak MiB", "Retained MiB", "Blocks", "RSS Δ MiB"]
+
+
+def label_selector(labels: dict[str, str]) -> str: return ",".join(f"{k}={v}" for k, v in labels.items())
+
+
+async def run_pool(op: Callable[[str], Awaitable[Any]], names: Iterable[str], workers: int,
+                   histogram: LatencyHistogram | None = None, failures: PhaseFaults | None = None):
+    """Run `op` for every name with `workers` requests in flight. Workers pull names lazily, so the harness costs the
+    same per request however many there are: no coroutine per name and no gather over all of them up front.
 
+    With `failures`, an `op` that raises is recorded there instead of failing the phase."""
+    names = iter(names)
+    if failures is not None:
+        unchecked = op
 
-async def run_with_guard(task):
-    async with _semaphore:
-        await task
+        async def op(name: str):
+            try:
+                await unchecked(name)
+            except Exception as e:
+                failures.record(name, e)
+
+    async def worker():
+        for name in names:
+            if histogram is None:
+                await op(name)
+                continue
+            t0 = time.perf_counter_ns()
+            await op(name)
+            histogram.record_ns(time.perf_counter_ns() - t0)
+
+    tasks = [asyncio.create_task(worker()) for _ in range(workers)]
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
 
 
 @dataclass
@@ -21,6 +74,63 @@ class BenchmarkResult:
     bench_name: str
     requests: int
     seconds: float
+    latency: LatencyHistogram | None = None
+    concurrency: int = CONCURRENCY
+    memory: MemoryStats | None = None
+    cpu_seconds: float | None = None
+    object_bytes: int | None = None  # JSON size of the created manifest
+    delivery: DeliveryStats | None = None
+    # Sync clients: what handing their stream items over to the event loop cost, apart from the client itself
+    bridge: BridgeStats | None = None
+    # Verification mode: responses checked against the written objects, and what checking them cost
+    verify: VerifyStats | None = None
+    # Fault injection: what the profile did to the phase, and which operations failed
+    faults: PhaseFaults | None = None
+    # Against the fake apiserver: connections and TLS handshakes the phase cost, as the server counted them
+    connections: ConnectionStats | None = None
+    # LIST phases: time until the first object was yielded, and the highest RSS growth sampled while listing
+    first_object: float | None = None
+    rss_peak: int | None = None
+    # Open-loop runs: requested arrival rate, and completions per second over the steady (post-ramp) window
+    target_rate: float | None = None
+    achieved_rate: float | None = None
+    # The client has no API for this phase's verb, nothing was run
+    unsupported: bool = False
+    trial: int = 0
+    # Sharded runs: worker processes the phase was split across (requests, latency and CPU add up over all of them)
+    shards: int | None = None
+    # Thread sweep of the sync official client: worker threads (and pooled connections) the phase ran with
+    threads: int | None = None
+
+
+def cpu_share(res: BenchmarkResult) -> float | None:
+    """Process CPU time over wall time, in percent. >100% means several threads burned CPU at once."""
+    if res.cpu_seconds is None or not res.seconds:
+        return None
+    return 100 * res.cpu_seconds / res.seconds
+
+
+def mib_per_second(res: BenchmarkResult) -> float | None:
+    """Manifest bytes moved per second. Responses carry server-populated fields on top, so it's a lower bound."""
+    if res.object_bytes is None or not res.seconds:
+        return None
+    return res.requests * res.object_bytes / res.seconds / MiB
+
+
+def memory_summary(memory: MemoryStats) -> dict[str, float]:
+    return {
+        "Peak MiB": memory.peak / MiB,
+        "Retained MiB": memory.retained / MiB,
+        "Blocks": memory.blocks,
+        "RSS Δ MiB": memory.rss_delta / MiB,
+    }
+
+
+@dataclass
+class Teardown:
+    """The barrier after a client: delete what it left behind, then watch until the namespace is empty."""
+    seconds: float
+    waited: int  # objects still there (being deleted) when the watch started
 
 
 @dataclass
@@ -30,9 +140,71 @@ class Benchmark(ABC):
     benchmark_size: int = 5_000
     namespace: str = "default"
     resource_name_prefix: str = "client-bench-"
+    concurrency: int = CONCURRENCY
+    payload: PayloadShape = PayloadShape()
+    # Writes per second for the Churn phase (create, `churn_updates` annotation patches, delete per object), 0 skips it
+    churn_rate: float = 0.0
+    churn_updates: int = CHURN_UPDATES
+    # run() repeats all phases `warmup` times without recording anything (TLS handshakes, connection pools, lazy
+    # imports), then `trials` times for real
+    warmup: int = 0
+    trials: int = 1
+    # Page sizes for the paginated LIST phases, after one unpaginated LIST
+    list_limits: list[int] = field(default_factory=lambda: list(LIST_LIMITS))
+    # Trace allocations per phase (tracemalloc + RSS). Slows the client down, so compare obj/s only between runs
+    # with the same setting
+    track_memory: bool = False
+    # "cprofile" or "sample": dump a profile per phase to profile_dir
+    profile: str | None = None
+    profile_dir: str = "profiles"
+    # Loop implementation the loop matrix runs this benchmark on, in its own process (see bench/loops.py). None: the
+    # one the current process runs
+    event_loop: str | None = None
+    # JSON decoder the client is switched to for the codec matrix, one of `codecs` (see bench/codecs.py). None: the
+    # one it ships with
+    codec: str | None = None
+    # "http1" or "http2" for the transport matrix, one of `transports`. None: what the client negotiates by default
+    transport: str | None = None
+    # Fake apiserver to read connection counts from around every phase, and to inject faults through (see
+    # bench/fake_apiserver.py)
+    fake_apiserver_url: str | None = None
+    # (index, count): this process only works on every count-th object name, starting at index (see bench/sharding.py)
+    shard: tuple[int, int] | None = None
+    # Check every GET and Watch response against the object that was written (see bench/verify.py). Costs time inside
+    # those phases, reported apart
+    verify: bool = False
     results: list[BenchmarkResult] = field(default_factory=list)
+    # Set by the runner once the namespace is empty again after this client
+    teardown: Teardown | None = field(default=None, init=False)
+    # PyPI distribution of the client, for the version saved with the results
+    distribution: ClassVar[str] = ""
+    # Update verbs the client implements hooks for, keys of UPDATE_PHASES. The rest are reported as unsupported
+    updates: ClassVar[tuple[str, ...]] = ()
+    # Codecs the client's decode path can be switched to
+    codecs: ClassVar[tuple[str, ...]] = ()
+    # HTTP versions the client can be told to use
+    transports: ClassVar[tuple[str, ...]] = ()
+    # GET and Watch hand out the objects as the server stored them, so verification mode can check them
+    verifiable: ClassVar[bool] = True
+
+    # Caps writes in flight in the Churn phase. Created per run, so it is bound to the running loop and sized by the
+    # current concurrency level
+    _semaphore: asyncio.Semaphore | None = field(default=None, init=False, repr=False)
+    # Bridges opened by the current phase
+    _bridges: list[SyncStreamBridge] = field(default_factory=list, init=False, repr=False)
+    # Expected state of the objects for verification: the last update revision written, and the current phase's checks
+    _revision: int = field(default=0, init=False, repr=False)
+    _verifier: Verifier | None = field(default=None, init=False, repr=False)
+    # Failures of the current phase's operations, when it runs with faults
+    _faults: PhaseFaults | None = field(default=None, init=False, repr=False)
+
+    @property
+    def label(self) -> str:
+        tags = ", ".join(tag for tag in (self.event_loop, self.codec, self.transport) if tag)
+        return f"{self.client} [{tags}]" if tags else self.client
 
-    def build_bench_labels(self, name: str) -> dict[str, str]: return {f"app/{name}": f"{self.namespace}-{name}"}
+    def build_bench_labels(self, name: str) -> dict[str, str]:
+        return {f"app/{name}": f"{self.namespace}-{name}", **BENCH_LABELS}
 
     def check_bench_labels(self, name: str, labels: dict):
         bench_labels = self.build_bench_labels(name)
@@ -41,63 +213,324 @@ class Benchmark(ABC):
 
     @cached_property
     def all_objects_names(self) -> list[str]:
-        return [f"{self.resource_name_prefix}{i:06d}" for i in range(self.benchmark_size)]
+        names = [f"{self.resource_name_prefix}{i:06d}" for i in range(self.benchmark_size)]
+        return names[self.shard[0]::self.shard[1]] if self.shard else names
+
+    async def _init_client(self):
+        """init_client, and for a transport run against the fake apiserver, a check that the client speaks it: the
+        connections a LIST request after init goes over must all be HTTP/2 for "http2", and none of them for "http1"."""
+        url = self.fake_apiserver_url if self.transport else None
+        await self.init_client()
+        if url is None:
+            return
+        # Init may have talked HTTP/1.1 before switching (kr8s rebuilds its session), so only the request counts.
+        # Used rather than opened: the client may be sitting on a connection from before
+        read_connection_stats(url, reset=True)
+        stream = self.list_all(1)
+        try:
+            async for _ in stream:
+                break
+        finally:
+            await stream.aclose()
+        request = read_connection_stats(url)
+        if not request.used or request.used_http2 != (request.used if self.transport == "http2" else 0):
+            raise RuntimeError(f"{self.label} was asked for {self.transport}, but its first request went over "
+                               f"{request.used} connections, {request.used_http2} of them HTTP/2")
 
     async def run(self) -> list[BenchmarkResult]:
         print(f"Running {self.client} client benchmark for {self.benchmark_size} objects...")
-        await self.init_client()
+        await self._init_client()
+        self._semaphore = asyncio.Semaphore(self.concurrency)
 
-        bench = "POST"
-        print(f"Starting {bench} benchmark...")
-        t0 = time.perf_counter()
-        await self.create_batch()
-        t1 = time.perf_counter()
-        self.results.append(BenchmarkResult(bench, self.benchmark_size, t1 - t0))
+        for i in range(self.warmup):
+            print(f"Warmup round {i + 1}/{self.warmup}")
+            await self._run_all_phases()
+        self.results.clear()
+        for trial in range(self.trials):
+            if self.trials > 1:
+                print(f"Trial {trial + 1}/{self.trials}")
+            start = len(self.results)
+            await self._run_all_phases()
+            for res in self.results[start:]:
+                res.trial = trial
 
-        bench = "GET"
-        print(f"Starting {bench} benchmark...")
-        await self.get_batch()
-        t2 = time.perf_counter()
-        self.results.append(BenchmarkResult(bench, self.benchmark_size, t2 - t1))
+        self.print_results()
+        return self.results
 
-        bench = "Watch"
-        print(f"Starting {bench} benchmark...")
-        t2 = time.perf_counter()
-        await self._bench_watch()
-        t3 = time.perf_counter()
-        self.results.append(BenchmarkResult(bench, self.benchmark_size, t3 - t2))
+    async def _run_all_phases(self):
+        await self._run_phase("POST", self.create_batch)
+        await self._run_phase("GET", self.get_batch, verify=True)
+        await self._run_list_phases()
+        await self._run_update_phases()
+        await self._run_phase("Watch", self._bench_watch, verify=True)
+        await self._run_phase("DELETE", self.delete_batch)
+        await self._run_delete_collection()
+        if self.churn_rate:
+            await self._run_churn()
 
-        bench = "DELETE"
-        print(f"Starting {bench} benchmark...")
-        await self.delete_batch()
-        t4 = time.perf_counter()
-        self.results.append(BenchmarkResult(bench, self.benchmark_size, t4 - t3))
+    async def run_sweep(self, levels: list[int] = SWEEP_LEVELS) -> list[BenchmarkResult]:
+        """Rerun the concurrent phases (POST, GET, DELETE) once per concurrency level.
+
+        Watch is left out: it is a single stream, so the concurrency limit doesn't apply to it.
+        """
+        print(f"Running {self.client} client concurrency sweep {levels} for {self.benchmark_size} objects...")
+        await self._init_client()
+        for level in levels:
+            self.concurrency = level
+            self._semaphore = asyncio.Semaphore(level)
+            self.resize_pools()
+            print(f"Concurrency {level}")
+            await self._run_phase("POST", self.create_batch)
+            await self._run_phase("GET", self.get_batch, verify=True)
+            await self._run_phase("DELETE", self.delete_batch)
 
         self.print_results()
         return self.results
 
+    async def run_size_sweep(self, sizes: list[int] = SIZE_SWEEP) -> list[BenchmarkResult]:
+        """Rerun every phase with Deployments of roughly each size in bytes, from tiny to near the etcd limit."""
+        print(f"Running {self.client} client object size sweep {sizes} for {self.benchmark_size} objects...")
+        await self._init_client()
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        for size in sizes:
+            self.payload = PayloadShape.for_size(size)
+            print(f"Object size {manifest_bytes(self.payload)} bytes ({self.payload.label})")
+            await self._run_phase("POST", self.create_batch)
+            await self._run_phase("GET", self.get_batch, verify=True)
+            await self._run_phase("Watch", self._bench_watch, verify=True)
+            await self._run_phase("DELETE", self.delete_batch)
+
+        self.print_results()
+        return self.results
+
+    async def run_shard(self, barrier) -> list[BenchmarkResult]:
+        """POST, GET and DELETE over this process' share of the objects. Every phase starts when all shards are
+        ready for it (`barrier` is a multiprocessing.Barrier shared by them)."""
+        index, count = self.shard
+        print(f"Running {self.client} client shard {index + 1}/{count} for {len(self.all_objects_names)} objects...")
+        await self._init_client()
+        loop = asyncio.get_running_loop()
+        for name, phase in (("POST", self.create_batch), ("GET", self.get_batch), ("DELETE", self.delete_batch)):
+            await loop.run_in_executor(None, barrier.wait)
+            await self._run_phase(name, phase)
+        return self.results
+
+    async def run_faults(self, profiles: list[str]) -> list[BenchmarkResult]:
+        """POST, GET and DELETE with each fault profile injected by the fake apiserver (see bench/faults.py).
+
+        Objects a faulted POST or DELETE failed on are created or deleted again, without faults, before the next phase,
+        so every phase starts from the same state.
+        """
+        print(f"Running {self.client} client fault injection {profiles} for {self.benchmark_size} objects...")
+        await self._init_client()
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        for profile in profiles:
+            print(f"Fault profile {profile}")
+            for name, phase, repair in (("POST", self.create_batch, self.create_one), ("GET", self.get_batch, None),
+                                        ("DELETE", self.delete_batch, self.delete_one)):
+                result = await self._run_phase(name, phase, faults=profile)
+                if repair is not None and result.faults.failed:
+                    # Some may have gone through after all (a slow response the client gave up on), never mind those
+                    await run_pool(repair, result.faults.failed, min(self.concurrency, len(result.faults.failed)),
+                                   failures=PhaseFaults(profile))
+
+        self.print_results()
+        return self.results
+
+    async def run_open_loop(
+        self, rates: list[float] = OPEN_LOOP_RATES, duration: float = OPEN_LOOP_DURATION, ramp: float = OPEN_LOOP_RAMP,
+    ) -> list[BenchmarkResult]:
+        """POST, GET and DELETE at each constant arrival rate (requests/s) for `duration` seconds after a linear ramp.
+
+        Requests are sent on schedule no matter how many are still in flight, so the concurrency limit doesn't apply.
+        Each level creates its own objects, as many as it sends requests.
+        """
+        print(f"Running {self.client} client open-loop benchmark at {rates} requests/s for {duration}s "
+              f"(+{ramp}s ramp)...")
+        await self._init_client()
+        for rate in rates:
+            offsets = arrival_offsets(rate, duration, ramp)
+            names = [f"{self.resource_name_prefix}{i:06d}" for i in range(len(offsets))]
+            print(f"Target rate {rate}/s, {len(offsets)} requests")
+            for bench, op in (("POST", self.create_one), ("GET", self.get_one), ("DELETE", self.delete_one)):
+                achieved: list[float] = []
+
+                async def phase(histogram: LatencyHistogram):
+                    achieved.append(await self._bench_open_loop(op, names, offsets, histogram, ramp, duration))
+
+                result = await self._run_phase(bench, phase, len(names))
+                result.target_rate, result.achieved_rate = rate, achieved[0]
+
+        self.print_results()
+        return self.results
+
+    async def _run_list_phases(self):
+        for limit in [None, *self.list_limits]:
+            stats: list[tuple[float, int]] = []
+
+            async def phase(histogram: LatencyHistogram):
+                stats.append(await self._bench_list(limit, histogram))
+
+            result = await self._run_phase("LIST" if limit is None else f"LIST limit={limit}", phase)
+            result.first_object, result.rss_peak = stats[0]
+
+    async def _run_update_phases(self):
+        # Every phase sets the env var to a new value, so each write is a real spec change
+        for revision, (update, bench) in enumerate(UPDATE_PHASES.items(), start=1):
+            if update not in self.updates:
+                print(f"Skipping {bench} benchmark, unsupported by {self.client}")
+                self.results.append(BenchmarkResult(bench, 0, 0.0, concurrency=self.concurrency, unsupported=True))
+                continue
+            self.prepare_update(update, revision)
+            await self._run_phase(bench, lambda histogram: self.update_batch(update, revision, histogram))
+
+    async def _run_delete_collection(self):
+        # Something to delete first, untimed
+        print("Recreating objects for DELETE collection...")
+        await self.create_batch()
+        await self._run_phase("DELETE collection", self._bench_delete_collection)
+
+    async def _bench_delete_collection(self, histogram: LatencyHistogram | None = None):
+        t0 = time.perf_counter_ns()
+        await self.delete_collection(BENCH_LABELS)
+        if histogram is not None:
+            histogram.record_ns(time.perf_counter_ns() - t0)
+
+    async def _run_churn(self):
+        tracker = DeliveryTracker()
+        writes = self.benchmark_size * (self.churn_updates + 2)
+        result = await self._run_phase("Churn", lambda histogram: self._bench_churn(tracker, histogram), writes)
+        result.delivery = tracker.stats()
+
+    async def _run_phase(self, bench: str, phase: Callable[[LatencyHistogram], Awaitable[Any]],
+                         requests: int | None = None, verify: bool = False, faults: str | None = None
+                         ) -> BenchmarkResult:
+        print(f"Starting {bench} benchmark...")
+        # Digests are computed before the clock starts
+        self._verifier = self._make_verifier() if verify and self.verify else None
+        histogram = LatencyHistogram()
+        tracker = PhaseMemoryTracker() if self.track_memory else None
+        profiler = make_profiler(self.profile) if self.profile else None
+        if tracker is not None:
+            tracker.start()
+        if profiler is not None:
+            profiler.start()
+        self._bridges.clear()
+        url = self.fake_apiserver_url
+        conns0 = read_connection_stats(url, reset=True) if url else None
+        if faults is not None:
+            if not url:
+                raise ValueError("fault injection needs the fake apiserver")
+            self._faults = PhaseFaults(faults)
+            set_faults(url, parse_profile(faults))
+        t0, cpu0 = time.perf_counter(), time.process_time()
+        await phase(histogram)
+        seconds, cpu_seconds = time.perf_counter() - t0, time.process_time() - cpu0
+        if faults is not None:
+            self._faults.server = set_faults(url, None)
+        if profiler is not None:
+            self._save_profile(profiler, bench)
+        memory = tracker.stop() if tracker is not None else None
+        result = BenchmarkResult(bench, requests or len(self.all_objects_names), seconds, histogram, self.concurrency,
+                                 memory, cpu_seconds, manifest_bytes(self.payload))
+        if self._bridges:
+            result.bridge = BridgeStats()
+            for b in self._bridges:
+                result.bridge.add(b.stats)
+        if self._verifier is not None:
+            result.verify, self._verifier = self._verifier.stats, None
+        if conns0 is not None:
+            result.connections = read_connection_stats(url).since(conns0)
+        result.faults, self._faults = self._faults, None
+        self.results.append(result)
+        return result
+
+    def _save_profile(self, profiler, bench: str):
+        out = Path(self.profile_dir)
+        out.mkdir(parents=True, exist_ok=True)
+        name = f"{slug(self.client)}-{slug(bench)}"
+        if self.concurrency != CONCURRENCY:
+            name += f"-c{self.concurrency}"
+        if self.event_loop:
+            name += f"-{self.event_loop}"
+        if self.codec:
+            name += f"-{self.codec}"
+        if self.transport:
+            name += f"-{self.transport}"
+        print(f"Saved {self.profile} profile {profiler.stop(out / name)}")
+
     def print_results(self):
         rows = []
         for res in self.results:
             rows.append({
-                "Benchmark": res.bench_name,
+                "Trial": res.trial + 1,
+                "Concurrency": res.concurrency,
+                "Threads": res.threads,
+                "Size": res.object_bytes,
+                "Benchmark": res.bench_name + (" (unsupported)" if res.unsupported else ""),
                 "Objects": res.requests,
-                "Seconds": res.seconds,
-                "Obj/s": res.requests / res.seconds if res.seconds else 0.0,
+                "Seconds": None if res.unsupported else res.seconds,
+                "Obj/s": None if res.unsupported else res.requests / res.seconds if res.seconds else 0.0,
+                "MiB/s": mib_per_second(res),
+                "Target/s": res.target_rate,
+                "Achieved/s": res.achieved_rate,
+                "First ms": 1e3 * res.first_object if res.first_object is not None else None,
+                "RSS peak MiB": res.rss_peak / MiB if res.rss_peak is not None else None,
+                "CPU %": cpu_share(res),
+                **(res.latency.summary_ms() if res.latency is not None else {}),
+                **(memory_summary(res.memory) if res.memory is not None else {}),
             })
-        df = pd.DataFrame(rows, columns=["Benchmark", "Objects", "Seconds", "Obj/s"])
-        print("-" * 40)
+        df = pd.DataFrame(rows, columns=[
+            "Trial", "Concurrency", "Threads", "Size", "Benchmark", "Objects", "Seconds", "Obj/s", "MiB/s", "Target/s",
+            "Achieved/s", "First ms", "RSS peak MiB", "CPU %", *LATENCY_COLUMNS, *MEMORY_COLUMNS])
+        for col in ("Trial", "Concurrency", "Threads", "Size"):
+            if df[col].nunique() <= 1:
+                df = df.drop(columns=[col])
+        if df["Peak MiB"].isna().all():
+            df = df.drop(columns=MEMORY_COLUMNS)
+        for cols in (["Target/s", "Achieved/s"], ["First ms", "RSS peak MiB"]):
+            if df[cols[0]].isna().all():
+                df = df.drop(columns=cols)
+        print("-" * 72)
         print(df.to_string(
             index=False,
+            na_rep="-",
             formatters={
                 "Seconds": lambda v: f"{v:.2f}",
-                "Obj/s": lambda v: f"{v:.1f}"
+                "Obj/s": lambda v: f"{v:.1f}",
+                "MiB/s": lambda v: f"{v:.2f}",
+                "Target/s": lambda v: f"{v:.0f}",
+                "Achieved/s": lambda v: f"{v:.1f}",
+                "First ms": lambda v: f"{v:.1f}",
+                "RSS peak MiB": lambda v: f"{v:.1f}",
+                "CPU %": lambda v: f"{v:.0f}",
+                **{c: (lambda v: f"{v:.1f}") for c in LATENCY_COLUMNS + MEMORY_COLUMNS},
+                "Blocks": lambda v: f"{v:.0f}",
             }
         ))
-        print("-" * 40)
+        print("Latency percentiles in ms (LIST, Watch: object inter-arrival time, Churn: write-to-event delay, "
+              "open loop: from the intended send time)")
+        for res in self.results:
+            if res.delivery is not None:
+                print(f"{res.bench_name}: {res.delivery.summary}")
+            if res.bridge is not None:
+                print(f"{res.bench_name} sync bridge: {res.bridge.summary}")
+            if res.verify is not None:
+                print(f"{res.bench_name} verification: {res.verify.summary}")
+            if res.connections is not None:
+                print(f"{res.bench_name}: {res.connections.summary}")
+            if res.faults is not None:
+                print(f"{res.bench_name} {res.faults.summary}")
+            if res.memory is not None and res.memory.top_sites:
+                print(f"Top retained allocation sites, {res.bench_name}:")
+                for site, size, count in res.memory.top_sites:
+                    print(f"  {size / MiB:8.2f} MiB {count:8d} blocks  {site}")
+        print("-" * 72)
 
     @abstractmethod
     async def init_client(self): raise NotImplementedError()
+    # Undo whatever init_client changed outside the client (e.g. process-wide patches), after the last phase
+    async def close_client(self): pass
     @abstractmethod
     async def get_one(self, name: str): raise NotImplementedError()
     @abstractmethod
@@ -105,21 +538,200 @@ class Benchmark(ABC):
     @abstractmethod
     async def delete_one(self, name: str): raise NotImplementedError()
     @abstractmethod
+    async def delete_collection(self, labels: dict[str, str]): raise NotImplementedError()
+    @abstractmethod
     async def watch_all(self) -> AsyncIterable[Any]: yield NotImplementedError()
+    @abstractmethod
+    async def list_all(self, limit: int | None = None) -> AsyncIterable[Any]: yield NotImplementedError()
+    # Churn hooks: a merge patch of metadata.annotations, and a watch that keeps running and reports every event
+    @abstractmethod
+    async def annotate_one(self, name: str, annotations: dict[str, str]): raise NotImplementedError()
+    @abstractmethod
+    async def watch_events(self) -> AsyncIterable[WatchEvent]: yield NotImplementedError()
+
+    # Update hooks, optional (see `updates`): set UPDATED_ENV of the Pod template to its `revision` value with a
+    # PUT of the whole object, a patch of one of PATCH_TYPES (payloads.update_patch) or a server-side apply
+    async def replace_one(self, name: str, revision: int): raise NotImplementedError()
+    async def patch_one(self, name: str, patch_type: str, revision: int): raise NotImplementedError()
+    async def apply_one(self, name: str, revision: int): raise NotImplementedError()
+    # Untimed setup for an update phase, right before its clock starts
+    def prepare_update(self, update: str, revision: int): pass
+    # Untimed: a sweep moved `concurrency` (or the official client's `threads`) to its next level, before the phases
+    def resize_pools(self): pass
+
+    # Offline model hooks: create_one builds its body with build_body, and bench/microbench.py times all three
+    # without any network. init_models prepares whatever they need when init_client was not called.
+    def init_models(self): pass
+    def build_body(self, name: str, revision: int = 0) -> Any: raise NotImplementedError()
+    def serialize_body(self, body: Any) -> bytes: raise NotImplementedError()
+    def deserialize_body(self, raw: bytes) -> Any: raise NotImplementedError()
+
+    def _make_verifier(self) -> Verifier | None:
+        if not self.verifiable:
+            print(f"Skipping verification, unsupported by {self.client}")
+            return None
+        expected = lambda name: deployment_manifest(
+            name, self.namespace, self.build_bench_labels(name), self.payload, self._revision)
+        return Verifier(self.all_objects_names, expected)
+
+    def bridge(self, iterable: Iterable[T]) -> SyncStreamBridge[T]:
+        """Async iterator over a blocking stream for sync clients, with its overhead reported per phase."""
+        bridge = SyncStreamBridge(iterable, name=f"{slug(self.client)}-stream")
+        self._bridges.append(bridge)
+        return bridge
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self._semaphore
 
-    async def delete_batch(self):
-        await asyncio.gather(*[run_with_guard(self.delete_one(name)) for name in self.all_objects_names])
+    async def _run_batch(self, op: Callable[[str], Awaitable[Any]], histogram: LatencyHistogram | None = None):
+        await run_pool(op, self.all_objects_names, min(self.concurrency, len(self.all_objects_names)), histogram,
+                       self._faults)
 
-    async def get_batch(self):
-        await asyncio.gather(*[run_with_guard(self.get_one(name)) for name in self.all_objects_names])
-        
-    async def create_batch(self) -> list[Any]:
-        return await asyncio.gather(*[run_with_guard(self.create_one(name)) for name in self.all_objects_names])
+    async def delete_batch(self, histogram: LatencyHistogram | None = None):
+        await self._run_batch(self.delete_one, histogram)
 
-    async def _bench_watch(self):
+    async def get_batch(self, histogram: LatencyHistogram | None = None):
+        await self._run_batch(self.get_one if self._verifier is None else self._get_verified, histogram)
+
+    async def _get_verified(self, name: str):
+        self._verifier.check(name, await self.get_one(name))
+
+    async def create_batch(self, histogram: LatencyHistogram | None = None):
+        await self._run_batch(self.create_one, histogram)
+        self._revision = 0
+
+    async def update_batch(self, update: str, revision: int, histogram: LatencyHistogram | None = None):
+        if update == "replace":
+            op = lambda name: self.replace_one(name, revision)
+        elif update == "apply":
+            op = lambda name: self.apply_one(name, revision)
+        else:
+            op = lambda name: self.patch_one(name, update, revision)
+        await self._run_batch(op, histogram)
+        self._revision = revision
+
+    async def _bench_watch(self, histogram: LatencyHistogram | None = None):
         count = 0
-        async for obj in self.watch_all():
+        last = time.perf_counter_ns()
+        stream = self.watch_all()
+        try:
+            async for obj in stream:
+                if histogram is not None:
+                    now = time.perf_counter_ns()
+                    histogram.record_ns(now - last)
+                    last = now
+                self.check_bench_labels(obj.metadata.name, obj.metadata.labels)
+                if self._verifier is not None:
+                    self._verifier.check(obj.metadata.name, obj)
+                count += 1
+                if count == self.benchmark_size:
+                    return
+        finally:
+            # Don't leave the stream open to eat events (and CPU) during the following phases
+            await stream.aclose()
+
+    async def _bench_list(self, limit: int | None, histogram: LatencyHistogram | None = None) -> tuple[float, int]:
+        """List every object, `limit` per page, holding on to all of them like an informer cache would.
+
+        Returns the time to the first object and the peak RSS growth, sampled every RSS_SAMPLE_EVERY objects.
+        """
+        kept = []
+        rss0 = peak = rss_bytes()
+        start = last = time.perf_counter_ns()
+        first = None
+        async for obj in self.list_all(limit):
+            now = time.perf_counter_ns()
+            if first is None:
+                first = (now - start) / 1e9
+            if histogram is not None:
+                histogram.record_ns(now - last)
+            last = now
             self.check_bench_labels(obj.metadata.name, obj.metadata.labels)
-            count += 1
-            if count == self.benchmark_size:
-                return
+            kept.append(obj)
+            if len(kept) % RSS_SAMPLE_EVERY == 0:
+                peak = max(peak, rss_bytes())
+        peak = max(peak, rss_bytes())
+        assert len(kept) == self.benchmark_size, f"listed {len(kept)} of {self.benchmark_size} objects"
+        return first or 0.0, peak - rss0
+
+    async def _bench_open_loop(
+        self, op: Callable[[str], Awaitable[Any]], names: list[str], offsets: list[float],
+        histogram: LatencyHistogram, ramp: float, duration: float,
+    ) -> float:
+        """Send op(name) at start + offset for every name. Returns completions per second within the steady window."""
+        completed: list[int] = []
+
+        async def one(name: str, intended: int):
+            await op(name)
+            done = time.perf_counter_ns()
+            histogram.record_ns(done - intended)
+            completed.append(done)
+
+        tasks = []
+        start = time.perf_counter_ns()
+        for name, offset in zip(names, offsets):
+            intended = start + int(offset * 1e9)
+            delay = (intended - time.perf_counter_ns()) / 1e9
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(one(name, intended)))
+        await asyncio.gather(*tasks)
+
+        lo, hi = start + int(ramp * 1e9), start + int((ramp + duration) * 1e9)
+        return sum(lo <= t < hi for t in completed) / duration
+
+    async def _bench_churn(self, tracker: DeliveryTracker, histogram: LatencyHistogram):
+        """Open-loop writer at `churn_rate` writes/s against one open watch. Each pass creates, annotates or
+        deletes every object, so writes to the same object are len(objects) / churn_rate seconds apart."""
+        tracker.histogram = histogram
+        probe = f"{self.resource_name_prefix}churn-probe"
+        ready = asyncio.Event()
+
+        async def watch():
+            stream = self.watch_events()
+            try:
+                async for event in stream:
+                    if event.name == probe:
+                        ready.set()
+                    else:
+                        tracker.observe(event)
+            finally:
+                await stream.aclose()
+
+        async def write(op: str, name: str, previous: asyncio.Task | None):
+            if previous is not None:
+                await previous
+            async with self.semaphore:
+                if op == "create":
+                    tracker.expect("ADDED", name)
+                    await self.create_one(name)
+                elif op == "delete":
+                    tracker.expect("DELETED", name)
+                    await self.delete_one(name)
+                else:
+                    await self.annotate_one(name, {WRITTEN_AT: tracker.expect("MODIFIED", name)})
+
+        watcher = asyncio.create_task(watch())
+        try:
+            # The watch is surely established once it sees an object created after it was started
+            await self.create_one(probe)
+            await asyncio.wait_for(ready.wait(), CHURN_DRAIN_SECONDS)
+
+            passes = ["create"] + ["update"] * self.churn_updates + ["delete"]
+            schedule = [(op, name) for op in passes for name in self.all_objects_names]
+            last: dict[str, asyncio.Task] = {}
+            start = time.perf_counter()
+            for i, (op, name) in enumerate(schedule):
+                delay = start + i / self.churn_rate - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                last[name] = asyncio.create_task(write(op, name, last.get(name)))
+            await asyncio.gather(*last.values())
+            await tracker.drain()
+        finally:
+            watcher.cancel()
+            await asyncio.gather(watcher, return_exceptions=True)
+            await self.delete_one(probe)
@@ -0,0 +1,91 @@
+"""Write-to-watch-event latency under churn.
+
+A writer creates, annotates and deletes objects at a fixed rate while a watch stays open, and every write is
+matched to the watch event it causes. Updates carry their send time in an annotation, creates and deletes are
+matched by object name.
+"""
+from __future__ import annotations
+
+import time
+import asyncio
+from typing import NamedTuple
+from dataclasses import dataclass, field
+
+from .histogram import LatencyHistogram
+
+WRITTEN_AT = "bench/written-at"  # time.time_ns() the update was sent at
+CHURN_UPDATES = 2
+CHURN_DRAIN_SECONDS = 10.0
+
+
+class WatchEvent(NamedTuple):
+    type: str  # ADDED, MODIFIED or DELETED
+    name: str
+    resource_version: str
+    annotations: dict[str, str] | None
+
+
+@dataclass
+class DeliveryStats:
+    expected: int
+    delivered: int
+    dropped: int     # writes whose event didn't arrive within CHURN_DRAIN_SECONDS after the last write
+    duplicated: int  # events delivered more than once (same object and resourceVersion)
+    foreign: int     # events we didn't cause, e.g. a controller updating status on a real cluster
+
+    @property
+    def summary(self) -> str:
+        return f"{self.delivered}/{self.expected} events delivered, {self.dropped} dropped, " \
+               f"{self.duplicated} duplicated, {self.foreign} foreign"
+
+
+@dataclass
+class DeliveryTracker:
+    """Pairs writes with watch events and records write-to-event latency into `histogram`."""
+    histogram: LatencyHistogram = field(default_factory=LatencyHistogram)
+
+    expected: int = 0
+    delivered: int = 0
+    duplicated: int = 0
+    foreign: int = 0
+    _pending: dict[tuple[str, str, str], int] = field(default_factory=dict)  # (type, name, stamp) -> sent at, ns
+    _seen: set[tuple[str, str]] = field(default_factory=set)
+    _writing: bool = True
+    _drained: asyncio.Event = field(default_factory=asyncio.Event)
+
+    def expect(self, event_type: str, name: str) -> str:
+        """Call right before sending a write. Returns the stamp to put into the WRITTEN_AT annotation of updates."""
+        now = time.time_ns()
+        stamp = str(now) if event_type == "MODIFIED" else ""
+        self._pending[(event_type, name, stamp)] = now
+        self.expected += 1
+        return stamp
+
+    def observe(self, event: WatchEvent):
+        now = time.time_ns()
+        if (event.name, event.resource_version) in self._seen:
+            self.duplicated += 1
+            return
+        self._seen.add((event.name, event.resource_version))
+        stamp = (event.annotations or {}).get(WRITTEN_AT, "") if event.type == "MODIFIED" else ""
+        sent = self._pending.pop((event.type, event.name, stamp), None)
+        if sent is None:
+            self.foreign += 1
+            return
+        self.histogram.record_ns(now - sent)
+        self.delivered += 1
+        if not self._writing and not self._pending:
+            self._drained.set()
+
+    async def drain(self, timeout: float = CHURN_DRAIN_SECONDS):
+        """Wait for the events of all writes sent so far, for up to `timeout` seconds."""
+        self._writing = False
+        if not self._pending:
+            return
+        try:
+            await asyncio.wait_for(self._drained.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def stats(self) -> DeliveryStats:
+        return DeliveryStats(self.expected, self.delivered, len(self._pending), self.duplicated, self.foreign)
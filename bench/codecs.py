@@ -0,0 +1,51 @@
+"""JSON codecs a client's decode path can be switched to, for the codec matrix.
+
+- json: the stdlib decoder, what every client ships with
+- orjson: Rust decoder, to str-keyed dicts and lists like the stdlib one
+- msgspec: msgspec.json.decode without a schema, same output
+
+Only clients that decode into plain dicts can swap the decoder without changing what they hand out, so a client lists
+the ones it supports in `Benchmark.codecs`. Swapping replaces the `json` module a client's code calls into, for the
+whole process, so every codec runs in a process of its own.
+
+Kubernetes' protobuf content type isn't here: none of the clients can decode it, and the fake apiserver serves JSON
+only.
+"""
+from __future__ import annotations
+
+import json
+from typing import Any, Callable
+
+CODECS = ["json", "orjson", "msgspec"]
+
+
+def unavailable(codec: str) -> str | None:
+    """Why `codec` can't run here, or None if it can."""
+    if codec not in CODECS:
+        return f"unknown codec, expected one of {CODECS}"
+    if codec != "json":
+        try:
+            __import__(codec)
+        except ImportError:
+            return f"{codec} is not installed"
+    return None
+
+
+def loads(codec: str) -> Callable[[str | bytes], Any]:
+    if codec == "orjson":
+        import orjson
+        return orjson.loads
+    if codec == "msgspec":
+        import msgspec
+        return msgspec.json.decode
+    return json.loads
+
+
+class JsonModule:
+    """Stands in for the `json` module where a client imported it: `loads` decodes with `codec`, the rest is json's."""
+
+    def __init__(self, codec: str):
+        self.codec = codec
+        self.loads = loads(codec)
+
+    def __getattr__(self, name: str) -> Any: return getattr(json, name)
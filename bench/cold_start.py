@@ -0,0 +1,211 @@
+"""Cold start: what a short-lived process (CLI tool, Job) pays before its first request.
+
+The client import is timed in a bare interpreter (`python -I`) that runs nothing but the client imports of its
+benchmark module, so none of the harness' own dependencies (pandas, yaml, h2) are loaded first and counted out.
+`init_client` (kubeconfig parsing, session setup) and the first GET of an object that already exists are timed in
+another fresh interpreter, with the harness imported before the clock starts. One more bare import under
+`-X importtime` lists the modules that take longest to import.
+
+    python -m bench.cold_start --repeats 5 --clients kubesdk,official
+"""
+from __future__ import annotations
+
+import ast
+import sys
+import json
+import time
+import asyncio
+import argparse
+import importlib
+import importlib.util
+import statistics
+import tempfile
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import pandas as pd
+
+from .benchmark import Benchmark
+from .loops import default_loop, run
+from .profiling import slug
+
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent
+COLD_START_REPEATS = 3
+IMPORT_TOP = 5
+# Printed to stderr right before the client import, -X importtime lines before it belong to interpreter startup
+_MARKER = "bench.cold_start: importing client"
+# Run with `python -I -c`: times executing the import statements in argv[1]
+_BARE_IMPORT = f"""import sys, time
+print({_MARKER!r}, file=sys.stderr, flush=True)
+t0 = time.perf_counter()
+exec(sys.argv[1])
+print(time.perf_counter() - t0)
+"""
+
+
+@dataclass
+class ColdStart:
+    client: str
+    import_s: float
+    init_s: float
+    first_get_s: float
+    process_s: float  # spawn to exit of the init and GET process: interpreter start and all imports included
+    top_imports: list[tuple[str, float]] = field(default_factory=list)  # (module, self ms), slowest first
+
+    @property
+    def to_first_get_s(self) -> float: return self.import_s + self.init_s + self.first_get_s
+
+
+def parse_importtime(stderr: str, top: int = IMPORT_TOP) -> list[tuple[str, float]]:
+    """Modules with the highest self import time (ms) after the marker, from `-X importtime` output."""
+    lines = stderr.splitlines()
+    if _MARKER in lines:
+        lines = lines[lines.index(_MARKER) + 1:]
+    modules = []
+    for line in lines:
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line.removeprefix("import time:").split("|")
+        modules.append((name.strip(), int(self_us) / 1e3))
+    return sorted(modules, key=lambda m: m[1], reverse=True)[:top]
+
+
+def client_imports(module: str) -> str:
+    """A benchmark module's top-level imports of its client: the harness' own modules and the stdlib left out."""
+    tree = ast.parse(Path(importlib.util.find_spec(module).origin).read_text(encoding="utf-8"))
+    imports = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and not node.level:
+            names = [node.module]
+        else:
+            continue
+        if all(name.split(".")[0] not in sys.stdlib_module_names for name in names):
+            imports.append(ast.unparse(node))
+    return "\n".join(imports)
+
+
+async def _bare_import(statements: str, importtime: bool) -> tuple[float, str]:
+    cmd = [sys.executable, "-I", *(["-X", "importtime"] if importtime else []), "-c", _BARE_IMPORT, statements]
+    proc = await asyncio.create_subprocess_exec(*cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+    stdout, stderr = await proc.communicate()
+    if proc.returncode:
+        raise RuntimeError(f"importing the client exited with code {proc.returncode}:\n{stderr.decode()[-2000:]}")
+    return float(stdout), stderr.decode()
+
+
+async def _child(target: str, probe: str, out: str):
+    module, cls_name = target.split(":")
+    bench = getattr(importlib.import_module(module), cls_name)()
+    t0 = time.perf_counter()
+    await bench.init_client()
+    t1 = time.perf_counter()
+    await bench.get_one(probe)
+    t2 = time.perf_counter()
+    Path(out).write_text(json.dumps({"init_s": t1 - t0, "first_get_s": t2 - t1}))
+
+
+async def _spawn(bench_cls: type[Benchmark], probe: str) -> tuple[dict, float]:
+    with tempfile.TemporaryDirectory(prefix="bench_cold_start_") as tmp:
+        out = Path(tmp, "result.json")
+        cmd = [sys.executable, "-m", "bench.cold_start", "--child", f"{bench_cls.__module__}:{bench_cls.__name__}",
+               probe, str(out)]
+        t0 = time.perf_counter()
+        proc = await asyncio.create_subprocess_exec(*cmd, cwd=_PROJECT_ROOT, stderr=asyncio.subprocess.PIPE)
+        _, stderr = await proc.communicate()
+        seconds = time.perf_counter() - t0
+        if not out.exists():
+            raise RuntimeError(f"{bench_cls.__name__} cold start exited with code {proc.returncode}:\n"
+                               f"{stderr.decode()[-2000:]}")
+        return json.loads(out.read_text()), seconds
+
+
+async def measure_cold_start(bench_cls: type[Benchmark], probe: str, repeats: int = COLD_START_REPEATS,
+                             top: int = IMPORT_TOP) -> ColdStart:
+    """Median over `repeats` bare imports and `repeats` fresh processes for init and the first GET, plus one bare
+    import under -X importtime for the breakdown.
+
+    `probe` must be the name of a Deployment that exists, with the benchmark labels.
+    """
+    statements = client_imports(bench_cls.__module__)
+    imports = [(await _bare_import(statements, importtime=False))[0] for _ in range(repeats)]
+    _, stderr = await _bare_import(statements, importtime=True)
+    runs = [await _spawn(bench_cls, probe) for _ in range(repeats)]
+    median = lambda key: statistics.median(r[0][key] for r in runs)
+    return ColdStart(bench_cls.client, statistics.median(imports), median("init_s"), median("first_get_s"),
+                     statistics.median(r[1] for r in runs), parse_importtime(stderr, top))
+
+
+async def run_cold_start(benchmarks: list[type[Benchmark]], probe: str, repeats: int = COLD_START_REPEATS,
+                         output_dir: str | Path | None = None) -> list[ColdStart]:
+    results = []
+    for bench_cls in benchmarks:
+        print(f"Measuring {bench_cls.client} client cold start ({repeats} processes)...")
+        results.append(await measure_cold_start(bench_cls, probe, repeats))
+    if output_dir is not None:
+        out = Path(output_dir) / "cold_start.csv"
+        out.parent.mkdir(parents=True, exist_ok=True)
+        cold_start_to_df(results).to_csv(out)
+        print(f"Saved {out}")
+    return results
+
+
+def cold_start_to_df(results: list[ColdStart]) -> pd.DataFrame:
+    rows = [{
+        "Client": r.client,
+        "Import ms": 1e3 * r.import_s,
+        "Init ms": 1e3 * r.init_s,
+        "First GET ms": 1e3 * r.first_get_s,
+        "To first GET ms": 1e3 * r.to_first_get_s,
+        "Process ms": 1e3 * r.process_s,
+    } for r in results]
+    return pd.DataFrame(rows).set_index("Client")
+
+
+def print_cold_start_results(results: list[ColdStart]) -> None:
+    print("Cold start (fresh process, median; to first GET = import + init + first GET, process = spawn to exit)")
+    with pd.option_context("display.float_format", lambda x: f"{x:.1f}"):
+        print(cold_start_to_df(results).to_string())
+    print("Slowest imports (self time, -X importtime)")
+    for r in results:
+        print(f"  {r.client}: " + ", ".join(f"{name} {ms:.1f} ms" for name, ms in r.top_imports))
+    print("-" * 60)
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Client import, init and first GET times in fresh processes")
+    parser.add_argument("--repeats", type=int, default=COLD_START_REPEATS)
+    parser.add_argument("--clients", help="Comma-separated client names (default: all)")
+    parser.add_argument("--output-dir")
+    parser.add_argument("--child", nargs=3, metavar=("MODULE:CLASS", "PROBE", "OUT"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        # Same loop as the benchmarks, see bench/run.py
+        run(_child(*args.child), default_loop())
+        return
+
+    from .run import BENCHMARKS
+    from ._kubesdk import KubesdkBenchmark
+
+    classes = BENCHMARKS
+    if args.clients:
+        wanted = {slug(c) for c in args.clients.split(",")}
+        classes = [c for c in classes if slug(c.client) in wanted or slug(c.client).split("-")[0] in wanted]
+
+    async def standalone():
+        kubesdk = KubesdkBenchmark()
+        await kubesdk.init_client()
+        probe = f"{kubesdk.resource_name_prefix}cold-start"
+        await kubesdk.create_one(probe)
+        try:
+            print_cold_start_results(await run_cold_start(classes, probe, args.repeats, args.output_dir))
+        finally:
+            await kubesdk.delete_one(probe)
+
+    run(standalone(), default_loop())
+
+
+if __name__ == "__main__":
+    main()
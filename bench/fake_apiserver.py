@@ -0,0 +1,954 @@
+"""Tiny in-memory stand-in for the kube-apiserver apps/v1 Deployments endpoints.
+
+It keeps the benchmark away from etcd and apiserver admission latency, so what we measure is the client itself.
+Run it standalone with `python -m bench.fake_apiserver` or let `bench.run.run(fake_apiserver=True)` spawn it.
+
+It speaks HTTP/1.1 and, when the h2 package is installed, HTTP/2: negotiated with ALPN over TLS (`--tls` makes a
+throwaway self-signed certificate) or with prior knowledge over plain TCP. Connections opened, TLS handshakes and the
+connections that served requests are counted, and served at STATS_PATH for the benchmark to read per phase.
+
+Faults (throttling, 5xx, slow responses, connection resets) can be switched on and off at FAULTS_PATH, see
+bench/faults.py.
+"""
+from __future__ import annotations
+
+import os
+import sys
+import socket
+import struct
+import random
+import ssl
+import json
+import uuid
+import base64
+import asyncio
+import argparse
+import tempfile
+import subprocess
+import contextlib
+import urllib.request
+from collections import deque
+from dataclasses import dataclass, field, asdict
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator
+from urllib.parse import urlsplit, parse_qs
+
+import yaml
+
+from .faults import FaultProfile, RequestStats, parse_profile
+
+try:
+    import h2.config
+    import h2.events
+    import h2.settings
+    import h2.connection
+    import h2.exceptions
+except ImportError:  # HTTP/1.1 only
+    h2 = None
+
+DEPLOYMENTS_PREFIX = "/apis/apps/v1/namespaces/"
+EVENT_HISTORY_SIZE = 200_000
+# The benchmark's own requests: not counted in the stats, never faulted
+DEBUG_PREFIX = "/debug/"
+STATS_PATH = DEBUG_PREFIX + "connections"
+# GET: RequestStats since the last PUT. PUT: a FaultProfile's fields to inject, {} to stop
+FAULTS_PATH = DEBUG_PREFIX + "faults"
+FAULTS_SEED = 0
+# kube-apiserver's --http2-max-streams-per-connection default
+H2_MAX_STREAMS = 1000
+_H2_PREFACE_LINE = b"PRI * HTTP/2.0\r\n"
+# HTTP versions for the transport matrix, see `Benchmark.transports`
+TRANSPORTS = ["http1", "http2"]
+
+_REASONS = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            409: "Conflict", 410: "Gone", 415: "Unsupported Media Type", 422: "Unprocessable Entity",
+            429: "Too Many Requests", 500: "Internal Server Error"}
+
+
+class ApiError(Exception):
+    def __init__(self, code: int, reason: str, message: str, headers: tuple[tuple[str, str], ...] = ()):
+        super().__init__(message)
+        self.code, self.reason, self.message, self.headers = code, reason, message, headers
+
+    def to_status(self) -> dict:
+        return {"kind": "Status", "apiVersion": "v1", "metadata": {}, "status": "Failure",
+                "message": self.message, "reason": self.reason, "code": self.code}
+
+
+def _now() -> str: return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _dumps(obj) -> bytes: return json.dumps(obj, separators=(",", ":")).encode()
+
+
+def _parse_selector(selector: str | None) -> list[tuple[str, str, str | None]]:
+    """Equality-based selector terms as (key, op, value): `k=v`, `k==v`, `k!=v`, `k` (exists) and `!k`. Set-based
+    ones (`k in (a,b)`) aren't supported and get a 400 rather than matching something else."""
+    if not selector:
+        return []
+    out = []
+    for term in selector.split(","):
+        term = term.strip()
+        if not term:
+            continue
+        if "!=" in term:
+            k, _, v = term.partition("!=")
+            op = "!="
+        elif "=" in term:
+            k, _, v = term.partition("=")
+            op, v = "=", v.removeprefix("=")
+        else:
+            op, k, v = ("!", term[1:], None) if term.startswith("!") else ("exists", term, None)
+        k = k.strip()
+        if not k or any(c in k for c in " ()=!") or (v is not None and any(c in v for c in " ()=!")):
+            raise ApiError(400, "BadRequest", f"unable to parse requirement: {term!r}")
+        out.append((k, op, v.strip() if v is not None else None))
+    return out
+
+
+def merge_patch(target, patch):
+    """RFC 7396 JSON merge patch."""
+    if not isinstance(patch, dict):
+        return patch
+    out = dict(target) if isinstance(target, dict) else {}
+    for k, v in patch.items():
+        if v is None:
+            out.pop(k, None)
+        else:
+            out[k] = merge_patch(out.get(k), v)
+    return out
+
+
+def strategic_merge_patch(target, patch):
+    """Strategic merge patch, roughly: like a merge patch, but lists of objects with a `name` (containers, env,
+    volumes) are merged item by item. Other lists are replaced and $-directives are ignored."""
+    if isinstance(patch, list) and isinstance(target, list) and all(
+            isinstance(i, dict) and "name" in i for i in patch + target):
+        out = list(target)
+        index = {item["name"]: i for i, item in enumerate(out)}
+        for item in patch:
+            if item["name"] in index:
+                out[index[item["name"]]] = strategic_merge_patch(out[index[item["name"]]], item)
+            else:
+                out.append(item)
+        return out
+    if not isinstance(patch, dict):
+        return patch
+    out = dict(target) if isinstance(target, dict) else {}
+    for k, v in patch.items():
+        if k.startswith("$"):
+            continue
+        if v is None:
+            out.pop(k, None)
+        else:
+            out[k] = strategic_merge_patch(out.get(k), v)
+    return out
+
+
+def json_patch(target, ops: list[dict]):
+    """RFC 6902 JSON patch: add, remove, replace and test."""
+    doc = json.loads(json.dumps(target))
+    for op in ops:
+        *parents, last = [p.replace("~1", "/").replace("~0", "~") for p in op["path"].split("/")[1:]]
+        parent = doc
+        try:
+            for p in parents:
+                parent = parent[int(p)] if isinstance(parent, list) else parent[p]
+            if isinstance(parent, list):
+                last = len(parent) if last == "-" else int(last)
+            if op["op"] == "test":
+                if parent[last] != op["value"]:
+                    raise ApiError(422, "Invalid", f"the server rejected our request due to an error in our request: "
+                                                   f"test failed at {op['path']}")
+            elif op["op"] == "remove":
+                del parent[last]
+            elif op["op"] == "add" and isinstance(parent, list):
+                parent.insert(last, op["value"])
+            elif op["op"] in ("add", "replace"):
+                if op["op"] == "replace":
+                    parent[last]  # must exist
+                parent[last] = op["value"]
+            else:
+                raise ApiError(422, "Invalid", f"unsupported JSON patch operation: {op['op']}")
+        except (KeyError, IndexError, ValueError, TypeError):
+            raise ApiError(422, "Invalid", f"the server rejected our request due to an error in our request: "
+                                           f"path {op['path']} does not exist") from None
+    return doc
+
+
+# Content-Type -> how PATCH applies the body. Server-side apply is approximated by a strategic merge of the
+# applied configuration, without field ownership tracking.
+APPLY_PATCH = "application/apply-patch+yaml"
+PATCH_TYPES = {
+    "application/merge-patch+json": merge_patch,
+    "application/strategic-merge-patch+json": strategic_merge_patch,
+    "application/json-patch+json": json_patch,
+    APPLY_PATCH: strategic_merge_patch,
+}
+
+
+def _matches(labels: dict | None, selector: list[tuple[str, str, str | None]]) -> bool:
+    labels = labels or {}
+    for k, op, v in selector:
+        if op == "=" and labels.get(k) != v or op == "!=" and labels.get(k) == v \
+                or op == "exists" and k not in labels or op == "!" and k in labels:
+            return False
+    return True
+
+
+@dataclass
+class _Stored:
+    obj: dict
+    raw: bytes
+    _item: bytes | None = None
+
+    @property
+    def item(self) -> bytes:
+        """The object as a list item: like the real apiserver, without apiVersion and kind."""
+        if self._item is None:
+            self._item = _dumps({k: v for k, v in self.obj.items() if k not in ("apiVersion", "kind")})
+        return self._item
+
+
+@dataclass
+class DeploymentStore:
+    """Deployments keyed by (namespace, name) with a global resourceVersion and a bounded event log for watches."""
+    resource_version: int = 0
+    objects: dict[tuple[str, str], _Stored] = field(default_factory=dict)
+    history: deque[tuple[int, str, bytes]] = field(default_factory=lambda: deque(maxlen=EVENT_HISTORY_SIZE))
+    watchers: set[asyncio.Queue] = field(default_factory=set)
+
+    def _bump(self) -> str:
+        self.resource_version += 1
+        return str(self.resource_version)
+
+    def _emit(self, event_type: str, namespace: str, stored: _Stored):
+        rv = self.resource_version
+        event = b'{"type":"' + event_type.encode() + b'","object":' + stored.raw + b"}\n"
+        self.history.append((rv, namespace, event))
+        for queue in self.watchers:
+            queue.put_nowait((namespace, stored.obj, event))
+
+    def create(self, namespace: str, obj: dict) -> _Stored:
+        meta = obj.setdefault("metadata", {})
+        name = meta.get("name")
+        if not name:
+            raise ApiError(422, "Invalid", "metadata.name: Required value")
+        if (namespace, name) in self.objects:
+            raise ApiError(409, "AlreadyExists", f'deployments.apps "{name}" already exists')
+        obj["apiVersion"], obj["kind"] = "apps/v1", "Deployment"
+        meta.update(namespace=namespace, uid=str(uuid.uuid4()), resourceVersion=self._bump(),
+                    generation=1, creationTimestamp=_now())
+        obj.setdefault("status", {})
+        stored = self.objects[(namespace, name)] = _Stored(obj, _dumps(obj))
+        self._emit("ADDED", namespace, stored)
+        return stored
+
+    def get(self, namespace: str, name: str) -> _Stored:
+        try:
+            return self.objects[(namespace, name)]
+        except KeyError:
+            raise ApiError(404, "NotFound", f'deployments.apps "{name}" not found') from None
+
+    def patch(self, namespace: str, name: str, patch: dict | list, apply=merge_patch) -> _Stored:
+        current = self.get(namespace, name).obj
+        return self._update(namespace, current, apply(current, patch))
+
+    def replace(self, namespace: str, name: str, obj: dict) -> _Stored:
+        current = self.get(namespace, name).obj
+        meta = obj.get("metadata") or {}
+        if meta.get("name") != name:
+            raise ApiError(400, "BadRequest", "the name of the object does not match the name on the URL")
+        if meta.get("resourceVersion") not in (None, "", current["metadata"]["resourceVersion"]):
+            raise ApiError(409, "Conflict", f'Operation cannot be fulfilled on deployments.apps "{name}": the object '
+                                            f'has been modified; please apply your changes to the latest version and '
+                                            f'try again')
+        # Status is a subresource, PUT on the object leaves it alone
+        return self._update(namespace, current, {**obj, "status": current.get("status", {})})
+
+    def _update(self, namespace: str, current: dict, obj: dict) -> _Stored:
+        meta = obj["metadata"] = dict(obj.get("metadata") or {})
+        for k in ("name", "namespace", "uid", "creationTimestamp"):
+            meta[k] = current["metadata"][k]
+        meta["generation"] = current["metadata"].get("generation", 1)
+        if obj.get("spec") != current.get("spec"):
+            meta["generation"] += 1
+        meta["resourceVersion"] = self._bump()
+        obj["apiVersion"], obj["kind"] = "apps/v1", "Deployment"
+        stored = self.objects[(meta["namespace"], meta["name"])] = _Stored(obj, _dumps(obj))
+        self._emit("MODIFIED", namespace, stored)
+        return stored
+
+    def delete(self, namespace: str, name: str) -> _Stored:
+        stored = self.get(namespace, name)
+        del self.objects[(namespace, name)]
+        stored.obj["metadata"]["resourceVersion"] = self._bump()
+        stored = _Stored(stored.obj, _dumps(stored.obj))
+        self._emit("DELETED", namespace, stored)
+        return stored
+
+    def select(self, namespace: str, selector: str | None = None, field_selector: str | None = None) -> list[_Stored]:
+        terms = _parse_selector(selector)
+        # Only metadata.name, which is what clients use to get a single object through a list (kr8s does)
+        name = next((v for k, op, v in _parse_selector(field_selector) if k == "metadata.name" and op == "="), None)
+        if name is not None:
+            items = [s] if (s := self.objects.get((namespace, name))) is not None else []
+        else:
+            items = [s for (ns, _), s in self.objects.items() if ns == namespace]
+            items.sort(key=lambda s: s.obj["metadata"]["name"])
+        return [s for s in items if _matches(s.obj["metadata"].get("labels"), terms)]
+
+    def expired(self, resource_version: int) -> bool:
+        """Whether events after resource_version have already dropped out of the log."""
+        return bool(self.history) and self.history[0][0] > resource_version + 1 and resource_version < self.resource_version
+
+    def events_since(self, namespace: str, resource_version: int) -> list[bytes]:
+        if self.expired(resource_version):
+            raise ApiError(410, "Expired", f"too old resource version: {resource_version}")
+        return [event for rv, ns, event in self.history if rv > resource_version and ns == namespace]
+
+
+@dataclass
+class ConnectionStats:
+    opened: int = 0
+    tls_handshakes: int = 0
+    http2: int = 0  # of the opened ones
+    open: int = 0
+    # Connections that served at least one request since the last reset. Idle pools other clients left open don't
+    # count
+    used: int = 0
+    used_http2: int = 0  # of the used ones
+
+    def since(self, before: ConnectionStats) -> ConnectionStats:
+        """What happened between `before` and these: opened counts are differences, the rest are these."""
+        return ConnectionStats(self.opened - before.opened, self.tls_handshakes - before.tls_handshakes,
+                               self.http2 - before.http2, self.open, self.used, self.used_http2)
+
+    @property
+    def summary(self) -> str:
+        return f"{self.opened} connections opened ({self.http2} HTTP/2), {self.tls_handshakes} TLS handshakes, " \
+               f"{self.used} used"
+
+
+def transport_unavailable(transport: str) -> str | None:
+    """Why `transport` can't run here, or None if it can."""
+    if transport not in TRANSPORTS:
+        return f"unknown transport, expected one of {TRANSPORTS}"
+    if transport == "http2" and h2 is None:
+        return "h2 is not installed"
+    return None
+
+
+def _debug_request(server_url: str, path: str, body: object = None) -> dict:
+    ctx = ssl._create_unverified_context() if server_url.startswith("https") else None
+    data = None if body is None else json.dumps(body).encode()
+    req = urllib.request.Request(server_url + path, data, method="GET" if body is None else "PUT")
+    with urllib.request.urlopen(req, context=ctx, timeout=10) as resp:
+        return json.loads(resp.read())
+
+
+def read_connection_stats(server_url: str, reset: bool = False) -> ConnectionStats:
+    """The fake apiserver's connection counters. `reset` starts counting used connections from zero."""
+    return ConnectionStats(**_debug_request(server_url, STATS_PATH + ("?reset=1" if reset else "")))
+
+
+def set_faults(server_url: str, profile: FaultProfile | None) -> RequestStats:
+    """Inject `profile`'s faults from now on (None: none) and start counting requests over. Returns the counts up to
+    now."""
+    return RequestStats(**_debug_request(server_url, FAULTS_PATH, asdict(profile) if profile else {}))
+
+
+def self_signed_cert(directory: str, host: str = "127.0.0.1") -> tuple[str, str]:
+    """Write a throwaway certificate and key for `host` to `directory` and return their paths."""
+    import ipaddress
+    from cryptography import x509
+    from cryptography.x509.oid import NameOID
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "fake-apiserver")])
+    now = datetime.now(timezone.utc)
+    cert = (x509.CertificateBuilder().subject_name(name).issuer_name(name).public_key(key.public_key())
+            .serial_number(x509.random_serial_number()).not_valid_before(now - timedelta(minutes=5))
+            .not_valid_after(now + timedelta(days=1))
+            .add_extension(x509.SubjectAlternativeName([x509.IPAddress(ipaddress.ip_address(host))]), critical=False)
+            .sign(key, hashes.SHA256()))
+    certfile, keyfile = os.path.join(directory, "apiserver.crt"), os.path.join(directory, "apiserver.key")
+    with open(certfile, "wb") as f:
+        f.write(cert.public_bytes(serialization.Encoding.PEM))
+    with open(keyfile, "wb") as f:
+        f.write(key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                  serialization.NoEncryption()))
+    return certfile, keyfile
+
+
+def _split_target(target: str) -> tuple[str, dict[str, str]]:
+    url = urlsplit(target)
+    path = url.path.rstrip("/") or "/"  # kr8s likes trailing slashes
+    return path, {k: v[-1] for k, v in parse_qs(url.query).items()}
+
+
+def _watch_error(query: dict[str, str]) -> ApiError | None:
+    """What's wrong with a watch request, checked before its 200 goes out. A bad watch is then answered like the
+    list, which fails the same way."""
+    try:
+        _parse_selector(query.get("labelSelector"))
+    except ApiError as e:
+        return e
+    return None
+
+
+def _is_watch(method: str, query: dict[str, str]) -> bool:
+    return method == "GET" and query.get("watch", "").lower() in ("1", "true")
+
+
+@dataclass
+class FakeApiServer:
+    """apps/v1 Deployments over HTTP/1.1 and HTTP/2 with an in-memory store. `latency` delays every non-watch
+    response."""
+    host: str = "127.0.0.1"
+    port: int = 0
+    latency: float = 0.0
+    certfile: str | None = None
+    keyfile: str | None = None
+    store: DeploymentStore = field(default_factory=DeploymentStore)
+    connections: ConnectionStats = field(default_factory=ConnectionStats)
+    faults: FaultProfile | None = None
+    requests: RequestStats = field(default_factory=RequestStats)
+    # Bumped by every stats reset
+    _epoch: int = field(default=0, init=False, repr=False)
+    _rng: random.Random = field(default_factory=lambda: random.Random(FAULTS_SEED), init=False, repr=False)
+
+    async def serve(self, ready=None):
+        ssl_ctx = None
+        if self.certfile:
+            ssl_ctx = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+            ssl_ctx.load_cert_chain(self.certfile, self.keyfile)
+            ssl_ctx.set_alpn_protocols(["h2", "http/1.1"] if h2 is not None else ["http/1.1"])
+        server = await asyncio.start_server(self._handle_connection, self.host, self.port, ssl=ssl_ctx, backlog=4096)
+        self.port = server.sockets[0].getsockname()[1]
+        if ready is not None:
+            ready(self)
+        async with server:
+            await server.serve_forever()
+
+    @property
+    def url(self) -> str: return f"{'https' if self.certfile else 'http'}://{self.host}:{self.port}"
+
+    def _count_connection(self, tls: bool, http2: bool):
+        conns = self.connections
+        conns.opened += 1
+        conns.tls_handshakes += tls
+        conns.http2 += http2
+        conns.open += 1
+
+    def use(self, epoch: int, http2: bool = False) -> int:
+        """Count a connection last used in `epoch` as used, once per reset. Returns the epoch to remember."""
+        if epoch != self._epoch:
+            self.connections.used += 1
+            self.connections.used_http2 += http2
+        return self._epoch
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        tls = writer.get_extra_info("ssl_object") is not None
+        # Counted at the first request, once it's clear this isn't the benchmark reading the stats
+        counted = False
+        epoch = -1
+        try:
+            if tls and writer.get_extra_info("ssl_object").selected_alpn_protocol() == "h2":
+                self._count_connection(tls, http2=True)
+                counted = True
+                await _H2Session(self, reader, writer).run()
+                return
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    return
+                if not counted and request_line == _H2_PREFACE_LINE and h2 is not None:
+                    # HTTP/2 with prior knowledge, no TLS
+                    self._count_connection(tls, http2=True)
+                    counted = True
+                    await _H2Session(self, reader, writer).run(request_line + await reader.readexactly(8))
+                    return
+                method, target, _ = request_line.decode("latin-1").split(" ", 2)
+                if not counted and not target.startswith(DEBUG_PREFIX):
+                    self._count_connection(tls, http2=False)
+                    counted = True
+                headers: dict[str, str] = {}
+                while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    k, _, v = line.decode("latin-1").partition(":")
+                    headers[k.strip().lower()] = v.strip()
+                body = await self._read_body(reader, headers)
+                keep_alive = headers.get("connection", "").lower() != "close"
+                if counted:
+                    epoch = self.use(epoch)
+                if not await self._dispatch(method, target, headers, body, writer):
+                    return
+                if not keep_alive:
+                    return
+        except _Reset:
+            _reset(writer)
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError, RuntimeError):
+            pass
+        finally:
+            if counted:
+                self.connections.open -= 1
+            writer.close()
+
+    @staticmethod
+    async def _read_body(reader: asyncio.StreamReader, headers: dict[str, str]) -> bytes:
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while size := int((await reader.readline()).split(b";")[0], 16):
+                chunks.append(await reader.readexactly(size))
+                await reader.readline()
+            await reader.readline()
+            return b"".join(chunks)
+        length = int(headers.get("content-length") or 0)
+        return await reader.readexactly(length) if length else b""
+
+    @staticmethod
+    def _write(writer: asyncio.StreamWriter, code: int, body: bytes, content_type: str = "application/json",
+               headers: tuple[tuple[str, str], ...] = ()):
+        extra = "".join(f"{k}: {v}\r\n" for k, v in headers)
+        writer.write(
+            f"HTTP/1.1 {code} {_REASONS.get(code, 'Unknown')}\r\n"
+            f"Content-Type: {content_type}\r\nContent-Length: {len(body)}\r\n{extra}\r\n".encode() + body)
+
+    async def _dispatch(self, method: str, target: str, headers: dict[str, str], body: bytes,
+                        writer: asyncio.StreamWriter) -> bool:
+        """Serve one request. Returns False if the connection was consumed (watch) and must not be reused."""
+        path, query = _split_target(target)
+        if _is_watch(method, query) and not _watch_error(query):
+            await self._watch(path, query, writer)
+            return False
+        code, payload, extra = await self.respond(method, path, query, body, headers.get("content-type", ""))
+        self._write(writer, code, payload, headers=extra)
+        await writer.drain()
+        return True
+
+    async def respond(self, method: str, path: str, query: dict[str, str], body: bytes, content_type: str = ""
+                      ) -> tuple[int, bytes, tuple[tuple[str, str], ...]]:
+        """Status, body and extra headers. Raises _Reset if the connection is to be reset instead."""
+        try:
+            if not path.startswith(DEBUG_PREFIX):
+                self.requests.requests += 1
+                if self.faults is not None:
+                    await self._inject(self.faults)
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            code, payload = self.route(method, path, query, body, content_type)
+            return code, payload, ()
+        except ApiError as e:
+            return e.code, _dumps(e.to_status()), e.headers
+
+    async def _inject(self, faults: FaultProfile):
+        stats, roll = self.requests, self._rng.random()
+        if (roll := roll - faults.reset) < 0:
+            stats.resets += 1
+            raise _Reset()
+        if (roll := roll - faults.throttle) < 0:
+            stats.throttled += 1
+            raise ApiError(429, "TooManyRequests", "Too many requests, please try again later.",
+                           (("retry-after", f"{faults.retry_after:.0f}"),))
+        if (roll := roll - faults.server_error) < 0:
+            stats.server_errors += 1
+            raise ApiError(500, "InternalError", "Internal error occurred: etcdserver: request timed out")
+        if roll - faults.slow < 0:
+            stats.slowed += 1
+            await asyncio.sleep(faults.slow_seconds)
+
+    def route(self, method: str, path: str, query: dict[str, str], body: bytes, content_type: str = ""
+              ) -> tuple[int, bytes]:
+        if path.startswith(DEPLOYMENTS_PREFIX):
+            namespace, _, rest = path[len(DEPLOYMENTS_PREFIX):].partition("/")
+            resource, _, name = rest.partition("/")
+            if resource == "deployments" and "/" not in name:
+                return self._deployments(method, namespace, name, query, body, content_type)
+        elif path == STATS_PATH:
+            stats = _dumps(asdict(self.connections))
+            if query.get("reset"):
+                self.connections.used = self.connections.used_http2 = 0
+                self._epoch += 1
+            return 200, stats
+        elif path == FAULTS_PATH:
+            stats = _dumps(asdict(self.requests))
+            if method == "PUT":
+                fields = json.loads(body)
+                self.faults = FaultProfile(**fields) if fields else None
+                self.requests = RequestStats()
+            return 200, stats
+        elif path == "/version":
+            return 200, _dumps({"major": "1", "minor": "34", "gitVersion": "v1.34.0-fake", "platform": "linux/amd64"})
+        elif path == "/api":
+            return 200, _dumps({"kind": "APIVersions", "versions": ["v1"], "serverAddressByClientCIDRs": []})
+        elif path == "/apis":
+            return 200, _dumps({"kind": "APIGroupList", "apiVersion": "v1", "groups": [{
+                "name": "apps", "versions": [{"groupVersion": "apps/v1", "version": "v1"}],
+                "preferredVersion": {"groupVersion": "apps/v1", "version": "v1"}}]})
+        elif path == "/apis/apps/v1":
+            return 200, _dumps({"kind": "APIResourceList", "apiVersion": "v1", "groupVersion": "apps/v1", "resources": [{
+                "name": "deployments", "singularName": "deployment", "namespaced": True, "kind": "Deployment",
+                "verbs": ["create", "delete", "deletecollection", "get", "list", "patch", "update", "watch"],
+                "shortNames": ["deploy"]}]})
+        elif path == "/api/v1":
+            return 200, _dumps({"kind": "APIResourceList", "groupVersion": "v1", "resources": []})
+        elif path == "/apis/authentication.k8s.io/v1/selfsubjectreviews" and method == "POST":
+            # kubesdk asks who it is on login
+            return 201, _dumps({"apiVersion": "authentication.k8s.io/v1", "kind": "SelfSubjectReview",
+                                "metadata": {"creationTimestamp": None},
+                                "status": {"userInfo": {"username": "bench", "groups": ["system:authenticated"]}}})
+        raise ApiError(404, "NotFound", f"the server could not find the requested resource ({path})")
+
+    def _deployments(self, method: str, namespace: str, name: str, query: dict[str, str], body: bytes,
+                     content_type: str = ""):
+        store = self.store
+        if not name:
+            if method == "GET":
+                return 200, self._list(namespace, query)
+            if method == "POST":
+                return 201, store.create(namespace, json.loads(body)).raw
+            if method == "DELETE":
+                deleted = [store.delete(namespace, s.obj["metadata"]["name"])
+                           for s in store.select(namespace, query.get("labelSelector"))]
+                return 200, self._list_bytes(deleted, str(store.resource_version))
+        else:
+            if method == "GET":
+                return 200, store.get(namespace, name).raw
+            if method == "PUT":
+                return 200, store.replace(namespace, name, json.loads(body)).raw
+            if method == "PATCH":
+                return self._patch(namespace, name, query, body, content_type)
+            if method == "DELETE":
+                stored = store.delete(namespace, name)
+                meta = stored.obj["metadata"]
+                return 200, _dumps({"kind": "Status", "apiVersion": "v1", "metadata": {}, "status": "Success",
+                                    "details": {"name": meta["name"], "group": "apps", "kind": "deployments",
+                                                "uid": meta["uid"]}})
+        raise ApiError(405, "MethodNotAllowed", f"{method} is not supported on this resource")
+
+    def _patch(self, namespace: str, name: str, query: dict[str, str], body: bytes, content_type: str):
+        store = self.store
+        patch_type = content_type.split(";")[0].strip()
+        if patch_type not in PATCH_TYPES:
+            raise ApiError(415, "UnsupportedMediaType", f"the body of the request was in an unknown format - accepted "
+                                                        f"media types include: {', '.join(PATCH_TYPES)}")
+        if patch_type != APPLY_PATCH:
+            return 200, store.patch(namespace, name, json.loads(body), PATCH_TYPES[patch_type]).raw
+
+        if not query.get("fieldManager"):
+            raise ApiError(422, "Invalid", 'PatchOptions.meta.k8s.io "" is invalid: fieldManager: Required value: '
+                                           'is required for apply patch')
+        try:
+            config = json.loads(body)  # JSON is YAML, and parsing it as such is a lot faster
+        except ValueError:
+            config = yaml.safe_load(body)
+        if (config.get("apiVersion"), config.get("kind")) != ("apps/v1", "Deployment"):
+            raise ApiError(400, "BadRequest", f"invalid object type: {config.get('apiVersion')}, "
+                                              f"Kind={config.get('kind')}")
+        if (namespace, name) not in store.objects:
+            return 201, store.create(namespace, config).raw
+        return 200, store.patch(namespace, name, config, strategic_merge_patch).raw
+
+    def _list(self, namespace: str, query: dict[str, str]) -> bytes:
+        store = self.store
+        items = store.select(namespace, query.get("labelSelector"), query.get("fieldSelector"))
+        if cont := query.get("continue"):
+            # Like the real apiserver's: the list's resourceVersion and the last name served, expiring with the log
+            try:
+                token = json.loads(base64.urlsafe_b64decode(cont.encode()))
+                rv, after = int(token["rv"]), token["start"]
+            except (ValueError, KeyError, TypeError):
+                raise ApiError(400, "BadRequest", "continue key is not valid") from None
+            if store.expired(rv):
+                raise ApiError(410, "Expired", "The provided continue parameter is too old to display a consistent "
+                                               "list result. You can start a new list without the continue parameter.")
+            items = [s for s in items if s.obj["metadata"]["name"] > after]
+        limit = int(query.get("limit") or 0)
+        next_token = None
+        if limit and len(items) > limit:
+            items = items[:limit]
+            next_token = base64.urlsafe_b64encode(_dumps({"rv": store.resource_version,
+                                                          "start": items[-1].obj["metadata"]["name"]})).decode()
+        return self._list_bytes(items, str(store.resource_version), next_token)
+
+    @staticmethod
+    def _list_bytes(items: list[_Stored], resource_version: str, next_token: str | None = None) -> bytes:
+        meta = {"resourceVersion": resource_version}
+        if next_token:
+            meta["continue"] = next_token
+        head = _dumps({"kind": "DeploymentList", "apiVersion": "apps/v1", "metadata": meta})[:-1]
+        return head + b',"items":[' + b",".join(s.item for s in items) + b"]}"
+
+    async def _watch(self, path: str, query: dict[str, str], writer: asyncio.StreamWriter):
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nTransfer-Encoding: chunked\r\n\r\n")
+        async with contextlib.aclosing(self.watch_batches(path, query)) as batches:
+            async for batch in batches:
+                if writer.is_closing():
+                    return
+                for event in batch:
+                    writer.write(b"%x\r\n%s\r\n" % (len(event), event))
+                await writer.drain()
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    async def watch_batches(self, path: str, query: dict[str, str]) -> AsyncIterator[list[bytes]]:
+        """Watch events, one line each: the replay, then whatever arrived while the previous batch was sent. Ends
+        after the request's timeoutSeconds, if any."""
+        store = self.store
+        namespace = path[len(DEPLOYMENTS_PREFIX):].partition("/")[0] if path.startswith(DEPLOYMENTS_PREFIX) else ""
+        selector = _parse_selector(query.get("labelSelector"))
+        timeout = float(query.get("timeoutSeconds") or 0) or None
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout if timeout else None
+
+        queue: asyncio.Queue = asyncio.Queue()
+        store.watchers.add(queue)
+        try:
+            rv = query.get("resourceVersion")
+            try:
+                if rv and rv != "0":
+                    replay = store.events_since(namespace, int(rv))
+                    if selector:
+                        replay = [e for e in replay
+                                  if _matches(json.loads(e)["object"]["metadata"].get("labels"), selector)]
+                else:
+                    replay = [b'{"type":"ADDED","object":' + s.raw + b"}\n"
+                              for s in store.select(namespace) if _matches(s.obj["metadata"].get("labels"), selector)]
+            except ApiError as e:
+                replay = [_dumps({"type": "ERROR", "object": e.to_status()}) + b"\n"]
+            yield replay
+
+            while True:
+                try:
+                    item = await asyncio.wait_for(queue.get(), deadline - loop.time() if deadline else None)
+                except asyncio.TimeoutError:
+                    return
+                batch = []
+                while True:
+                    ns, obj, event = item
+                    if ns == namespace and _matches(obj["metadata"].get("labels"), selector):
+                        batch.append(event)
+                    if queue.empty():
+                        break
+                    item = queue.get_nowait()
+                if batch:
+                    yield batch
+        finally:
+            store.watchers.discard(queue)
+
+
+class _Reset(Exception):
+    """Fault injection: reset the connection instead of answering."""
+
+
+def _reset(writer: asyncio.StreamWriter):
+    sock = writer.get_extra_info("socket")
+    if sock is not None:
+        # Zero linger: close() sends RST rather than FIN
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+    writer.transport.abort()
+
+
+class _H2Session:
+    """One HTTP/2 connection. Every stream is served by a task of its own, so requests multiplex the way they would
+    on the apiserver; responses respect the client's flow-control windows."""
+
+    def __init__(self, server: FakeApiServer, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.server, self.reader, self.writer = server, reader, writer
+        self.conn = h2.connection.H2Connection(h2.config.H2Configuration(client_side=False, header_encoding="utf-8"))
+        self.requests: dict[int, tuple[dict[str, str], bytearray]] = {}
+        self.tasks: dict[int, asyncio.Task] = {}
+        self.epoch = -1
+        # Set whenever the client grants more window
+        self.window = asyncio.Event()
+
+    def flush(self):
+        if data := self.conn.data_to_send():
+            self.writer.write(data)
+
+    async def run(self, preface: bytes = b""):
+        self.conn.initiate_connection()
+        self.conn.update_settings({h2.settings.SettingCodes.MAX_CONCURRENT_STREAMS: H2_MAX_STREAMS})
+        self.flush()
+        data = preface
+        try:
+            while True:
+                if data:
+                    for event in self.conn.receive_data(data):
+                        self._on_event(event)
+                    self.flush()
+                    await self.writer.drain()
+                if not (data := await self.reader.read(65536)):
+                    return
+        except h2.exceptions.ProtocolError:
+            self.flush()
+        finally:
+            for task in self.tasks.values():
+                task.cancel()
+
+    def _on_event(self, event):
+        if isinstance(event, h2.events.RequestReceived):
+            self.requests[event.stream_id] = (dict(event.headers), bytearray())
+        elif isinstance(event, h2.events.DataReceived):
+            if request := self.requests.get(event.stream_id):
+                request[1].extend(event.data)
+            self.conn.acknowledge_received_data(event.flow_controlled_length, event.stream_id)
+        elif isinstance(event, h2.events.StreamEnded):
+            if request := self.requests.pop(event.stream_id, None):
+                self.tasks[event.stream_id] = asyncio.create_task(self._serve(event.stream_id, *request))
+        elif isinstance(event, (h2.events.WindowUpdated, h2.events.RemoteSettingsChanged)):
+            self.window.set()
+        elif isinstance(event, h2.events.StreamReset):
+            self.requests.pop(event.stream_id, None)
+            if task := self.tasks.pop(event.stream_id, None):
+                task.cancel()
+        elif isinstance(event, h2.events.ConnectionTerminated):
+            raise ConnectionError("client closed the HTTP/2 connection")
+
+    async def _serve(self, stream_id: int, headers: dict[str, str], body: bytearray):
+        server = self.server
+        self.epoch = server.use(self.epoch, http2=True)
+        try:
+            path, query = _split_target(headers[":path"])
+            if _is_watch(headers[":method"], query) and not _watch_error(query):
+                self.conn.send_headers(stream_id, [(":status", "200"), ("content-type", "application/json")])
+                async with contextlib.aclosing(server.watch_batches(path, query)) as batches:
+                    async for batch in batches:
+                        await self._send_data(stream_id, b"".join(batch))
+                await self._send_data(stream_id, b"", end=True)
+                return
+            code, payload, extra = await server.respond(headers[":method"], path, query, bytes(body),
+                                                        headers.get("content-type", ""))
+            self.conn.send_headers(stream_id, [(":status", str(code)), ("content-type", "application/json"),
+                                               ("content-length", str(len(payload))), *extra])
+            await self._send_data(stream_id, payload, end=True)
+        except _Reset:
+            # The whole connection, every stream on it with it
+            _reset(self.writer)
+        except (ConnectionError, h2.exceptions.StreamClosedError):
+            pass
+        finally:
+            self.tasks.pop(stream_id, None)
+
+    async def _send_data(self, stream_id: int, data: bytes, end: bool = False):
+        conn = self.conn
+        view = memoryview(data)
+        while view:
+            size = min(len(view), conn.local_flow_control_window(stream_id), conn.max_outbound_frame_size)
+            if size <= 0:
+                self.window.clear()
+                await self.window.wait()
+                continue
+            conn.send_data(stream_id, view[:size].tobytes(), end_stream=end and size == len(view))
+            view = view[size:]
+            self.flush()
+        if end and not data:
+            conn.end_stream(stream_id)
+        self.flush()
+        await self.writer.drain()
+
+
+def write_kubeconfig(server_url: str, path: str | None = None, *, insecure: bool = False) -> str:
+    """Write a single-context kubeconfig pointing at `server_url` and return its path."""
+    cluster = {"server": server_url}
+    if insecure:
+        cluster["insecure-skip-tls-verify"] = True
+    data = {
+        "apiVersion": "v1",
+        "kind": "Config",
+        "clusters": [{"name": "fake", "cluster": cluster}],
+        "users": [{"name": "bench", "user": {"token": "bench"}}],
+        "contexts": [{"name": "fake", "context": {"cluster": "fake", "user": "bench", "namespace": "default"}}],
+        "current-context": "fake",
+    }
+    if path is None:
+        fd, path = tempfile.mkstemp(prefix="kubeconfig_fake_", suffix=".yaml")
+        os.close(fd)
+    with open(path, "w", encoding="utf-8") as f:
+        yaml.safe_dump(data, f, sort_keys=False)
+    return path
+
+
+@dataclass
+class FakeApiServerProcess:
+    """Runs the fake apiserver in a child process, so it doesn't share the GIL with the client under test."""
+    latency: float = 0.0
+    host: str = "127.0.0.1"
+    certfile: str | None = None
+    keyfile: str | None = None
+    tls: bool = False  # with a throwaway certificate, unless certfile is given
+
+    url: str | None = None
+    kubeconfig: str | None = None
+    _proc: subprocess.Popen | None = None
+
+    def start(self) -> "FakeApiServerProcess":
+        cmd = [sys.executable, "-m", "bench.fake_apiserver", "--host", self.host, "--port", "0",
+               "--latency", str(self.latency)]
+        if self.certfile:
+            cmd += ["--certfile", self.certfile, "--keyfile", self.keyfile or self.certfile]
+        elif self.tls:
+            cmd += ["--tls"]
+        project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        self._proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, text=True, cwd=project_root)
+        line = self._proc.stdout.readline().strip()
+        if not line.startswith("READY "):
+            self.stop()
+            raise RuntimeError(f"Fake apiserver failed to start: {line!r}")
+        self.url = line.split(" ", 1)[1]
+        self.kubeconfig = write_kubeconfig(self.url, insecure=self.url.startswith("https"))
+        print(f"Fake apiserver is listening on {self.url}")
+        return self
+
+    def stop(self):
+        if self._proc is not None:
+            self._proc.terminate()
+            self._proc.wait(timeout=10)
+            self._proc = None
+        if self.kubeconfig and os.path.exists(self.kubeconfig):
+            os.remove(self.kubeconfig)
+            self.kubeconfig = None
+
+    def __enter__(self): return self.start()
+
+    def __exit__(self, *exc): self.stop()
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="In-memory fake kube-apiserver for apps/v1 Deployments")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every non-watch response")
+    parser.add_argument("--certfile")
+    parser.add_argument("--keyfile")
+    parser.add_argument("--tls", action="store_true", help="Serve HTTPS with a self-signed certificate")
+    parser.add_argument("--faults", help="Fault profile to inject from the start, see bench/faults.py")
+    parser.add_argument("--kubeconfig", help="Also write a kubeconfig pointing at this server to the given path")
+    args = parser.parse_args(argv)
+
+    if sys.platform.startswith("linux"):
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
+    def ready(server: FakeApiServer):
+        if args.kubeconfig:
+            write_kubeconfig(server.url, args.kubeconfig, insecure=bool(server.certfile))
+        print(f"READY {server.url}", flush=True)
+
+    with tempfile.TemporaryDirectory(prefix="fake_apiserver_tls_") as tmp:
+        certfile, keyfile = args.certfile, args.keyfile
+        if args.tls and not certfile:
+            certfile, keyfile = self_signed_cert(tmp, args.host)
+        server = FakeApiServer(host=args.host, port=args.port, latency=args.latency,
+                               certfile=certfile, keyfile=keyfile,
+                               faults=parse_profile(args.faults) if args.faults else None)
+        try:
+            asyncio.run(server.serve(ready))
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Fault injection: what the clients do when the apiserver throttles, fails, stalls or drops them.
+
+The fake apiserver fails a share of the requests it gets, picked at random (with a fixed seed), each way a profile
+says:
+
+- throttle: 429 TooManyRequests with `Retry-After`, the way API priority and fairness rejects a request
+- server_error: 500 InternalError, like an etcd timeout
+- slow: the response comes `slow_seconds` late
+- reset: the connection is reset (RST) instead of answered
+
+Faults are injected before the request is handled, so a failed write changed nothing. Watches and the harness' own
+requests are left alone, and faults are only on while a phase's clock runs. Whatever a client does about a fault
+(retry, back off, raise) is up to it: an operation that raises counts as failed, and the requests the server saw per
+operation, against the same client's under the `none` profile, show how often it retried. Some clients send more
+than one request per operation anyway.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+# Error types named in a phase's summary, most frequent first
+ERROR_EXAMPLES = 3
+
+
+@dataclass(frozen=True)
+class FaultProfile:
+    """Shares of requests (0..1) failed each way, the rest are answered normally."""
+    throttle: float = 0.0
+    server_error: float = 0.0
+    slow: float = 0.0
+    reset: float = 0.0
+    slow_seconds: float = 1.0
+    retry_after: float = 1.0  # seconds, sent with every 429
+
+
+FAULT_PROFILES = {
+    "none": FaultProfile(),  # the baseline, still counting requests
+    "throttle": FaultProfile(throttle=0.2),
+    "errors": FaultProfile(server_error=0.05),
+    "slow": FaultProfile(slow=0.05),
+    "resets": FaultProfile(reset=0.02),
+    "mixed": FaultProfile(throttle=0.1, server_error=0.02, slow=0.02, reset=0.01),
+}
+
+
+def parse_profile(spec: str) -> FaultProfile:
+    """A name from FAULT_PROFILES, or a profile's fields joined with `+`: `throttle=0.5+retry_after=2`."""
+    if spec in FAULT_PROFILES:
+        return FAULT_PROFILES[spec]
+    try:
+        return FaultProfile(**{k.strip(): float(v) for k, v in (pair.split("=") for pair in spec.split("+"))})
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"unknown fault profile {spec!r}, expected one of {list(FAULT_PROFILES)} or fields like "
+                         f"throttle=0.1+reset=0.01") from e
+
+
+@dataclass
+class RequestStats:
+    """What the fake apiserver got (watches aside) and failed on purpose, since faults were last set."""
+    requests: int = 0
+    throttled: int = 0
+    server_errors: int = 0
+    slowed: int = 0
+    resets: int = 0
+
+    @property
+    def injected(self) -> int: return self.throttled + self.server_errors + self.slowed + self.resets
+
+
+def error_label(error: BaseException) -> str:
+    """Exception type, with the HTTP status where the client's exception has one."""
+    name = type(error).__name__
+    for status in (getattr(error, "status", None), getattr(error, "status_code", None),
+                   getattr(getattr(error, "status", None), "code", None),
+                   getattr(getattr(error, "response", None), "status_code", None)):
+        if isinstance(status, int):
+            return f"{name} {status}"
+    return name
+
+
+@dataclass
+class PhaseFaults:
+    profile: str
+    server: RequestStats = field(default_factory=RequestStats)
+    failed: list[str] = field(default_factory=list)  # names of the operations that raised
+    errors: dict[str, int] = field(default_factory=dict)  # error_label -> count
+
+    def record(self, name: str, error: BaseException):
+        self.failed.append(name)
+        label = error_label(error)
+        self.errors[label] = self.errors.get(label, 0) + 1
+
+    @property
+    def summary(self) -> str:
+        s = self.server
+        errors = sorted(self.errors.items(), key=lambda e: e[1], reverse=True)[:ERROR_EXAMPLES]
+        raised = f" ({', '.join(f'{label}: {n}' for label, n in errors)})" if errors else ""
+        return f"{self.profile} faults: {len(self.failed)} operations failed{raised}, server saw {s.requests} " \
+               f"requests and injected {s.throttled} 429s, {s.server_errors} 500s, {s.slowed} slow responses, " \
+               f"{s.resets} resets"
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+from array import array
+
+# HDR-style log-linear buckets over integer microseconds: exact below 128us, then 64 sub-buckets per power of two
+# (<1.6% relative error), up to ~2^40us. Fixed memory (~18KB) no matter how many values are recorded.
+_SUB_BITS = 7
+_SUB_COUNT = 1 << _SUB_BITS
+_HALF_COUNT = _SUB_COUNT >> 1
+_MAX_SHIFT = 33
+_BUCKETS = _SUB_COUNT + _MAX_SHIFT * _HALF_COUNT
+# A bucket's width relative to its lower bound, past the exact ones
+RELATIVE_ERROR = 1 / _HALF_COUNT
+
+
+def _index(us: int) -> int:
+    if us < _SUB_COUNT:
+        return us if us > 0 else 0
+    shift = us.bit_length() - _SUB_BITS
+    if shift > _MAX_SHIFT:
+        return _BUCKETS - 1
+    return _SUB_COUNT + (shift - 1) * _HALF_COUNT + (us >> shift) - _HALF_COUNT
+
+
+def _value(index: int) -> float:
+    """Middle of the bucket, in microseconds."""
+    if index < _SUB_COUNT:
+        return float(index)
+    shift = (index - _SUB_COUNT) // _HALF_COUNT + 1
+    low = ((index - _SUB_COUNT) % _HALF_COUNT + _HALF_COUNT) << shift
+    return low + ((1 << shift) - 1) / 2
+
+
+class LatencyHistogram:
+    __slots__ = ("counts", "count", "min_us", "max_us", "total_us")
+
+    def __init__(self):
+        self.counts = array("q", bytes(8 * _BUCKETS))
+        self.count = 0
+        self.min_us = 0
+        self.max_us = 0
+        self.total_us = 0
+
+    def record_ns(self, ns: int):
+        us = ns // 1000
+        self.counts[_index(us)] += 1
+        if not self.count or us < self.min_us:
+            self.min_us = us
+        if us > self.max_us:
+            self.max_us = us
+        self.count += 1
+        self.total_us += us
+
+    def record(self, seconds: float): self.record_ns(int(seconds * 1e9))
+
+    def merge(self, other: LatencyHistogram) -> LatencyHistogram:
+        if other.count:
+            counts = self.counts
+            for i, c in enumerate(other.counts):
+                if c:
+                    counts[i] += c
+            self.min_us = min(self.min_us, other.min_us) if self.count else other.min_us
+            self.max_us = max(self.max_us, other.max_us)
+            self.count += other.count
+            self.total_us += other.total_us
+        return self
+
+    def percentile(self, p: float) -> float:
+        """Value at percentile `p` (0-100), in seconds."""
+        if not self.count:
+            return 0.0
+        if p >= 100:
+            return self.max_us / 1e6
+        rank = max(1, int(p / 100 * self.count + 0.5))
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank:
+                return min(max(_value(i), self.min_us), self.max_us) / 1e6
+        return self.max_us / 1e6
+
+    @property
+    def mean(self) -> float: return self.total_us / self.count / 1e6 if self.count else 0.0
+
+    @property
+    def max(self) -> float: return self.max_us / 1e6
+
+    def summary_ms(self) -> dict[str, float]:
+        return {
+            "p50": self.percentile(50) * 1e3,
+            "p95": self.percentile(95) * 1e3,
+            "p99": self.percentile(99) * 1e3,
+            "max": self.max * 1e3,
+        }
+
+    def __getstate__(self): return {k: getattr(self, k) for k in self.__slots__}
+
+    def __setstate__(self, state):
+        for k, v in state.items():
+            setattr(self, k, v)
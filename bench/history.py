@@ -0,0 +1,228 @@
+"""Run history: every run is saved as JSON lines, one record per client and phase with the environment it ran in,
+and two saved runs can be compared to catch regressions, e.g. after bumping a client in requirements.txt.
+
+    python -m bench.history results/20260101T120000Z.jsonl results/20260102T120000Z.jsonl --threshold 0.1
+"""
+from __future__ import annotations
+
+import os
+import sys
+import json
+import asyncio
+import argparse
+import platform
+from pathlib import Path
+from datetime import datetime, timezone
+from importlib import metadata as importlib_metadata
+from typing import Any
+
+import pandas as pd
+
+from .benchmark import Benchmark, LATENCY_COLUMNS
+from .stats import summarize
+
+# Relative change of throughput or p99 latency that counts as a regression
+REGRESSION_THRESHOLD = 0.1
+# p99 growth below this is timer and scheduler noise (LIST and Watch inter-arrival times are microseconds)
+P99_NOISE_MS = 1.0
+# A phase is the same phase in another run if all of these match
+PHASE_KEY = ["client", "loop", "codec", "transport", "faults", "phase", "concurrency", "threads", "shards",
+             "object_bytes", "target_rate"]
+# Environment fields printed by the comparison when they differ between runs
+ENVIRONMENT = ["client_version", "python", "event_loop", "cpu", "cpu_count", "platform", "benchmark_size",
+               "fake_apiserver", "isolate"]
+
+
+def _cpu_model() -> str:
+    try:
+        with open("/proc/cpuinfo", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    return line.partition(":")[2].strip()
+    except OSError:
+        pass
+    return platform.processor() or platform.machine()
+
+
+def _version(distribution: str) -> str | None:
+    try:
+        return importlib_metadata.version(distribution)
+    except importlib_metadata.PackageNotFoundError:
+        return None
+
+
+def describe_loop(name: str) -> str:
+    """Loop implementation name with its version, e.g. "uvloop 0.22.1"."""
+    if name not in ("asyncio", "eager") and (version := _version(name)):
+        return f"{name} {version}"
+    return name
+
+
+def run_metadata(mode: str, **extra: Any) -> dict[str, Any]:
+    """Environment of the current run. Call from inside the event loop the benchmarks run on; the loop matrix
+    overrides `event_loop` per client."""
+    event_loop = describe_loop(type(asyncio.get_running_loop()).__module__.split(".")[0])
+    now = datetime.now(timezone.utc)
+    return {
+        "run_id": now.strftime("%Y%m%dT%H%M%SZ"),
+        "timestamp": now.isoformat(),
+        "mode": mode,
+        "python": f"{platform.python_implementation()} {platform.python_version()}",
+        "event_loop": event_loop,
+        "cpu": _cpu_model(),
+        "cpu_count": os.cpu_count(),
+        "platform": platform.platform(),
+        **extra,
+    }
+
+
+def result_records(benchmarks: list[Benchmark], meta: dict[str, Any]) -> list[dict[str, Any]]:
+    records = []
+    for bench in benchmarks:
+        version = _version(bench.distribution) if bench.distribution else None
+        for res in bench.results:
+            latency = res.latency.summary_ms() if res.latency is not None and res.latency.count else {}
+            records.append({
+                **meta,
+                **({"event_loop": describe_loop(bench.event_loop)} if bench.event_loop else {}),
+                "client": bench.client,
+                "client_version": version,
+                "codec": bench.codec,
+                "transport": bench.transport,
+                "faults": res.faults.profile if res.faults is not None else None,
+                "benchmark_size": bench.benchmark_size,
+                "payload": bench.payload.label,
+                "phase": res.bench_name,
+                "trial": res.trial,
+                "concurrency": res.concurrency,
+                "threads": res.threads,
+                "shards": res.shards,
+                "object_bytes": res.object_bytes,
+                "target_rate": res.target_rate,
+                "unsupported": res.unsupported,
+                "requests": res.requests,
+                "seconds": res.seconds,
+                "obj_per_s": None if res.unsupported or not res.seconds else res.requests / res.seconds,
+                "achieved_rate": res.achieved_rate,
+                "cpu_seconds": res.cpu_seconds,
+                **{f"{c}_ms": latency.get(c) for c in LATENCY_COLUMNS},
+                "first_object_ms": 1e3 * res.first_object if res.first_object is not None else None,
+                "rss_peak_bytes": res.rss_peak,
+                "memory_peak_bytes": res.memory.peak if res.memory is not None else None,
+                "dropped_events": res.delivery.dropped if res.delivery is not None else None,
+                "bridge_handoff_ms": res.bridge.handoff_ns / 1e6 if res.bridge is not None else None,
+                "verify_mismatched": res.verify.mismatched if res.verify is not None else None,
+                "connections_opened": res.connections.opened if res.connections is not None else None,
+                "tls_handshakes": res.connections.tls_handshakes if res.connections is not None else None,
+                "connections_used": res.connections.used if res.connections is not None else None,
+                "failed": len(res.faults.failed) if res.faults is not None else None,
+                "server_requests": res.faults.server.requests if res.faults is not None else None,
+            })
+    return records
+
+
+def save_run(benchmarks: list[Benchmark], results_dir: str | Path, meta: dict[str, Any]) -> Path:
+    out = Path(results_dir) / f"{meta['run_id']}.jsonl"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        for record in result_records(benchmarks, meta):
+            f.write(json.dumps(record) + "\n")
+    print(f"Saved results {out}")
+    return out
+
+
+def load_run(path: str | Path) -> pd.DataFrame:
+    df = pd.read_json(path, lines=True, dtype=False)
+    # Saved before the thread sweep, sharding, the codec or transport matrix, or fault injection
+    for col in ("threads", "shards", "codec", "transport", "faults"):
+        if col not in df:
+            df[col] = None
+    # Loop implementation without its version, so runs before and after a uvloop bump still line up
+    df["loop"] = df["event_loop"].str.split().str[0]
+    # Open-loop runs measure what they achieved, everything else what it managed with the requests it had
+    df["throughput"] = df["achieved_rate"].where(df["target_rate"].notna(), df["obj_per_s"])
+    return df
+
+
+def _per_phase(df: pd.DataFrame) -> pd.DataFrame:
+    """One row per phase: median throughput and p99 over trials, with the throughput stats to tell noise apart."""
+    df = df[~df["unsupported"]]
+    rows = []
+    for key, group in df.groupby(PHASE_KEY, sort=False, dropna=False):
+        rows.append({**dict(zip(PHASE_KEY, key)), "throughput": group["throughput"].median(),
+                     "p99_ms": group["p99_ms"].median(), "stats": summarize(group["throughput"].tolist())})
+    return pd.DataFrame(rows, columns=PHASE_KEY + ["throughput", "p99_ms", "stats"])
+
+
+def compare_runs(old: pd.DataFrame, new: pd.DataFrame, threshold: float = REGRESSION_THRESHOLD) -> pd.DataFrame:
+    """Per client and phase throughput and p99 deltas (medians over trials). `Flag` marks a throughput drop or a p99
+    increase above `threshold` (relative). When both runs have several trials, a throughput drop only counts if
+    the confidence intervals don't overlap either."""
+    merged = _per_phase(old).merge(_per_phase(new), on=PHASE_KEY, how="inner", suffixes=(" old", " new"))
+    merged["Δ throughput %"] = 100 * (merged["throughput new"] / merged["throughput old"] - 1)
+    merged["Δ p99 %"] = 100 * (merged["p99_ms new"] / merged["p99_ms old"] - 1)
+
+    def flag(row) -> str:
+        flags = []
+        a, b = row["stats old"], row["stats new"]
+        noise = a.trials > 1 and b.trials > 1 and a.overlaps(b)
+        if row["Δ throughput %"] < -100 * threshold and not noise:
+            flags.append("slower")
+        if row["Δ p99 %"] > 100 * threshold and row["p99_ms new"] - row["p99_ms old"] > P99_NOISE_MS:
+            flags.append("p99 up")
+        return f"REGRESSION ({', '.join(flags)})" if flags else ""
+
+    merged["Flag"] = merged.apply(flag, axis=1) if len(merged) else []
+    merged["± old %"] = [s.half_width for s in merged["stats old"]]
+    merged["± new %"] = [s.half_width for s in merged["stats new"]]
+    merged = merged.drop(columns=["stats old", "stats new"])
+    merged = merged[PHASE_KEY + ["throughput old", "± old %", "p99_ms old", "throughput new", "± new %", "p99_ms new",
+                                 "Δ throughput %", "Δ p99 %", "Flag"]]
+    merged = merged.rename(columns={"client": "Client", "phase": "Phase", "throughput old": "Obj/s old",
+                                    "throughput new": "Obj/s new", "p99_ms old": "p99 old", "p99_ms new": "p99 new"})
+    # Only keep the key columns that tell phases apart
+    for col in ("loop", "concurrency", "threads", "shards", "object_bytes", "target_rate"):
+        if merged[col].nunique(dropna=False) <= 1:
+            merged = merged.drop(columns=[col])
+    for col in ("± old %", "± new %"):
+        if merged[col].fillna(0).eq(0).all():
+            merged = merged.drop(columns=[col])
+    return merged
+
+
+def print_comparison(old: pd.DataFrame, new: pd.DataFrame, threshold: float = REGRESSION_THRESHOLD) -> int:
+    """Print what changed between two runs. Returns the number of flagged regressions."""
+    print(f"Comparing run {old['run_id'].iloc[0]} ({old['mode'].iloc[0]}) "
+          f"with run {new['run_id'].iloc[0]} ({new['mode'].iloc[0]})")
+    env_old = old.groupby("client")[ENVIRONMENT].first()
+    env_new = new.groupby("client")[ENVIRONMENT].first()
+    for client in env_old.index.intersection(env_new.index):
+        for col in ENVIRONMENT:
+            a, b = env_old.at[client, col], env_new.at[client, col]
+            if a != b and not (pd.isna(a) and pd.isna(b)):
+                print(f"  {client}: {col} {a} -> {b}")
+    print("-" * 60)
+
+    df = compare_runs(old, new, threshold)
+    with pd.option_context("display.float_format", lambda x: f"{x:.1f}", "display.width", 200):
+        print(df.to_string(index=False, na_rep="-"))
+    print("-" * 60)
+    regressions = int((df["Flag"] != "").sum())
+    print(f"{regressions} regression(s) over {threshold:.0%}")
+    return regressions
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Compare two saved benchmark runs")
+    parser.add_argument("old", help="Baseline run, a .jsonl file saved by a benchmark run")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                        help="Relative throughput drop or p99 increase flagged as a regression")
+    args = parser.parse_args(argv)
+
+    regressions = print_comparison(load_run(args.old), load_run(args.new), args.threshold)
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Run one benchmark in a fresh interpreter and hand its results back to the parent.
+
+The child only imports the module of the client under test, so no heap, GC state, open sessions or warm caches
+leak from one client into the next. Job and results travel as pickles through a temp directory.
+"""
+from __future__ import annotations
+
+import os
+import sys
+import pickle
+import asyncio
+import argparse
+import tempfile
+import traceback
+from pathlib import Path
+
+from .benchmark import Benchmark, BenchmarkResult
+from .loops import default_loop, run
+
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+
+async def run_isolated(bench: Benchmark, method: str = "run", *args, cpus: list[int] | None = None
+                       ) -> list[BenchmarkResult]:
+    """Call `bench.<method>(*args)` in a fresh subprocess and copy its results back into `bench.results`.
+
+    `bench` must not be initialised yet: it is pickled to the child, which calls init_client itself.
+    `cpus` pins the child to the given CPU ids (Linux only).
+    """
+    with tempfile.TemporaryDirectory(prefix="bench_isolated_") as tmp:
+        job, out = Path(tmp, "job.pkl"), Path(tmp, "results.pkl")
+        job.write_bytes(pickle.dumps((bench, method, args)))
+        cmd = [sys.executable, "-m", "bench.isolation", str(job), str(out)]
+        if cpus:
+            cmd += ["--cpus", ",".join(map(str, cpus))]
+        proc = await asyncio.create_subprocess_exec(*cmd, cwd=_PROJECT_ROOT)
+        code = await proc.wait()
+        if not out.exists():
+            raise RuntimeError(f"{bench.client} benchmark subprocess exited with code {code} and no results")
+        status, payload = pickle.loads(out.read_bytes())
+
+    if status != "ok":
+        raise RuntimeError(f"{bench.client} benchmark failed in subprocess: {payload}")
+    bench.results = payload
+    return bench.results
+
+
+async def _run(bench: Benchmark, method: str, args: tuple):
+    try:
+        await getattr(bench, method)(*args)
+    finally:
+        await bench.close_client()
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Run a pickled benchmark job in this process")
+    parser.add_argument("job")
+    parser.add_argument("out")
+    parser.add_argument("--cpus", help="Comma-separated CPU ids to pin this process to")
+    args = parser.parse_args(argv)
+
+    if args.cpus:
+        os.sched_setaffinity(0, [int(c) for c in args.cpus.split(",")])
+
+    try:
+        bench, method, method_args = pickle.loads(Path(args.job).read_bytes())
+        # The loop the matrix asked for, otherwise the same one as the parent (see bench/run.py)
+        run(_run(bench, method, method_args), bench.event_loop or default_loop())
+        result = ("ok", bench.results)
+    except BaseException as e:
+        result = ("error", f"{type(e).__name__}: {e}\n{traceback.format_exc()}")
+    Path(args.out).write_bytes(pickle.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Event loop implementations a benchmark can run on.
+
+- asyncio: the stock selector loop
+- uvloop: libuv-based drop-in replacement (what the benchmarks use on Linux by default)
+- eager: the stock loop with `asyncio.eager_task_factory` (Python 3.12+), which runs a new task synchronously up
+  to its first real suspension instead of scheduling it
+"""
+from __future__ import annotations
+
+import sys
+import asyncio
+from typing import Any, Coroutine, TypeVar
+
+T = TypeVar("T")
+
+EVENT_LOOPS = ["asyncio", "uvloop", "eager"]
+
+
+def default_loop() -> str: return "uvloop" if sys.platform.startswith("linux") else "asyncio"
+
+
+def unavailable(loop: str) -> str | None:
+    """Why `loop` can't run here, or None if it can."""
+    if loop not in EVENT_LOOPS:
+        return f"unknown event loop, expected one of {EVENT_LOOPS}"
+    if loop == "uvloop":
+        try:
+            import uvloop  # noqa: F401
+        except ImportError:
+            return "uvloop is not installed"
+    if loop == "eager" and not hasattr(asyncio, "eager_task_factory"):
+        return f"the eager task factory needs Python 3.12+, this is {sys.version.split()[0]}"
+    return None
+
+
+async def _eager(coro: Coroutine[Any, Any, T]) -> T:
+    asyncio.get_running_loop().set_task_factory(asyncio.eager_task_factory)
+    return await coro
+
+
+def run(coro: Coroutine[Any, Any, T], loop: str) -> T:
+    """asyncio.run() on the given loop implementation."""
+    if loop == "uvloop":
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    else:
+        asyncio.set_event_loop_policy(None)
+    return asyncio.run(_eager(coro) if loop == "eager" else coro)
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import gc
+import os
+import resource
+import linecache
+import tracemalloc
+from dataclasses import dataclass, field
+
+MiB = 1024 * 1024
+
+TRACE_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, linecache.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def rss_bytes() -> int:
+    """Current resident set size. Falls back to the peak RSS where /proc is not available."""
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        # ru_maxrss is KiB on Linux, bytes on macOS
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return maxrss if os.uname().sysname == "Darwin" else maxrss * 1024
+
+
+@dataclass
+class MemoryStats:
+    peak: int           # tracemalloc peak above the phase baseline, bytes
+    retained: int       # traced memory still held after the phase (and a gc pass), bytes
+    blocks: int         # net allocated blocks still held after the phase
+    rss_delta: int      # process RSS after minus before, bytes
+    top_sites: list[tuple[str, int, int]] = field(default_factory=list)  # (file:line, retained bytes, blocks)
+
+
+@dataclass
+class PhaseMemoryTracker:
+    """Traces Python allocations across one phase. Heavy: tracing slows allocation-bound code noticeably."""
+    frames: int = 1
+    top: int = 5
+
+    _before: tracemalloc.Snapshot | None = None
+    _baseline: int = 0
+    _rss: int = 0
+    _owns_tracing: bool = False
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._owns_tracing = True
+        gc.collect()
+        self._before = tracemalloc.take_snapshot().filter_traces(TRACE_FILTERS)
+        self._rss = rss_bytes()
+        self._baseline = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+
+    def stop(self) -> MemoryStats:
+        peak = tracemalloc.get_traced_memory()[1]
+        rss = rss_bytes()
+        gc.collect()
+        after = tracemalloc.take_snapshot().filter_traces(TRACE_FILTERS)
+        diff = after.compare_to(self._before, "lineno")
+        if self._owns_tracing:
+            tracemalloc.stop()
+            self._owns_tracing = False
+        self._before = None
+
+        top = [
+            (f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}", stat.size_diff, stat.count_diff)
+            for stat in diff[:self.top] if stat.size_diff > 0
+        ]
+        return MemoryStats(
+            peak=peak - self._baseline,
+            retained=sum(stat.size_diff for stat in diff),
+            blocks=sum(stat.count_diff for stat in diff),
+            rss_delta=rss - self._rss,
+            top_sites=top,
+        )
@@ -0,0 +1,145 @@
+"""No-network microbenchmarks of each client's Deployment model: build, serialize to wire JSON, deserialize.
+
+    python -m bench.microbench --iterations 5000 --clients kubesdk,official
+"""
+from __future__ import annotations
+
+import json
+import time
+import asyncio
+import argparse
+import statistics
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+import pandas as pd
+
+from .benchmark import Benchmark
+from .memory import TRACE_FILTERS
+from .payloads import apiserver_response, deployment_manifest
+from .profiling import slug
+
+ALLOC_SAMPLE = 100
+
+
+@dataclass
+class MicroResult:
+    client: str
+    op: str
+    iterations: int
+    ns_per_op: float
+    ns_stdev: float
+    retained_bytes_per_op: float
+    blocks_per_op: float
+    peak_bytes_per_op: float
+
+
+def _time(fn: Callable[[int], Any], iterations: int, repeats: int) -> tuple[float, float]:
+    """Median and stdev of ns/op over `repeats` loops of `iterations` calls."""
+    per_op = []
+    for _ in range(repeats):
+        t0 = time.perf_counter_ns()
+        for i in range(iterations):
+            fn(i)
+        per_op.append((time.perf_counter_ns() - t0) / iterations)
+    return statistics.median(per_op), statistics.stdev(per_op) if len(per_op) > 1 else 0.0
+
+
+def _allocations(fn: Callable[[int], Any]) -> tuple[float, float, float]:
+    """Bytes and blocks each call's result keeps alive, and the transient peak of a single call."""
+    tracemalloc.start()
+    try:
+        base = tracemalloc.take_snapshot().filter_traces(TRACE_FILTERS)
+        kept = [fn(i) for i in range(ALLOC_SAMPLE)]
+        stats = tracemalloc.take_snapshot().filter_traces(TRACE_FILTERS).compare_to(base, "filename")
+        retained = sum(s.size_diff for s in stats) / ALLOC_SAMPLE
+        blocks = sum(s.count_diff for s in stats) / ALLOC_SAMPLE
+        del kept
+
+        current = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        fn(0)
+        peak = tracemalloc.get_traced_memory()[1] - current
+    finally:
+        tracemalloc.stop()
+    return retained, blocks, peak
+
+
+async def bench_models(bench: Benchmark, iterations: int = 2_000, repeats: int = 5) -> list[MicroResult]:
+    bench.init_models()
+    names = bench.all_objects_names
+    body = bench.build_body(names[0])
+    manifest = deployment_manifest(names[0], bench.namespace, bench.build_bench_labels(names[0]), bench.payload)
+    raw = json.dumps(apiserver_response(manifest)).encode()
+
+    ops: dict[str, Callable[[int], Any]] = {
+        "build": lambda i: bench.build_body(names[i % len(names)]),
+        "serialize": lambda i: bench.serialize_body(body),
+        "deserialize": lambda i: bench.deserialize_body(raw),
+    }
+    results = []
+    for op, fn in ops.items():
+        fn(0)  # warm up lazy imports and caches
+        ns, stdev = _time(fn, iterations, repeats)
+        retained, blocks, peak = _allocations(fn)
+        results.append(MicroResult(bench.client, op, iterations, ns, stdev, retained, blocks, peak))
+        print(f"{bench.client:>20} {op:<12} {ns / 1e3:10.1f} us/op")
+    return results
+
+
+def micro_to_df(results: list[MicroResult]) -> pd.DataFrame:
+    rows = [{
+        "Client": r.client,
+        "Op": r.op,
+        "us/op": r.ns_per_op / 1e3,
+        "±us": r.ns_stdev / 1e3,
+        "KiB kept/op": r.retained_bytes_per_op / 1024,
+        "blocks/op": r.blocks_per_op,
+        "peak KiB/op": r.peak_bytes_per_op / 1024,
+    } for r in results]
+    return pd.DataFrame(rows).set_index(["Client", "Op"])
+
+
+def print_micro_results(results: list[MicroResult]) -> None:
+    print("Model microbenchmarks (no network)")
+    with pd.option_context("display.float_format", lambda x: f"{x:.1f}"):
+        print(micro_to_df(results).to_string())
+    print("-" * 60)
+
+
+async def run_microbench(
+    benchmarks: list[Benchmark], iterations: int = 2_000, repeats: int = 5, output_dir: str | Path | None = None,
+) -> list[MicroResult]:
+    results = []
+    for bench in benchmarks:
+        results += await bench_models(bench, iterations, repeats)
+    print_micro_results(results)
+    if output_dir is not None:
+        out = Path(output_dir) / "microbench.csv"
+        out.parent.mkdir(parents=True, exist_ok=True)
+        micro_to_df(results).to_csv(out)
+        print(f"Saved {out}")
+    return results
+
+
+def main(argv: list[str] | None = None):
+    from .run import BENCHMARKS
+
+    parser = argparse.ArgumentParser(description="Client model build/serialize/deserialize microbenchmarks")
+    parser.add_argument("--iterations", type=int, default=2_000)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--clients", help="Comma-separated client names (default: all)")
+    parser.add_argument("--output-dir")
+    args = parser.parse_args(argv)
+
+    benchmarks = [cls() for cls in BENCHMARKS]
+    if args.clients:
+        wanted = {slug(c) for c in args.clients.split(",")}
+        benchmarks = [b for b in benchmarks if slug(b.client) in wanted or slug(b.client).split("-")[0] in wanted]
+    asyncio.run(run_microbench(benchmarks, args.iterations, args.repeats, args.output_dir))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+"""Open-loop (constant arrival rate) scheduling.
+
+The batch phases fire everything at once and wait, so a slow response delays the requests queued behind it and
+never shows up in their latency (coordinated omission). Here requests go out on a fixed timetable whether or not
+earlier ones have finished, and latency is measured from the time a request was supposed to be sent.
+"""
+from __future__ import annotations
+
+import math
+
+OPEN_LOOP_RATES = [50, 100, 200, 400, 800]
+OPEN_LOOP_DURATION = 10.0
+OPEN_LOOP_RAMP = 2.0
+# Achieved rate below this share of the target means the client is not keeping up
+KEEP_UP_RATIO = 0.95
+
+
+def arrival_offsets(rate: float, duration: float, ramp: float = 0.0) -> list[float]:
+    """Intended send times, in seconds from the start: a linear ramp from 0 to `rate` over `ramp` seconds, then
+    `rate` requests per second for `duration` seconds."""
+    ramp_requests = int(rate * ramp / 2)
+    # Requests sent by time t < ramp: rate * t^2 / (2 * ramp)
+    offsets = [math.sqrt(2 * ramp * k / rate) for k in range(ramp_requests)]
+    offsets += [ramp + k / rate for k in range(int(rate * duration))]
+    return offsets
@@ -1,10 +1,17 @@
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 from matplotlib.ticker import FuncFormatter
+from matplotlib.container import BarContainer
 
-from .benchmark import Benchmark
+from .open_loop import KEEP_UP_RATIO
+from .memory import MiB
+from .stats import CONFIDENCE, summarize
+from .histogram import LatencyHistogram
+from .benchmark import Benchmark, LATENCY_COLUMNS, MEMORY_COLUMNS, memory_summary, cpu_share, mib_per_second
+from ._null import NullBenchmark
 
 
 def benchmarks_to_df(benchmarks: list[Benchmark]) -> pd.DataFrame:
@@ -13,13 +20,13 @@ def benchmarks_to_df(benchmarks: list[Benchmark]) -> pd.DataFrame:
     client_order: list[str] = []
 
     for bench in benchmarks:
-        client = bench.client
+        client = bench.label
         if client not in client_order:
             client_order.append(client)
         for res in bench.results:
             if res.bench_name not in bench_order:
                 bench_order.append(res.bench_name)
-            rps = res.requests / res.seconds if res.seconds else 0.0
+            rps = None if res.unsupported else res.requests / res.seconds if res.seconds else 0.0
             rows.append({
                 "Client": client,
                 "Benchmark": res.bench_name,
@@ -27,8 +34,10 @@ def benchmarks_to_df(benchmarks: list[Benchmark]) -> pd.DataFrame:
                 "Obj/s": rps,
             })
 
-    df = pd.DataFrame(rows)
-    obj_per_client = df.groupby("Client")["Objects"].max()
+    # Median over trials, the same one trials_to_df reports
+    df = pd.DataFrame(rows).groupby(["Client", "Benchmark"], sort=False, dropna=False).agg(
+        {"Objects": "first", "Obj/s": lambda v: summarize(v.tolist()).median}).reset_index()
+    obj_per_client = df.groupby("Client")["Objects"].first()
 
     wide = df.pivot(index="Client", columns="Benchmark", values="Obj/s")
     wide = wide.reindex(columns=bench_order)
@@ -38,36 +47,356 @@ def benchmarks_to_df(benchmarks: list[Benchmark]) -> pd.DataFrame:
     return wide
 
 
+def latency_to_df(benchmarks: list[Benchmark]) -> pd.DataFrame:
+    rows: list[dict[str, object]] = []
+    for bench in benchmarks:
+        # Trials of a phase are pooled into one histogram
+        pooled: dict[str, LatencyHistogram] = {}
+        for res in bench.results:
+            if res.latency is None or not res.latency.count:
+                continue
+            pooled.setdefault(res.bench_name, LatencyHistogram()).merge(res.latency)
+        rows += [{"Client": bench.label, "Benchmark": name, **h.summary_ms()} for name, h in pooled.items()]
+    return pd.DataFrame(rows, columns=["Client", "Benchmark", *LATENCY_COLUMNS]).set_index(["Client", "Benchmark"])
+
+
+def memory_to_df(benchmarks: list[Benchmark]) -> pd.DataFrame:
+    rows: list[dict[str, object]] = []
+    for bench in benchmarks:
+        for res in bench.results:
+            if res.memory is None:
+                continue
+            rps = res.requests / res.seconds if res.seconds else 0.0
+            rows.append({"Client": bench.label, "Benchmark": res.bench_name, "Obj/s": rps,
+                         **memory_summary(res.memory)})
+    return _median_over_trials(pd.DataFrame(rows, columns=["Client", "Benchmark", "Obj/s", *MEMORY_COLUMNS]),
+                               ["Client", "Benchmark"])
+
+
+def cpu_to_df(benchmarks: list[Benchmark]) -> pd.DataFrame:
+    rows: list[dict[str, object]] = []
+    for bench in benchmarks:
+        for res in bench.results:
+            if res.cpu_seconds is None:
+                continue
+            rows.append({"Client": bench.label, "Benchmark": res.bench_name, "Wall s": res.seconds,
+                         "CPU s": res.cpu_seconds, "CPU %": cpu_share(res),
+                         "CPU ms/obj": 1e3 * res.cpu_seconds / res.requests if res.requests else 0.0})
+    return _median_over_trials(pd.DataFrame(rows, columns=["Client", "Benchmark", "Wall s", "CPU s", "CPU %",
+                                                           "CPU ms/obj"]), ["Client", "Benchmark"])
+
+
+def delivery_to_df(benchmarks: list[Benchmark]) -> pd.DataFrame:
+    rows: list[dict[str, object]] = []
+    for bench in benchmarks:
+        for res in bench.results:
+            if res.delivery is None:
+                continue
+            d = res.delivery
+            rows.append({"Client": bench.label, "Writes/s": res.requests / res.seconds if res.seconds else 0.0,
+                         **(res.latency.summary_ms() if res.latency is not None else {}),
+                         "Expected": d.expected, "Dropped": d.dropped, "Duplicated": d.duplicated,
+                         "Foreign": d.foreign})
+    return _median_over_trials(pd.DataFrame(rows, columns=["Client", "Writes/s", *LATENCY_COLUMNS, "Expected",
+                                                           "Dropped", "Duplicated", "Foreign"]), ["Client"])
+
+
+def bridge_to_df(benchmarks: list[Benchmark]) -> pd.DataFrame:
+    rows: list[dict[str, object]] = []
+    for bench in benchmarks:
+        for res in bench.results:
+            if res.bridge is None:
+                continue
+            b = res.bridge
+            rows.append({"Client": bench.label, "Benchmark": res.bench_name, "Items": b.items, "Batches": b.batches,
+                         "Items/batch": b.items / b.batches if b.batches else 0.0, "Wakeups": b.wakeups,
+                         "Hand-over ms": b.handoff_ns / 1e6, "us/item": b.handoff_ns / 1e3 / b.items if b.items else 0.0,
+                         "% of phase": 100 * b.handoff_ns / 1e9 / res.seconds if res.seconds else 0.0,
+                         "Blocked ms": b.blocked_ns / 1e6})
+    return _median_over_trials(pd.DataFrame(rows, columns=["Client", "Benchmark", "Items", "Batches", "Items/batch",
+                                                           "Wakeups", "Hand-over ms", "us/item", "% of phase",
+                                                           "Blocked ms"]), ["Client", "Benchmark"])
+
+
+def verify_to_df(benchmarks: list[Benchmark]) -> pd.DataFrame:
+    rows: list[dict[str, object]] = []
+    for bench in benchmarks:
+        for res in bench.results:
+            if res.verify is None:
+                continue
+            v = res.verify
+            unchecked = res.seconds - v.ns / 1e9
+            rows.append({"Client": bench.label, "Benchmark": res.bench_name, "Checked": v.checked,
+                         "Mismatched": v.mismatched, "us/object": v.ns / 1e3 / v.checked if v.checked else 0.0,
+                         "% of phase": 100 * v.ns / 1e9 / res.seconds if res.seconds else 0.0,
+                         "Obj/s": res.requests / res.seconds if res.seconds else 0.0,
+                         "Obj/s unchecked": res.requests / unchecked if unchecked > 0 else 0.0})
+    return _median_over_trials(pd.DataFrame(rows, columns=["Client", "Benchmark", "Checked", "Mismatched", "us/object",
+                                                           "% of phase", "Obj/s", "Obj/s unchecked"]),
+                               ["Client", "Benchmark"])
+
+
+def connections_to_df(benchmarks: list[Benchmark]) -> pd.DataFrame:
+    rows: list[dict[str, object]] = []
+    for bench in benchmarks:
+        for res in bench.results:
+            if res.connections is None or res.unsupported:
+                continue
+            c = res.connections
+            rows.append({"Client": bench.label, "Benchmark": res.bench_name,
+                         "Obj/s": res.requests / res.seconds if res.seconds else 0.0, "Opened": c.opened,
+                         "TLS handshakes": c.tls_handshakes, "HTTP/2": c.http2, "Used": c.used})
+    return _median_over_trials(pd.DataFrame(rows, columns=["Client", "Benchmark", "Obj/s", "Opened", "TLS handshakes",
+                                                           "HTTP/2", "Used"]),
+                               ["Client", "Benchmark"])
+
+
+def teardown_to_df(benchmarks: list[Benchmark]) -> pd.DataFrame:
+    rows = [{"Client": bench.label, "Teardown ms": 1e3 * bench.teardown.seconds, "Waited for": bench.teardown.waited}
+            for bench in benchmarks if bench.teardown is not None]
+    return pd.DataFrame(rows, columns=["Client", "Teardown ms", "Waited for"]).set_index("Client")
+
+
+def print_teardown_results(benchmarks: list[Benchmark]) -> None:
+    teardown = teardown_to_df(benchmarks)
+    if teardown.empty:
+        return
+    print("Teardown between clients (collection DELETE, then a watch until the namespace is empty)")
+    with pd.option_context("display.float_format", lambda x: f"{x:.1f}"):
+        print(teardown.to_string())
+    print("-" * 60)
+
+
+def list_to_df(benchmarks: list[Benchmark]) -> pd.DataFrame:
+    rows: list[dict[str, object]] = []
+    for bench in benchmarks:
+        for res in bench.results:
+            if res.first_object is None:
+                continue
+            rows.append({"Client": bench.label, "Benchmark": res.bench_name,
+                         "Obj/s": res.requests / res.seconds if res.seconds else 0.0,
+                         "First ms": 1e3 * res.first_object,
+                         "RSS peak MiB": res.rss_peak / MiB if res.rss_peak is not None else None})
+    return _median_over_trials(pd.DataFrame(rows, columns=["Client", "Benchmark", "Obj/s", "First ms",
+                                                           "RSS peak MiB"]), ["Client", "Benchmark"])
+
+
+def harness_to_df(benchmarks: list[Benchmark]) -> pd.DataFrame:
+    """The null client's obj/s and µs per request, and that time as a share of every other client's time per request."""
+    df = benchmarks_to_df(benchmarks).drop(columns=["Objects"])
+    null = [b.label for b in benchmarks if isinstance(b, NullBenchmark)]
+    if not null:
+        return pd.DataFrame()
+    ceiling = df.loc[null[0]]
+    rows = {"Ceiling obj/s": ceiling, "us/request": 1e6 / ceiling}
+    for client in df.index.drop(null):
+        rows[f"% of {client}"] = 100 * df.loc[client] / ceiling
+    return pd.DataFrame(rows).T
+
+
+def _matrix_to_df(benchmarks: list[Benchmark], attr: str, base: str) -> pd.DataFrame:
+    """Obj/s per client and phase for each value of `attr` the benchmarks ran with, and each value's change against
+    `base` (or the first one) in percent."""
+    values = list(dict.fromkeys(getattr(b, attr) for b in benchmarks if getattr(b, attr)))
+    if len(values) < 2:
+        return pd.DataFrame()
+    rows: list[dict[str, object]] = []
+    for bench in benchmarks:
+        for res in bench.results:
+            if getattr(bench, attr) and not res.unsupported and res.seconds:
+                rows.append({"Client": bench.client, "Benchmark": res.bench_name, attr: getattr(bench, attr),
+                             "Obj/s": res.requests / res.seconds})
+    df = pd.DataFrame(rows).pivot_table(index=["Client", "Benchmark"], columns=attr, values="Obj/s",
+                                        aggfunc="median", sort=False)
+    order = dict.fromkeys((r["Client"], r["Benchmark"]) for r in rows)
+    df = df.reindex(index=pd.MultiIndex.from_tuples(order, names=["Client", "Benchmark"]), columns=values)
+    base = base if base in values else values[0]
+    for value in values:
+        if value != base:
+            df[f"{value} vs {base} %"] = 100 * (df[value] / df[base] - 1)
+    df.columns.name = None
+    return df
+
+
+def loops_to_df(benchmarks: list[Benchmark]) -> pd.DataFrame:
+    """Obj/s per client and phase on each event loop, against the stock asyncio loop."""
+    return _matrix_to_df(benchmarks, "event_loop", "asyncio")
+
+
+def codecs_to_df(benchmarks: list[Benchmark]) -> pd.DataFrame:
+    """Obj/s per client and phase with each JSON codec, against the stdlib one."""
+    return _matrix_to_df(benchmarks, "codec", "json")
+
+
+def transports_to_df(benchmarks: list[Benchmark]) -> pd.DataFrame:
+    """Obj/s per client and phase over HTTP/1.1 and HTTP/2, against HTTP/1.1."""
+    return _matrix_to_df(benchmarks, "transport", "http1")
+
+
+def _median_over_trials(df: pd.DataFrame, keys: list[str]) -> pd.DataFrame:
+    """One row per `keys`, the median of its trials (a no-op for single-trial runs)."""
+    return df.groupby(keys, sort=False).median()
+
+
+def trials_to_df(benchmarks: list[Benchmark]) -> pd.DataFrame:
+    """Median throughput over trials with its bootstrap confidence interval, spread and outliers."""
+    rows: list[dict[str, object]] = []
+    for bench in benchmarks:
+        per_phase: dict[str, list[float]] = {}
+        for res in bench.results:
+            if not res.unsupported and res.seconds:
+                per_phase.setdefault(res.bench_name, []).append(res.requests / res.seconds)
+        for name, values in per_phase.items():
+            s = summarize(values)
+            rows.append({"Client": bench.label, "Benchmark": name, "Trials": s.trials, "Obj/s": s.median,
+                         "CI low": s.low, "CI high": s.high, "±%": s.half_width, "CV %": s.cv,
+                         "Outliers": s.outliers})
+    return pd.DataFrame(rows, columns=["Client", "Benchmark", "Trials", "Obj/s", "CI low", "CI high", "±%", "CV %",
+                                       "Outliers"]).set_index(["Client", "Benchmark"])
+
+
 def print_combined_results(benchmarks: list[Benchmark]) -> None:
     df = benchmarks_to_df(benchmarks)
-    print("Combined results (objects per second)")
+    trials = trials_to_df(benchmarks)
+    repeated = not trials.empty and trials["Trials"].max() > 1
+    print("Combined results (objects per second" + (", median over trials)" if repeated else ")"))
     with pd.option_context("display.float_format", lambda x: f"{x:.1f}"):
-        print(df.to_string())
+        print(df.to_string(na_rep="unsupported"))
     print("-" * 60)
 
+    if repeated:
+        print(f"Throughput over trials (median, {CONFIDENCE:.0%} bootstrap CI, coefficient of variation; "
+              f"outliers left out of the median)")
+        with pd.option_context("display.float_format", lambda x: f"{x:.1f}"):
+            print(trials.to_string())
+        print("-" * 60)
+
+    loops = loops_to_df(benchmarks)
+    if not loops.empty:
+        print("Event loops (objects per second, and the change against the baseline loop)")
+        with pd.option_context("display.float_format", lambda x: f"{x:.1f}"):
+            print(loops.to_string(na_rep="-"))
+        print("-" * 60)
+
+    codecs = codecs_to_df(benchmarks)
+    if not codecs.empty:
+        print("JSON codecs (objects per second, and the change against the stdlib decoder)")
+        with pd.option_context("display.float_format", lambda x: f"{x:.1f}"):
+            print(codecs.to_string(na_rep="-"))
+        print("-" * 60)
+
+    transports = transports_to_df(benchmarks)
+    if not transports.empty:
+        print("Transports (objects per second, and the change against HTTP/1.1)")
+        with pd.option_context("display.float_format", lambda x: f"{x:.1f}"):
+            print(transports.to_string(na_rep="-"))
+        print("-" * 60)
+
+    connections = connections_to_df(benchmarks)
+    if not connections.empty:
+        print("Connections per phase, as the fake apiserver counted them (opened during the phase, and all that "
+              "served its requests)")
+        with pd.option_context("display.float_format", lambda x: f"{x:.1f}"):
+            print(connections.to_string(na_rep="-"))
+        print("-" * 60)
+
+    listing = list_to_df(benchmarks)
+    if not listing.empty:
+        print("LIST (time to first object, peak RSS growth while holding every listed object)")
+        with pd.option_context("display.float_format", lambda x: f"{x:.1f}"):
+            print(listing.to_string())
+        print("-" * 60)
+
+    latency = latency_to_df(benchmarks)
+    if not latency.empty:
+        print("Latency percentiles (ms, LIST, Watch: object inter-arrival time, Churn: write-to-event delay)")
+        with pd.option_context("display.float_format", lambda x: f"{x:.2f}"):
+            print(latency.to_string())
+        print("-" * 60)
+
+    cpu = cpu_to_df(benchmarks)
+    if not cpu.empty:
+        print("CPU time vs wall time (process CPU, all threads)")
+        with pd.option_context("display.float_format", lambda x: f"{x:.2f}"):
+            print(cpu.to_string())
+        print("-" * 60)
+
+    memory = memory_to_df(benchmarks)
+    if not memory.empty:
+        print("Memory per phase (tracemalloc peak/retained, net blocks, process RSS delta)")
+        with pd.option_context("display.float_format", lambda x: f"{x:.1f}"):
+            print(memory.to_string())
+        print("-" * 60)
+
+    harness = harness_to_df(benchmarks)
+    if not harness.empty:
+        print("Harness ceiling (null client: no client, no server) and its share of each client's time per request")
+        with pd.option_context("display.float_format", lambda x: f"{x:.1f}"):
+            print(harness.to_string(na_rep="-"))
+        print("-" * 60)
+
+    delivery = delivery_to_df(benchmarks)
+    if not delivery.empty:
+        print("Watch delivery under churn (write-to-event latency, ms)")
+        with pd.option_context("display.float_format", lambda x: f"{x:.2f}"):
+            print(delivery.to_string())
+        print("-" * 60)
+
+    verify = verify_to_df(benchmarks)
+    if not verify.empty:
+        print("Verification (GET/Watch responses vs the written objects; obj/s unchecked: the phase minus checking time)")
+        with pd.option_context("display.float_format", lambda x: f"{x:.1f}"):
+            print(verify.to_string())
+        for bench in benchmarks:
+            for res in bench.results:
+                if res.verify is not None and res.verify.mismatched:
+                    print(f"MISMATCH {bench.label} {res.bench_name}: {res.verify.summary}")
+        print("-" * 60)
+
+    bridge = bridge_to_df(benchmarks)
+    if not bridge.empty:
+        print("Sync-to-async stream bridge overhead (already inside the sync client's numbers above)")
+        with pd.option_context("display.float_format", lambda x: f"{x:.2f}"):
+            print(bridge.to_string())
+        print("-" * 60)
+
 
 PALETTE = [
     "#4E79A7",
     "#F28E2B",
     "#E15759",
     "#76B7B2",
+    "#59A14F",
+    "#EDC948",
+    "#B07AA1",
+    "#FF9DA7",
+    "#9C755F",
+    "#BAB0AC",
 ]
 
 
 def plot_benchmarks_histogram(benchmarks: list[Benchmark], output_dir: str | Path | None = None) -> None:
+    # The harness ceiling would squash every real client's bars
+    benchmarks = [b for b in benchmarks if not isinstance(b, NullBenchmark)]
     df = benchmarks_to_df(benchmarks)
     if "Client" in df.columns:
         df = df.set_index("Client")
     if "Objects" in df.columns:
         df = df.drop(columns=["Objects"])
 
-    # Figure height scales with #clients
+    latency = latency_to_df(benchmarks)
+
+    # Figure height scales with #clients and #phases
     num_clients = len(df.index)
-    fig_height = max(7, num_clients + 2)
-    fig, ax = plt.subplots(figsize=(10, fig_height))
+    fig_height = max(7, num_clients * max(1.0, 0.3 * len(df.columns)) + 2)
+    if latency.empty:
+        fig, ax = plt.subplots(figsize=(10, fig_height))
+    else:
+        fig, (ax, lat_ax) = plt.subplots(1, 2, figsize=(18, fig_height), gridspec_kw={"width_ratios": [3, 2]})
 
-    # Horizontal grouped bars, thinner for spacing within client
-    df.plot(kind="barh", ax=ax, width=0.6, color=PALETTE)
+    # Horizontal grouped bars, thinner for spacing within client, with the confidence interval over trials
+    df.plot(kind="barh", ax=ax, width=0.6, color=PALETTE, xerr=_ci_errors(benchmarks, df), capsize=2,
+            error_kw={"elinewidth": 0.8, "ecolor": "#333333"})
 
     ax.set_xlabel("Objects per second")
     ax.set_ylabel("")
@@ -89,19 +418,364 @@ def plot_benchmarks_histogram(benchmarks: list[Benchmark], output_dir: str | Pat
     # Thousands separator on x axis
     ax.xaxis.set_major_formatter(FuncFormatter(lambda x, pos: f"{int(x):,}"))
 
-    # Value labels on bars
-    for container in ax.containers:
-        ax.bar_label(container, fmt="%.0f", padding=3, fontsize=8)
+    # Value labels on bars, with the phase's peak traced memory when we have it
+    memory = memory_to_df(benchmarks)
+    bars = [c for c in ax.containers if isinstance(c, BarContainer)]
+    for container, col in zip(bars, df.columns):
+        peaks = memory["Peak MiB"].unstack("Benchmark").reindex(index=df.index).get(col) if not memory.empty else None
+        labels = [
+            "unsupported" if pd.isna(rps) else
+            f"{rps:.0f}" + (f" · {peak:.0f} MiB" if peaks is not None and pd.notna(peak) else "")
+            for rps, peak in zip(df[col], peaks if peaks is not None else [None] * len(df))
+        ]
+        ax.bar_label(container, labels=labels, padding=3, fontsize=8)
+
+    if not latency.empty:
+        _plot_latency(latency, df, lat_ax)
 
     fig.tight_layout()
+    _save_figure(fig, output_dir, "python_kubernetes_clients_benchmark.png")
+
+
+def _ci_errors(benchmarks: list[Benchmark], df: pd.DataFrame) -> np.ndarray | None:
+    """Asymmetric xerr for the throughput bars (columns x (below, above) x clients), None for single trials."""
+    trials = trials_to_df(benchmarks)
+    if trials.empty or trials["Trials"].max() <= 1:
+        return None
+    low = trials["CI low"].unstack("Benchmark").reindex(index=df.index, columns=df.columns)
+    high = trials["CI high"].unstack("Benchmark").reindex(index=df.index, columns=df.columns)
+    return np.nan_to_num(np.stack([(df - low).T.to_numpy(), (high - df).T.to_numpy()], axis=1))
+
+
+def _save_figure(fig, output_dir: str | Path | None, filename: str) -> None:
     if output_dir is None:
         plt.show()
     else:
         output_dir = Path(output_dir).expanduser().resolve()
         output_dir.mkdir(parents=True, exist_ok=True)
-        output_file = output_dir / "python_kubernetes_clients_benchmark.png"
+        output_file = output_dir / filename
         print(f"Saving chart {output_file}")
         fig.savefig(output_file, dpi=900, bbox_inches="tight")
         plt.show()
 
     plt.close(fig)
+
+
+def _plot_latency(latency: pd.DataFrame, throughput: pd.DataFrame, ax) -> None:
+    """p99 bars per client and phase, in the same layout as the throughput chart, with p50 as a tick inside."""
+    p99 = latency["p99"].unstack("Benchmark").reindex(index=throughput.index, columns=throughput.columns)
+    p50 = latency["p50"].unstack("Benchmark").reindex(index=throughput.index, columns=throughput.columns)
+
+    p99.plot(kind="barh", ax=ax, width=0.6, color=PALETTE, legend=False)
+    for container, col in zip(ax.containers, p99.columns):
+        labels = [f"{a:.1f} / {b:.1f}" if pd.notna(b) else "" for a, b in zip(p50[col], p99[col])]
+        ax.bar_label(container, labels=labels, padding=3, fontsize=7)
+
+    ax.set_xscale("log")
+    ax.set_xlabel("p99 latency, ms (labels: p50 / p99; LIST, Watch: object inter-arrival; Churn: write-to-event)")
+    ax.set_ylabel("")
+    ax.set_yticklabels([])
+    ax.set_title("Tail latency", pad=12)
+    ax.grid(axis="x", linestyle="--", linewidth=0.5, alpha=0.5)
+    ax.set_axisbelow(True)
+
+
+SATURATION_RATIO = 0.9
+
+
+def sweep_to_df(benchmarks: list[Benchmark]) -> pd.DataFrame:
+    rows: list[dict[str, object]] = []
+    for bench in benchmarks:
+        for res in bench.results:
+            rows.append({
+                "Client": bench.label,
+                "Benchmark": res.bench_name,
+                "Concurrency": res.concurrency,
+                "Threads": res.threads,
+                "Shards": res.shards,
+                "Size": res.object_bytes,
+                "Obj/s": res.requests / res.seconds if res.seconds else 0.0,
+                "MiB/s": mib_per_second(res),
+                "Target/s": res.target_rate,
+                "Achieved/s": res.achieved_rate,
+                **(res.latency.summary_ms() if res.latency is not None else {}),
+            })
+    return pd.DataFrame(rows, columns=["Client", "Benchmark", "Concurrency", "Threads", "Shards", "Size", "Obj/s",
+                                       "MiB/s", "Target/s", "Achieved/s", *LATENCY_COLUMNS])
+
+
+def saturation_knees(df: pd.DataFrame, x: str = "Concurrency") -> pd.DataFrame:
+    """Lowest level of `x` reaching SATURATION_RATIO of the client's peak throughput, per client and phase.
+
+    Pushing concurrency (or threads) past the knee buys little throughput and usually costs tail latency.
+    """
+    rows = []
+    for (client, bench), group in df.groupby(["Client", "Benchmark"], sort=False):
+        group = group.sort_values(x)
+        peak = group["Obj/s"].max()
+        knee = group[group["Obj/s"] >= SATURATION_RATIO * peak].iloc[0]
+        rows.append({
+            "Client": client,
+            "Benchmark": bench,
+            "Knee": int(knee[x]),
+            "Obj/s at knee": knee["Obj/s"],
+            "p99 at knee": knee["p99"],
+            "Peak Obj/s": peak,
+            "Peak at": int(group.loc[group["Obj/s"].idxmax(), x]),
+        })
+    return pd.DataFrame(rows)
+
+
+def print_sweep_results(benchmarks: list[Benchmark]) -> None:
+    df = sweep_to_df(benchmarks)
+    print("Concurrency sweep (objects per second)")
+    wide = df.pivot_table(index=["Client", "Benchmark"], columns="Concurrency", values="Obj/s", sort=False)
+    with pd.option_context("display.float_format", lambda x: f"{x:.1f}"):
+        print(wide.to_string())
+    print("-" * 60)
+    print("p99 latency (ms)")
+    wide = df.pivot_table(index=["Client", "Benchmark"], columns="Concurrency", values="p99", sort=False)
+    with pd.option_context("display.float_format", lambda x: f"{x:.2f}"):
+        print(wide.to_string())
+    print("-" * 60)
+    print(f"Saturation knee (first level reaching {SATURATION_RATIO:.0%} of peak throughput)")
+    with pd.option_context("display.float_format", lambda x: f"{x:.1f}"):
+        print(saturation_knees(df).to_string(index=False))
+    print("-" * 60)
+
+
+def plot_concurrency_sweep(benchmarks: list[Benchmark], output_dir: str | Path | None = None) -> None:
+    df = sweep_to_df(benchmarks)
+    fig = _plot_sweep(df, "Concurrency", "Obj/s", "Concurrency", "Objects per second", knees=saturation_knees(df))
+    fig.suptitle("Throughput vs concurrency (stars mark the saturation knee)")
+    fig.tight_layout(rect=(0, 0.04, 1, 1))
+    _save_figure(fig, output_dir, "python_kubernetes_clients_concurrency_sweep.png")
+
+
+def _thread_sweep_df(benchmarks: list[Benchmark]) -> pd.DataFrame:
+    """Thread sweep rows, with one line ("Client") per concurrency level."""
+    df = sweep_to_df(benchmarks).dropna(subset=["Threads"])
+    df["Threads"] = df["Threads"].astype(int)
+    df["Client"] = df["Client"] + " c=" + df["Concurrency"].astype(str)
+    return df
+
+
+def print_thread_sweep_results(benchmarks: list[Benchmark]) -> None:
+    df = _thread_sweep_df(benchmarks)
+    for title, values, fmt in (("Thread sweep (objects per second)", "Obj/s", "{:.1f}"),
+                               ("p99 latency (ms)", "p99", "{:.2f}")):
+        print(title)
+        wide = df.pivot_table(index=["Client", "Benchmark"], columns="Threads", values=values, sort=False)
+        with pd.option_context("display.float_format", fmt.format):
+            print(wide.to_string())
+        print("-" * 60)
+    print(f"Thread knee (first thread count reaching {SATURATION_RATIO:.0%} of peak throughput)")
+    with pd.option_context("display.float_format", lambda x: f"{x:.1f}"):
+        print(saturation_knees(df, "Threads").to_string(index=False))
+    print("-" * 60)
+
+
+def plot_thread_sweep(benchmarks: list[Benchmark], output_dir: str | Path | None = None) -> None:
+    df = _thread_sweep_df(benchmarks)
+    fig = _plot_sweep(df, "Threads", "Obj/s", "Worker threads (= pooled connections)", "Objects per second",
+                      knees=saturation_knees(df, "Threads"))
+    fig.suptitle("Sync official client: throughput vs worker threads (stars mark the knee)")
+    fig.tight_layout(rect=(0, 0.04, 1, 1))
+    _save_figure(fig, output_dir, "python_kubernetes_clients_thread_sweep.png")
+
+
+def shard_efficiency(df: pd.DataFrame) -> pd.Series:
+    """Throughput gained per added process, relative to the fewest shards run: 100% is linear scaling."""
+    def per_group(group: pd.DataFrame) -> pd.Series:
+        base = group.loc[group["Shards"].idxmin()]
+        return 100 * (group["Obj/s"] / base["Obj/s"]) / (group["Shards"] / base["Shards"])
+    return df.groupby(["Client", "Benchmark"], sort=False, group_keys=False)[["Shards", "Obj/s"]].apply(per_group)
+
+
+def print_shard_results(benchmarks: list[Benchmark]) -> None:
+    df = sweep_to_df(benchmarks).dropna(subset=["Shards"])
+    df["Shards"] = df["Shards"].astype(int)
+    df["Efficiency %"] = shard_efficiency(df)
+    for title, values, fmt in (("Sharded across processes (objects per second, all shards)", "Obj/s", "{:.1f}"),
+                               ("Scaling efficiency (% of linear from the fewest shards)", "Efficiency %", "{:.0f}"),
+                               ("p99 latency (ms)", "p99", "{:.2f}")):
+        print(title)
+        wide = df.pivot_table(index=["Client", "Benchmark"], columns="Shards", values=values, sort=False)
+        with pd.option_context("display.float_format", fmt.format):
+            print(wide.to_string())
+        print("-" * 60)
+
+
+def plot_shard_sweep(benchmarks: list[Benchmark], output_dir: str | Path | None = None) -> None:
+    df = sweep_to_df(benchmarks).dropna(subset=["Shards"])
+    fig = _plot_sweep(df, "Shards", "Obj/s", "Worker processes", "Objects per second, all shards")
+    fig.suptitle("Throughput vs worker processes (same total concurrency)")
+    fig.tight_layout(rect=(0, 0.04, 1, 1))
+    _save_figure(fig, output_dir, "python_kubernetes_clients_shards.png")
+
+
+def print_size_sweep_results(benchmarks: list[Benchmark]) -> None:
+    df = sweep_to_df(benchmarks)
+    for title, values, fmt in (("Object size sweep (objects per second)", "Obj/s", "{:.1f}"),
+                               ("Object size sweep (MiB of manifests per second)", "MiB/s", "{:.2f}"),
+                               ("p99 latency (ms)", "p99", "{:.2f}")):
+        print(title)
+        wide = df.pivot_table(index=["Client", "Benchmark"], columns="Size", values=values, sort=False)
+        with pd.option_context("display.float_format", fmt.format):
+            print(wide.to_string())
+        print("-" * 60)
+
+
+def plot_size_sweep(benchmarks: list[Benchmark], output_dir: str | Path | None = None) -> None:
+    fig = _plot_sweep(sweep_to_df(benchmarks), "Size", "MiB/s", "Object size, bytes", "MiB per second")
+    fig.suptitle("Throughput vs object size")
+    fig.tight_layout(rect=(0, 0.04, 1, 1))
+    _save_figure(fig, output_dir, "python_kubernetes_clients_size_sweep.png")
+
+
+def keep_up_limits(df: pd.DataFrame) -> pd.DataFrame:
+    """Highest target rate each client sustains (achieved >= KEEP_UP_RATIO of target), and the first one it doesn't."""
+    rows = []
+    for (client, bench), group in df.groupby(["Client", "Benchmark"], sort=False):
+        group = group.sort_values("Target/s")
+        ok = group["Achieved/s"] >= KEEP_UP_RATIO * group["Target/s"]
+        behind = group[~ok]
+        rows.append({
+            "Client": client,
+            "Benchmark": bench,
+            "Keeps up to": group[ok]["Target/s"].max() if ok.any() else None,
+            "Falls behind at": behind["Target/s"].iloc[0] if not behind.empty else None,
+            "Peak achieved/s": group["Achieved/s"].max(),
+        })
+    return pd.DataFrame(rows)
+
+
+def print_open_loop_results(benchmarks: list[Benchmark]) -> None:
+    df = sweep_to_df(benchmarks)
+    for title, values, fmt in (("Open loop: achieved rate (requests per second)", "Achieved/s", "{:.1f}"),
+                               ("p99 latency from the intended send time (ms)", "p99", "{:.2f}")):
+        print(title)
+        wide = df.pivot_table(index=["Client", "Benchmark"], columns="Target/s", values=values, sort=False)
+        with pd.option_context("display.float_format", fmt.format):
+            print(wide.to_string())
+        print("-" * 60)
+    print(f"Keeping up (achieved at least {KEEP_UP_RATIO:.0%} of the target rate)")
+    with pd.option_context("display.float_format", lambda x: f"{x:.0f}"):
+        print(keep_up_limits(df).to_string(index=False, na_rep="-"))
+    print("-" * 60)
+
+
+def plot_open_loop(benchmarks: list[Benchmark], output_dir: str | Path | None = None) -> None:
+    df = sweep_to_df(benchmarks)
+    fig = _plot_sweep(df, "Target/s", "Achieved/s", "Target rate, requests per second", "Achieved requests per second")
+    rates = sorted(df["Target/s"].unique())
+    for ax in fig.axes[:len(fig.axes) // 2]:
+        ax.plot(rates, rates, linestyle=":", color="grey", label="target")
+        ax.set_yscale("log")
+    fig.suptitle("Open-loop load: achieved vs target rate (dotted: keeping up)")
+    fig.tight_layout(rect=(0, 0.04, 1, 1))
+    _save_figure(fig, output_dir, "python_kubernetes_clients_open_loop.png")
+
+
+def faults_to_df(benchmarks: list[Benchmark]) -> pd.DataFrame:
+    """Per client, fault profile and phase: operations that failed, goodput (succeeded per second), and what the
+    server saw. Retries/op are the requests per operation beyond the client's own under the `none` profile (at least 0:
+    an operation that fails early may skip requests it would have sent)."""
+    rows: list[dict[str, object]] = []
+    for bench in benchmarks:
+        for res in bench.results:
+            if res.faults is None:
+                continue
+            f = res.faults
+            succeeded = res.requests - len(f.failed)
+            rows.append({"Client": bench.label, "Profile": f.profile, "Benchmark": res.bench_name,
+                         "Operations": res.requests, "Failed": len(f.failed),
+                         "Error %": 100 * len(f.failed) / res.requests if res.requests else 0.0,
+                         "Goodput/s": succeeded / res.seconds if res.seconds else 0.0,
+                         "Requests/op": f.server.requests / res.requests if res.requests else 0.0,
+                         "Injected": f.server.injected,
+                         "p99": res.latency.summary_ms()["p99"] if res.latency is not None and res.latency.count
+                         else None})
+    df = _median_over_trials(pd.DataFrame(rows, columns=[
+        "Client", "Profile", "Benchmark", "Operations", "Failed", "Error %", "Goodput/s", "Requests/op", "Injected",
+        "p99"]), ["Client", "Profile", "Benchmark"])
+    baseline = df.xs("none", level="Profile")["Requests/op"] if "none" in df.index.get_level_values("Profile") \
+        else pd.Series(dtype=float)
+    per_op = df["Requests/op"].droplevel("Profile")
+    retries = (per_op - baseline.reindex(per_op.index)).clip(lower=0)
+    df.insert(df.columns.get_loc("Injected"), "Retries/op", retries.to_numpy())
+    return df
+
+
+def print_fault_results(benchmarks: list[Benchmark]) -> None:
+    df = faults_to_df(benchmarks)
+    print("Fault injection (goodput: operations that succeeded per second; retries/op: requests per operation beyond "
+          "the none profile's; p99 in ms, failed operations included)")
+    with pd.option_context("display.float_format", lambda x: f"{x:.1f}"):
+        print(df.to_string(na_rep="-"))
+    raised = [(bench, res) for bench in benchmarks for res in bench.results
+              if res.faults is not None and res.faults.errors]
+    if raised:
+        print("Errors raised")
+    for bench, res in raised:
+        errors = ", ".join(f"{label}: {n}" for label, n in
+                           sorted(res.faults.errors.items(), key=lambda e: e[1], reverse=True))
+        print(f"  {bench.label} {res.faults.profile} {res.bench_name}: {errors}")
+    print("-" * 60)
+
+
+def plot_faults(benchmarks: list[Benchmark], output_dir: str | Path | None = None) -> None:
+    df = faults_to_df(benchmarks).reset_index()
+    phases = list(dict.fromkeys(df["Benchmark"]))
+    fig, axes = plt.subplots(2, len(phases), figsize=(6 * len(phases), 9), squeeze=False)
+    for col, phase in enumerate(phases):
+        data = df[df["Benchmark"] == phase]
+        for row, values in enumerate(("Goodput/s", "Error %")):
+            ax = axes[row][col]
+            wide = data.pivot_table(index="Profile", columns="Client", values=values, sort=False)
+            wide.plot(kind="bar", ax=ax, width=0.7, color=PALETTE, legend=False, rot=0)
+            ax.set_title(phase if row == 0 else "")
+            ax.set_ylabel(values)
+            ax.set_xlabel("")
+            ax.grid(axis="y", linestyle="--", linewidth=0.5, alpha=0.5)
+            ax.set_axisbelow(True)
+    handles, labels = axes[0][0].get_legend_handles_labels()
+    fig.legend(handles, labels, loc="lower center", ncol=len(labels), frameon=False, bbox_to_anchor=(0.5, -0.02))
+    fig.suptitle("Fault injection: goodput and failed operations per profile")
+    fig.tight_layout(rect=(0, 0.04, 1, 1))
+    _save_figure(fig, output_dir, "python_kubernetes_clients_faults.png")
+
+
+def _plot_sweep(df: pd.DataFrame, x: str, y: str, x_label: str, y_label: str, knees: pd.DataFrame | None = None
+                ) -> plt.Figure:
+    """Throughput (top row) and p99 (bottom row) against `x`, one column per phase, one line per client."""
+    phases = list(dict.fromkeys(df["Benchmark"]))
+    clients = list(dict.fromkeys(df["Client"]))
+    colors = dict(zip(clients, plt.get_cmap("tab10").colors))
+
+    fig, axes = plt.subplots(2, len(phases), figsize=(6 * len(phases), 9), squeeze=False, sharex=True)
+    for col, phase in enumerate(phases):
+        rps_ax, lat_ax = axes[0][col], axes[1][col]
+        for client in clients:
+            data = df[(df["Client"] == client) & (df["Benchmark"] == phase)].sort_values(x)
+            if data.empty:
+                continue
+            rps_ax.plot(data[x], data[y], marker="o", color=colors[client], label=client)
+            lat_ax.plot(data[x], data["p99"], marker="o", color=colors[client], label=client)
+            if knees is not None:
+                knee = knees[(knees["Client"] == client) & (knees["Benchmark"] == phase)].iloc[0]
+                rps_ax.plot(knee["Knee"], knee["Obj/s at knee"], marker="*", markersize=14, color=colors[client])
+
+        rps_ax.set_title(phase)
+        rps_ax.set_ylabel(y_label)
+        lat_ax.set_ylabel("p99 latency, ms")
+        lat_ax.set_yscale("log")
+        lat_ax.set_xlabel(x_label)
+        for ax in (rps_ax, lat_ax):
+            ax.set_xscale("log")
+            ax.grid(linestyle="--", linewidth=0.5, alpha=0.5)
+            ax.set_axisbelow(True)
+
+    handles, labels = axes[0][0].get_legend_handles_labels()
+    fig.legend(handles, labels, loc="lower center", ncol=len(clients), frameon=False, bbox_to_anchor=(0.5, -0.02))
+    return fig
@@ -0,0 +1,224 @@
+"""Client-agnostic Deployment payloads, as plain JSON-ready dicts."""
+from __future__ import annotations
+
+import json
+import uuid
+from dataclasses import dataclass, replace
+from typing import Any, Callable, TypeVar
+
+T = TypeVar("T")
+
+
+# Kubernetes rejects objects above ~1.5MiB (etcd request limit), so the sweep tops out just below 1MB
+SIZE_SWEEP = [1_000, 8_000, 64_000, 256_000, 1_000_000]
+
+_MOUNT_PATHS = ["/work", "/data", "/cache"]
+
+# The update phases bump this env var of the first container, like a config change rolling out would
+UPDATED_ENV = "C1_ONLY"
+PATCH_TYPES = ["merge", "strategic", "json"]
+PATCH_CONTENT_TYPES = {
+    "merge": "application/merge-patch+json",
+    "strategic": "application/strategic-merge-patch+json",
+    "json": "application/json-patch+json",
+    "apply": "application/apply-patch+yaml",
+}
+FIELD_MANAGER = "python-client-bench"
+
+
+@dataclass(frozen=True)
+class PayloadShape:
+    """Knobs of the generated Pod template. The defaults give the original 3 containers x 50 env vars template."""
+    containers: int = 3
+    env_per_container: int = 50
+    labels: int = 0             # extra Pod template labels
+    annotation_bytes: int = 0   # size of a single Pod template annotation
+    volumes: int = 1
+
+    @classmethod
+    def for_size(cls, target_bytes: int) -> PayloadShape:
+        """Shape whose Deployment manifest serializes to roughly `target_bytes` of JSON.
+
+        Most of the size comes from env vars, like in real workloads; an annotation pads the rest.
+        """
+        containers = 3 if target_bytes >= 4_000 else 1
+        base = manifest_bytes(cls(containers=containers, env_per_container=0))
+        per_env = (manifest_bytes(cls(containers=containers, env_per_container=10)) - base) / (10 * containers)
+        env = max(0, int(0.8 * (target_bytes - base) / (per_env * containers)))
+        shape = cls(containers=containers, env_per_container=env)
+        padding = target_bytes - manifest_bytes(shape) - len(', "annotations": {"bench/padding": ""}')
+        return replace(shape, annotation_bytes=max(0, padding))
+
+    @property
+    def label(self) -> str:
+        return f"{self.containers}x{self.env_per_container} env, {self.volumes} vol, {self.labels} labels, " \
+               f"{self.annotation_bytes}B annotation"
+
+
+def updated_env_value(revision: int) -> str: return f"x-{revision}" if revision else "x"
+
+
+def large_pod_template(name: str, shape: PayloadShape = PayloadShape(), revision: int = 0) -> dict[str, Any]:
+    """The Pod template every client builds with its own models in `_large_pod_template`.
+
+    `revision` only changes the value of UPDATED_ENV, so the update phases send a small change of the same object.
+    """
+    common_env = [{"name": f"ENV_{i}", "value": f"value_{i}"} for i in range(shape.env_per_container)]
+    resources = {"limits": {"cpu": "100m", "memory": "128Mi"}, "requests": {"cpu": "50m", "memory": "64Mi"}}
+    volumes = ["work"] + [f"work-{i}" for i in range(1, shape.volumes)]
+
+    containers = []
+    for i in range(shape.containers):
+        # Three flavours, cycling: probe + resources, resources only, bare with an env var in front
+        flavour = i % 3
+        mount_path = _MOUNT_PATHS[flavour] + (f"-{i // 3}" if i >= 3 else "")
+        c = {
+            "name": f"c{i + 1}",
+            "image": "busybox:stable",
+            "command": ["/bin/sh", "-c"],
+            "args": ["sleep 3600"],
+            "env": (
+                [{"name": "IMPORTANT", "value": "bench_value"}] + common_env if flavour == 2
+                else common_env + [{"name": f"C{i + 1}_ONLY",
+                                    "value": updated_env_value(revision) if i == 0 else "x" if flavour == 0 else "y"}]
+            ),
+            "volumeMounts": [{"name": volumes[i % len(volumes)], "mountPath": mount_path}],
+        }
+        if flavour != 2:
+            c["resources"] = resources
+        if flavour == 0:
+            c["livenessProbe"] = {"exec": {"command": ["/bin/true"]}, "initialDelaySeconds": 5, "periodSeconds": 30}
+        containers.append(c)
+
+    labels = {"app": name, **{f"bench/label-{i}": f"value-{i}" for i in range(shape.labels)}}
+    metadata: dict[str, Any] = {"labels": labels}
+    if shape.annotation_bytes:
+        metadata["annotations"] = {"bench/padding": "x" * shape.annotation_bytes}
+    return {
+        "metadata": metadata,
+        "spec": {"containers": containers, "volumes": [{"name": v, "emptyDir": {}} for v in volumes]},
+    }
+
+
+def reuse(convert: Callable[[Any], T]) -> Callable[[Any], T]:
+    """Memoize `convert` by the identity of its argument.
+
+    The generated template shares the common env list and resources dict between containers, and clients build one
+    model per shared dict, so the Pod template keeps sharing them the way a hand-written one would.
+    """
+    cache: dict[int, T] = {}
+
+    def f(src: Any) -> T:
+        key = id(src)
+        if key not in cache:
+            cache[key] = convert(src)
+        return cache[key]
+    return f
+
+
+def deployment_manifest(
+    name: str, namespace: str, labels: dict[str, str], shape: PayloadShape = PayloadShape(), revision: int = 0,
+) -> dict[str, Any]:
+    return {
+        "apiVersion": "apps/v1",
+        "kind": "Deployment",
+        "metadata": {"name": name, "namespace": namespace, "labels": labels},
+        "spec": {
+            "replicas": 0,
+            "selector": {"matchLabels": {"app": name}},
+            "template": large_pod_template(name, shape, revision),
+        },
+    }
+
+
+def update_patch(patch_type: str, name: str, revision: int, shape: PayloadShape = PayloadShape()) -> dict | list:
+    """Patch body of `patch_type` (one of PATCH_TYPES) setting UPDATED_ENV to its `revision` value."""
+    value = updated_env_value(revision)
+    if patch_type == "json":
+        # UPDATED_ENV comes right after the common env vars
+        return [{"op": "replace", "path": f"/spec/template/spec/containers/0/env/{shape.env_per_container}/value",
+                 "value": value}]
+    if patch_type == "strategic":
+        containers = [{"name": "c1", "env": [{"name": UPDATED_ENV, "value": value}]}]
+    else:
+        # A merge patch replaces lists as a whole, so it has to carry every container
+        containers = large_pod_template(name, shape, revision)["spec"]["containers"]
+    return {"spec": {"template": {"spec": {"containers": containers}}}}
+
+
+def manifest_bytes(shape: PayloadShape) -> int:
+    """Size of the JSON manifest the harness creates, for a typical object name."""
+    name = "client-bench-000000"
+    return len(json.dumps(deployment_manifest(name, "default", {f"app/{name}": f"default-{name}"}, shape)))
+
+
+def _fields_v1(obj: Any) -> Any:
+    """Rough shape of server-side-apply managedFields for `obj`: every set key becomes `f:<key>`."""
+    if isinstance(obj, dict):
+        return {f"f:{k}": _fields_v1(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return {f'k:{{"name":"{item["name"]}"}}' if isinstance(item, dict) and "name" in item else f"v:{i}":
+                _fields_v1(item) for i, item in enumerate(obj)}
+    return {}
+
+
+def apiserver_response(
+    manifest: dict[str, Any],
+    resource_version: str = "1",
+    uid: str | None = None,
+    created: str = "2025-01-01T00:00:00Z",
+) -> dict[str, Any]:
+    """What the apiserver returns for `manifest`: defaulted spec, managedFields, generation and status."""
+    meta = dict(manifest["metadata"])
+    spec = dict(manifest["spec"])
+    template = dict(spec["template"])
+    pod_spec = dict(template["spec"])
+
+    containers = []
+    for c in pod_spec["containers"]:
+        c = {"imagePullPolicy": "IfNotPresent", "resources": {}, "terminationMessagePath": "/dev/termination-log",
+             "terminationMessagePolicy": "File", **c}
+        if "livenessProbe" in c:
+            c["livenessProbe"] = {"failureThreshold": 3, "successThreshold": 1, "timeoutSeconds": 1,
+                                  **c["livenessProbe"]}
+        containers.append(c)
+    pod_spec.update(containers=containers)
+    pod_spec = {"dnsPolicy": "ClusterFirst", "restartPolicy": "Always", "schedulerName": "default-scheduler",
+                "securityContext": {}, "terminationGracePeriodSeconds": 30, **pod_spec}
+    template["spec"] = pod_spec
+    template["metadata"] = {"creationTimestamp": None, **template.get("metadata", {})}
+    spec = {"progressDeadlineSeconds": 600, "revisionHistoryLimit": 10,
+            "strategy": {"type": "RollingUpdate", "rollingUpdate": {"maxSurge": "25%", "maxUnavailable": "25%"}},
+            **spec, "template": template}
+
+    meta.update(
+        uid=uid or str(uuid.uuid4()),
+        resourceVersion=resource_version,
+        generation=1,
+        creationTimestamp=created,
+        managedFields=[{
+            "manager": FIELD_MANAGER,
+            "operation": "Update",
+            "apiVersion": "apps/v1",
+            "time": created,
+            "fieldsType": "FieldsV1",
+            "fieldsV1": {"f:metadata": {"f:labels": _fields_v1(meta.get("labels", {}))}, "f:spec": _fields_v1(spec)},
+        }],
+    )
+    return {
+        "apiVersion": "apps/v1",
+        "kind": "Deployment",
+        "metadata": meta,
+        "spec": spec,
+        "status": {
+            "observedGeneration": 1,
+            "conditions": [{
+                "type": "Progressing",
+                "status": "True",
+                "lastUpdateTime": created,
+                "lastTransitionTime": created,
+                "reason": "NewReplicaSetAvailable",
+                "message": f'ReplicaSet "{meta["name"]}-5d7f8c9b6d" has successfully progressed.',
+            }],
+        },
+    }
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import re
+import sys
+import cProfile
+import threading
+from pathlib import Path
+from collections import Counter
+from dataclasses import dataclass, field
+
+PROFILERS = ("cprofile", "sample")
+
+
+def slug(text: str) -> str: return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")
+
+
+@dataclass
+class CProfilePhaseProfiler:
+    """Deterministic profile of one phase, dumped as a .pstats file (snakeviz, gprof2dot, `python -m pstats`).
+
+    Only sees the event loop thread: use the sampler for clients that work in executor threads.
+    """
+    _profiler: cProfile.Profile | None = None
+
+    def start(self):
+        self._profiler = cProfile.Profile()
+        self._profiler.enable()
+
+    def stop(self, path: Path) -> Path:
+        self._profiler.disable()
+        path = path.with_suffix(".pstats")
+        self._profiler.dump_stats(path)
+        self._profiler = None
+        return path
+
+
+@dataclass
+class SamplingPhaseProfiler:
+    """Samples every thread's stack each `interval` seconds and writes collapsed stacks for flamegraphs.
+
+    Output lines are `thread;outer;...;inner count`, readable by flamegraph.pl and speedscope.
+    Much cheaper than cProfile, so timings stay closer to an unprofiled run.
+    """
+    interval: float = 0.001
+
+    _samples: Counter = field(default_factory=Counter)
+    _stop: threading.Event = field(default_factory=threading.Event)
+    _thread: threading.Thread | None = None
+
+    def start(self):
+        self._samples.clear()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample, name="bench-sampler", daemon=True)
+        self._thread.start()
+
+    def _sample(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self._samples[";".join(reversed(stack))] += 1
+
+    def stop(self, path: Path) -> Path:
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        path = path.with_suffix(".collapsed")
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self._samples.most_common():
+                f.write(f"{stack} {count}\n")
+        return path
+
+
+def make_profiler(kind: str) -> CProfilePhaseProfiler | SamplingPhaseProfiler:
+    if kind == "cprofile":
+        return CProfilePhaseProfiler()
+    if kind == "sample":
+        return SamplingPhaseProfiler()
+    raise ValueError(f"Unknown profiler {kind!r}, expected one of {PROFILERS}")
+
@@ -1,46 +1,235 @@
+import os
 import sys
 import asyncio
+import itertools
 from pathlib import Path
+from typing import Any
 
 if sys.platform.startswith("linux"):
     import uvloop
     asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
     print("Running on uvloop")
 
-from .benchmark import BenchmarkResult
-from .output import print_combined_results, plot_benchmarks_histogram
+from .benchmark import Benchmark, BenchmarkResult
+from .cold_start import ColdStart, run_cold_start, print_cold_start_results
+from .fake_apiserver import FakeApiServerProcess, transport_unavailable
+from .faults import parse_profile
+from .history import run_metadata, save_run
+from .isolation import run_isolated
+from . import codecs as codec_matrix
+from .loops import unavailable
+from .sharding import run_sharded
+from .output import (
+    print_combined_results, plot_benchmarks_histogram, print_sweep_results, plot_concurrency_sweep,
+    print_size_sweep_results, plot_size_sweep, print_open_loop_results, plot_open_loop, print_thread_sweep_results,
+    plot_thread_sweep, print_shard_results, plot_shard_sweep, print_teardown_results, print_fault_results, plot_faults,
+)
+from .open_loop import OPEN_LOOP_DURATION, OPEN_LOOP_RAMP
+from .payloads import PayloadShape
 from ._kubesdk import KubesdkBenchmark
 from ._kubernetes_asyncio import KubernetesAsyncioBenchmark
 from ._kr8s_async import Kr8sAsyncBenchmark
 from ._lightkube_async import LightkubeAsyncBenchmark
 from ._official_client import OfficialClientBenchmark
+from ._null import NullBenchmark
 
 
-async def run(output_dir: str | Path) -> None:
-    benchmark_size = 5_000
-    results: list[BenchmarkResult] = []
-    kubesdk = KubesdkBenchmark(benchmark_size=benchmark_size)
+BENCHMARKS: list[type[Benchmark]] = [
+    KubesdkBenchmark,
+    KubernetesAsyncioBenchmark,
+    Kr8sAsyncBenchmark,
+    LightkubeAsyncBenchmark,
+    OfficialClientBenchmark,
+]
 
-    # Clean ns, first
-    await kubesdk.init_client()
-    await kubesdk.cleanup()
 
-    # 3, 2, 1... bench!
-    results += await kubesdk.run()
+async def run(
+    output_dir: str | Path,
+    fake_apiserver: bool = False,
+    fake_apiserver_latency: float = 0.0,
+    fake_apiserver_tls: bool = False,
+    benchmark_size: int = 5_000,
+    warmup: int = 0,
+    trials: int = 1,
+    sweep: list[int] | None = None,
+    thread_sweep: list[int] | None = None,
+    shards: list[int] | None = None,
+    size_sweep: list[int] | None = None,
+    payload_size: int | None = None,
+    churn_rate: float = 0.0,
+    list_limits: list[int] | None = None,
+    open_loop: list[float] | None = None,
+    open_loop_duration: float = OPEN_LOOP_DURATION,
+    open_loop_ramp: float = OPEN_LOOP_RAMP,
+    faults: list[str] | None = None,
+    event_loops: list[str] | None = None,
+    codecs: list[str] | None = None,
+    transports: list[str] | None = None,
+    calibrate: bool = False,
+    verify: bool = False,
+    cold_start: bool = False,
+    isolate: bool = False,
+    cpu_affinity: list[int] | None = None,
+    track_memory: bool = False,
+    profile: str | None = None,
+    profile_dir: str | Path | None = None,
+    results_dir: str | Path | None = None,
+) -> None:
+    if faults and not fake_apiserver:
+        raise ValueError("Fault injection needs the fake apiserver (FAKE_APISERVER=1)")
+    profile_dir = profile_dir or Path(output_dir or ".") / "profiles"
+    results_dir = results_dir or Path(output_dir or ".") / "results"
+    bench_kwargs = dict(benchmark_size=benchmark_size, warmup=warmup, trials=trials, churn_rate=churn_rate,
+                        track_memory=track_memory, profile=profile, profile_dir=str(profile_dir), verify=verify)
+    if list_limits is not None:
+        bench_kwargs["list_limits"] = list_limits
+    if payload_size:
+        bench_kwargs["payload"] = PayloadShape.for_size(payload_size)
+    fake = None
+    if fake_apiserver:
+        # HTTP/2 is only negotiated over TLS
+        fake = FakeApiServerProcess(latency=fake_apiserver_latency, tls=fake_apiserver_tls or bool(transports)).start()
+        os.environ["KUBECONFIG"] = fake.kubeconfig
+        bench_kwargs["fake_apiserver_url"] = fake.url
+    try:
+        if shards:
+            mode = "run_shards", (shards,)
+        elif thread_sweep:
+            # Only the sync official client has threads; with a concurrency sweep too, it's a threads x level matrix
+            mode = "run_thread_sweep", (thread_sweep, sweep)
+        elif sweep:
+            mode = "run_sweep", (sweep,)
+        elif size_sweep:
+            mode = "run_size_sweep", (size_sweep,)
+        elif open_loop:
+            mode = "run_open_loop", (open_loop, open_loop_duration, open_loop_ramp)
+        elif faults:
+            for spec in faults:
+                parse_profile(spec)  # fail now rather than after the first client
+            mode = "run_faults", (faults,)
+        else:
+            mode = "run", ()
+        if event_loops:
+            for loop in event_loops:
+                if reason := unavailable(loop):
+                    print(f"Skipping the {loop} event loop: {reason}")
+            event_loops = [loop for loop in event_loops if not unavailable(loop)]
+            # The loop implementation is per process
+            isolate = True
+        if codecs:
+            for codec in codecs:
+                if reason := codec_matrix.unavailable(codec):
+                    print(f"Skipping the {codec} codec: {reason}")
+            codecs = [codec for codec in codecs if not codec_matrix.unavailable(codec)]
+            # Swapping the decoder patches modules for the whole process
+            isolate = True
+        if transports:
+            for transport in transports:
+                if reason := transport_unavailable(transport):
+                    print(f"Skipping the {transport} transport: {reason}")
+            transports = [t for t in transports if not transport_unavailable(t)]
+        meta = run_metadata(mode[0], fake_apiserver=fake_apiserver, isolate=isolate, calibrate=calibrate,
+                            verify=verify, tls=fake.url.startswith("https") if fake is not None else None)
+        # The null client first: the harness ceiling the clients are read against
+        classes = [NullBenchmark, *BENCHMARKS] if calibrate else BENCHMARKS
+        benchmarks = await _run_all(output_dir, bench_kwargs, mode, classes, isolate, cpu_affinity, cold_start,
+                                    event_loops, codecs, transports)
+        save_run(benchmarks, results_dir, meta)
+    finally:
+        if fake is not None:
+            fake.stop()
 
-    k8s_asyncio = KubernetesAsyncioBenchmark(benchmark_size=benchmark_size)
-    results += await k8s_asyncio.run()
 
-    kr8s = Kr8sAsyncBenchmark(benchmark_size=benchmark_size)
-    results += await kr8s.run()
+async def _run_all(
+    output_dir: str | Path,
+    bench_kwargs: dict[str, Any],
+    mode: tuple[str, tuple],
+    classes: list[type[Benchmark]],
+    isolate: bool,
+    cpu_affinity: list[int] | None,
+    cold_start: bool = False,
+    event_loops: list[str] | None = None,
+    codecs: list[str] | None = None,
+    transports: list[str] | None = None,
+) -> list[Benchmark]:
+    method, args = mode
+    results: list[BenchmarkResult] = []
+    kubesdk = KubesdkBenchmark(**bench_kwargs)
 
-    lightkube = LightkubeAsyncBenchmark(benchmark_size=benchmark_size)
-    results += await lightkube.run()
+    # Clean ns, first
+    await kubesdk.init_client()
+    await kubesdk.empty_namespace()
 
-    official = OfficialClientBenchmark(benchmark_size=benchmark_size)
-    results += await official.run()
+    cold: list[ColdStart] = []
+    if cold_start:
+        # Every client's first GET reads the same object, cleaned up with the rest
+        probe = f"{kubesdk.resource_name_prefix}cold-start"
+        await kubesdk.create_one(probe)
+        cold = await run_cold_start(BENCHMARKS, probe, output_dir=output_dir)
+        await kubesdk.delete_one(probe)
+
+    # 3, 2, 1... bench!
+    _all: list[Benchmark] = []
+    for bench_cls in classes:
+        if method != "run_shards" and not hasattr(bench_cls, method):
+            continue
+        if codecs and not bench_cls.codecs:
+            print(f"{bench_cls.client} decodes with its own codec, running it once")
+        # Clients that can't switch codecs run once, with their own
+        client_codecs = [c for c in codecs if c in bench_cls.codecs] if codecs and bench_cls.codecs else [None]
+        if transports and not bench_cls.transports:
+            print(f"{bench_cls.client} can't be switched to HTTP/2, running it once")
+        client_transports = [t for t in transports if t in bench_cls.transports] \
+            if transports and bench_cls.transports else [None]
+        for loop, codec, transport in itertools.product(event_loops or [None], client_codecs, client_transports):
+            matrix = {"event_loop": loop, "codec": codec, "transport": transport}
+            if method == "run_shards":
+                # Worker processes of their own, the parent only merges their results. The server's connection
+                # counts cover all shards at once, so they aren't read per shard
+                bench = bench_cls(**bench_kwargs, **matrix)
+                shard_kwargs = {**bench_kwargs, **matrix, "fake_apiserver_url": None}
+                for count in args[0]:
+                    print(f"Running {bench.label} client across {count} processes...")
+                    bench.results += await run_sharded(bench_cls, shard_kwargs, count)
+                results += bench.results
+            elif isolate:
+                # Each client gets its own interpreter, the parent only keeps results
+                bench = bench_cls(**bench_kwargs, **matrix)
+                results += await run_isolated(bench, method, *args, cpus=cpu_affinity)
+            else:
+                bench = kubesdk if bench_cls is KubesdkBenchmark else bench_cls(**bench_kwargs, **matrix)
+                try:
+                    results += await getattr(bench, method)(*args)
+                finally:
+                    await bench.close_client()
+            # Nothing from this client may still be there when the next one starts
+            bench.teardown = await kubesdk.empty_namespace()
+            print(f"Namespace empty {bench.teardown.seconds * 1e3:.1f} ms after {bench.label} "
+                  f"(waited for {bench.teardown.waited} objects)")
+            _all.append(bench)
 
-    await kubesdk.cleanup()
-    _all = [kubesdk, k8s_asyncio, kr8s, lightkube, official]
-    print_combined_results(_all)
-    plot_benchmarks_histogram(_all, output_dir)
+    if method == "run_sweep":
+        print_sweep_results(_all)
+        plot_concurrency_sweep(_all, output_dir)
+    elif method == "run_shards":
+        print_shard_results(_all)
+        plot_shard_sweep(_all, output_dir)
+    elif method == "run_thread_sweep":
+        print_thread_sweep_results(_all)
+        plot_thread_sweep(_all, output_dir)
+    elif method == "run_size_sweep":
+        print_size_sweep_results(_all)
+        plot_size_sweep(_all, output_dir)
+    elif method == "run_open_loop":
+        print_open_loop_results(_all)
+        plot_open_loop(_all, output_dir)
+    elif method == "run_faults":
+        print_fault_results(_all)
+        plot_faults(_all, output_dir)
+    else:
+        print_combined_results(_all)
+        plot_benchmarks_histogram(_all, output_dir)
+    print_teardown_results(_all)
+    if cold:
+        print_cold_start_results(cold)
+    return _all
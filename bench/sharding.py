@@ -0,0 +1,86 @@
+"""Sharded load: the objects split across K worker processes, each with its own client and event loop.
+
+One process caps a client at whatever one core (and one GIL) gets through. Here every shard runs POST, GET and
+DELETE over its share of the object names, all shards start each phase together, and the parent adds their
+requests up over the slowest shard's time. The concurrency limit is split between the shards, so the total number
+of requests in flight stays the same as K grows and only the number of cores working on them changes.
+"""
+from __future__ import annotations
+
+import math
+import queue
+import asyncio
+import traceback
+import multiprocessing as mp
+from typing import Any
+
+from .benchmark import Benchmark, BenchmarkResult
+from .histogram import LatencyHistogram
+from .loops import default_loop, run
+
+SHARD_LEVELS = [1, 2, 4]
+
+
+def _worker(bench: Benchmark, barrier, results: mp.Queue):
+    try:
+        run(bench.run_shard(barrier), bench.event_loop or default_loop())
+        results.put(("ok", bench.results))
+    except BaseException as e:
+        # Don't leave the other shards waiting for this one forever
+        barrier.abort()
+        results.put(("error", f"{type(e).__name__}: {e}\n{traceback.format_exc()}"))
+
+
+def _collect(results: mp.Queue, procs: list[mp.Process]) -> list[tuple[str, Any]]:
+    replies = []
+    while len(replies) < len(procs):
+        try:
+            replies.append(results.get(timeout=1.0))
+        except queue.Empty:
+            if any(p.exitcode not in (None, 0) for p in procs):
+                raise RuntimeError(f"shard exited with codes {[p.exitcode for p in procs]} and no results")
+    return replies
+
+
+def merge_shards(shards: list[list[BenchmarkResult]]) -> list[BenchmarkResult]:
+    """One result per phase: requests, CPU time and latency summed over the shards, over the slowest one's time."""
+    merged = []
+    for phase in zip(*shards):
+        latency = LatencyHistogram()
+        for res in phase:
+            if res.latency is not None:
+                latency.merge(res.latency)
+        merged.append(BenchmarkResult(
+            phase[0].bench_name,
+            sum(res.requests for res in phase),
+            max(res.seconds for res in phase),
+            latency,
+            sum(res.concurrency for res in phase),
+            cpu_seconds=sum(res.cpu_seconds or 0.0 for res in phase),
+            object_bytes=phase[0].object_bytes,
+            shards=len(phase),
+        ))
+    return merged
+
+
+async def run_sharded(bench_cls: type[Benchmark], bench_kwargs: dict[str, Any], shards: int) -> list[BenchmarkResult]:
+    """Run POST, GET and DELETE split across `shards` processes and return the merged results."""
+    concurrency = bench_kwargs.get("concurrency", bench_cls.concurrency)
+    kwargs = {**bench_kwargs, "concurrency": math.ceil(concurrency / shards)}
+    ctx = mp.get_context("spawn")
+    barrier, results = ctx.Barrier(shards), ctx.Queue()
+    procs = [ctx.Process(target=_worker, args=(bench_cls(**kwargs, shard=(i, shards)), barrier, results), daemon=True)
+             for i in range(shards)]
+    for p in procs:
+        p.start()
+    try:
+        replies = await asyncio.get_running_loop().run_in_executor(None, _collect, results, procs)
+    finally:
+        for p in procs:
+            p.join(timeout=10)
+            if p.is_alive():
+                p.kill()
+    errors = [payload for status, payload in replies if status != "ok"]
+    if errors:
+        raise RuntimeError(f"{bench_cls.client} shard failed: {errors[0]}")
+    return merge_shards([payload for _, payload in replies])
@@ -0,0 +1,67 @@
+"""Statistics over repeated trials: median with a bootstrap confidence interval, spread and outliers."""
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+
+import numpy as np
+
+CONFIDENCE = 0.95
+BOOTSTRAP_RESAMPLES = 5_000
+# Modified z-score (Iglewicz and Hoaglin) above which a trial counts as an outlier
+OUTLIER_Z = 3.5
+# With few trials the MAD can be tiny, so never call more than this share of them outliers (the most extreme ones)
+MAX_OUTLIER_SHARE = 0.2
+
+
+@dataclass
+class TrialStats:
+    trials: int
+    median: float
+    low: float       # bootstrap confidence interval of the median
+    high: float
+    cv: float        # stdev / mean of all trials, in percent
+    outliers: int    # trials left out of the median and its interval
+
+    @property
+    def half_width(self) -> float:
+        """Half the confidence interval relative to the median, in percent."""
+        return 50 * (self.high - self.low) / self.median if self.median else math.nan
+
+    def overlaps(self, other: TrialStats) -> bool: return self.low <= other.high and other.low <= self.high
+
+
+def outliers(values: list[float], cutoff: float = OUTLIER_Z) -> list[bool]:
+    data = np.asarray(values, dtype=float)
+    median = np.median(data)
+    mad = np.median(np.abs(data - median))
+    if not mad:
+        return [False] * len(data)
+    z = 0.6745 * np.abs(data - median) / mad
+    allowed = set(np.argsort(-z)[:int(MAX_OUTLIER_SHARE * len(data))])
+    return [bool(z[i] > cutoff) and i in allowed for i in range(len(data))]
+
+
+def bootstrap_ci(values: list[float], confidence: float = CONFIDENCE, resamples: int = BOOTSTRAP_RESAMPLES,
+                 seed: int = 0) -> tuple[float, float]:
+    """Percentile bootstrap confidence interval of the median. Seeded, so reports are reproducible."""
+    data = np.asarray(values, dtype=float)
+    if len(data) < 2:
+        return float(data[0]), float(data[0])
+    medians = np.median(np.random.default_rng(seed).choice(data, size=(resamples, len(data))), axis=1)
+    alpha = (1 - confidence) / 2
+    low, high = np.quantile(medians, [alpha, 1 - alpha])
+    return float(low), float(high)
+
+
+def summarize(values: list[float]) -> TrialStats:
+    """Stats of one phase's per-trial values. Outliers don't move the median and its interval when there are enough
+    trials to tell, but still count towards the spread."""
+    values = [v for v in values if v is not None and not math.isnan(v)]
+    if not values:
+        return TrialStats(0, math.nan, math.nan, math.nan, math.nan, 0)
+    kept = [v for v, out in zip(values, outliers(values)) if not out] if len(values) >= 3 else values
+    low, high = bootstrap_ci(kept)
+    data = np.asarray(values, dtype=float)
+    cv = 100 * data.std(ddof=1) / data.mean() if len(data) > 1 and data.mean() else 0.0
+    return TrialStats(len(values), float(np.median(kept)), low, high, float(cv), len(values) - len(kept))
@@ -0,0 +1,138 @@
+"""Sync-to-async stream adapter for blocking clients.
+
+A producer thread iterates the blocking stream and appends items to a shared buffer. The event loop is only woken
+when the consumer is actually waiting, and it then takes everything buffered so far in one go, so a burst of
+events costs one wakeup instead of a scheduled coroutine and a future per item. When the consumer falls
+`max_pending` items behind, the producer blocks until it catches up.
+"""
+from __future__ import annotations
+
+import time
+import asyncio
+import threading
+from dataclasses import dataclass
+from typing import AsyncIterator, Generic, Iterable, TypeVar
+
+T = TypeVar("T")
+
+BRIDGE_MAX_PENDING = 1_000
+
+
+@dataclass
+class BridgeStats:
+    items: int = 0
+    batches: int = 0      # hand-overs to the event loop
+    wakeups: int = 0      # call_soon_threadsafe calls, only made while the consumer waits
+    # Time spent in the bridge itself, waiting excluded, kept per side so each thread only writes its own counter
+    producer_ns: int = 0
+    consumer_ns: int = 0
+    blocked_ns: int = 0   # producer time blocked on backpressure
+
+    @property
+    def handoff_ns(self) -> int: return self.producer_ns + self.consumer_ns
+
+    def add(self, other: BridgeStats):
+        self.items += other.items
+        self.batches += other.batches
+        self.wakeups += other.wakeups
+        self.producer_ns += other.producer_ns
+        self.consumer_ns += other.consumer_ns
+        self.blocked_ns += other.blocked_ns
+
+    @property
+    def summary(self) -> str:
+        per_batch = self.items / self.batches if self.batches else 0.0
+        return f"{self.items} items in {self.batches} batches ({per_batch:.1f}/batch, {self.wakeups} wakeups), " \
+               f"{self.handoff_ns / 1e6:.1f} ms handing over, {self.blocked_ns / 1e6:.1f} ms blocked on backpressure"
+
+
+class SyncStreamBridge(Generic[T]):
+    """Async iterator over a blocking iterable, run in its own daemon thread. Iterate once.
+
+    Closing the async iterator stops the producer at its next item; a producer stuck in a blocking read can't be
+    interrupted from here, so stop the underlying stream too if it has a way to.
+    """
+
+    def __init__(self, iterable: Iterable[T], max_pending: int = BRIDGE_MAX_PENDING, name: str = "sync-bridge"):
+        self.stats = BridgeStats()
+        self._iterable = iterable
+        self._max_pending = max_pending
+        self._name = name
+        self._cond = threading.Condition()
+        self._items: list[T] = []
+        self._done = False
+        self._closed = False
+        self._error: BaseException | None = None
+        self._waiter: asyncio.Future | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def _wake(self):
+        """Call with the lock held. Returns the waiting consumer's future, if any, to resolve outside of it."""
+        waiter, self._waiter = self._waiter, None
+        return waiter
+
+    def _resolve(self, waiter: asyncio.Future | None):
+        if waiter is not None:
+            self.stats.wakeups += 1
+            self._loop.call_soon_threadsafe(_set_done, waiter)
+
+    def _produce(self):
+        try:
+            for item in self._iterable:
+                t0 = time.perf_counter_ns()
+                with self._cond:
+                    if len(self._items) >= self._max_pending and not self._closed:
+                        b0 = time.perf_counter_ns()
+                        while len(self._items) >= self._max_pending and not self._closed:
+                            self._cond.wait()
+                        self.stats.blocked_ns += time.perf_counter_ns() - b0
+                        t0 += time.perf_counter_ns() - b0
+                    if self._closed:
+                        return
+                    self._items.append(item)
+                    waiter = self._wake()
+                self._resolve(waiter)
+                self.stats.producer_ns += time.perf_counter_ns() - t0
+        except BaseException as e:  # handed over to the consumer
+            self._error = e
+        finally:
+            with self._cond:
+                self._done = True
+                waiter = self._wake()
+            self._resolve(waiter)
+
+    async def __aiter__(self) -> AsyncIterator[T]:
+        self._loop = asyncio.get_running_loop()
+        threading.Thread(target=self._produce, name=self._name, daemon=True).start()
+        try:
+            while True:
+                t0 = time.perf_counter_ns()
+                with self._cond:
+                    batch, self._items = self._items, []
+                    done = self._done
+                    if batch:
+                        self._cond.notify()
+                    elif not done:
+                        self._waiter = waiter = self._loop.create_future()
+                self.stats.consumer_ns += time.perf_counter_ns() - t0
+                if batch:
+                    self.stats.batches += 1
+                    self.stats.items += len(batch)
+                    for item in batch:
+                        yield item
+                elif done:
+                    if self._error is not None:
+                        raise self._error
+                    return
+                else:
+                    await waiter
+        finally:
+            with self._cond:
+                self._closed = True
+                self._waiter = None
+                self._cond.notify()
+
+
+def _set_done(waiter: asyncio.Future):
+    if not waiter.done():
+        waiter.set_result(None)
@@ -0,0 +1,118 @@
+"""Round-trip verification: GET and Watch responses checked field by field against the objects the benchmark wrote.
+
+The expected objects are `deployment_manifest`s, the same for every client. Before a phase, each name's expected
+name, labels and spec are flattened into their leaf values in a fixed key order and reduced to one digest. A response
+is walked the same way, through the client's own objects: attributes the way user code reads them (the generated
+kubernetes models map them from JSON names with `attribute_map`), or keys for clients that hand out dicts. Only the
+fields the benchmark set are read, so what the server adds (status, defaults, managed fields) doesn't matter, and a
+field the client dropped or mangled changes the digest.
+
+Converting a response to a dict first (`to_dict`, `sanitize_for_serialization`) would cost more than some clients'
+whole request. The walk reads each checked field once and the digest is the interpreter's tuple hash, so the digests
+are only comparable inside one process, which is where they're computed and checked.
+"""
+from __future__ import annotations
+
+import time
+from functools import cache
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+# Names of mismatched objects kept for the report
+MISMATCH_EXAMPLES = 5
+
+# Shape leaf: the value is compared whole
+_WHOLE = None
+
+
+def checked_fields(manifest: dict[str, Any]) -> dict[str, Any]:
+    """The part of a Deployment manifest the benchmark sets and verifies."""
+    meta = manifest["metadata"]
+    return {"metadata": {"name": meta["name"], "labels": meta["labels"]}, "spec": manifest["spec"]}
+
+
+def shape_of(obj: Any) -> Any:
+    """Keys and list lengths of `obj`, down to its leaves."""
+    if isinstance(obj, dict):
+        return {k: shape_of(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [shape_of(v) for v in obj]
+    return _WHOLE
+
+
+@cache
+def _attr_names(cls: type) -> dict[str, str]:
+    # JSON name -> attribute, where they differ
+    return {json_name: attr for attr, json_name in getattr(cls, "attribute_map", {}).items()}
+
+
+def _freeze(value: Any) -> Any:
+    return tuple(sorted(value.items())) if isinstance(value, dict) else value
+
+
+def leaves(obj: Any, shape: Any, out: list[Any]) -> list[Any]:
+    """Append the values of `obj` at the leaves of `shape` to `out`, with list lengths and presence of every object
+    on the way, so a missing or extra element can't line up by chance."""
+    if shape is _WHOLE:
+        out.append(_freeze(obj))
+    elif isinstance(shape, list):
+        if obj is None or len(obj) != len(shape):
+            out.append(None if obj is None else -len(obj))
+            return out
+        out.append(len(obj))
+        for item, item_shape in zip(obj, shape):
+            leaves(item, item_shape, out)
+    else:
+        out.append(obj is not None)
+        if obj is None:
+            return out
+        if isinstance(obj, dict):
+            for k, v in shape.items():
+                leaves(obj.get(k), v, out)
+        else:
+            names = _attr_names(type(obj))
+            for k, v in shape.items():
+                leaves(getattr(obj, names.get(k, k), None), v, out)
+    return out
+
+
+@dataclass
+class VerifyStats:
+    checked: int = 0
+    mismatched: int = 0
+    ns: int = 0  # walking and hashing responses, inside the phase's time
+    examples: list[str] = field(default_factory=list)
+
+    @property
+    def summary(self) -> str:
+        per_object = self.ns / 1e3 / self.checked if self.checked else 0.0
+        mismatched = f", e.g. {', '.join(self.examples)}" if self.examples else ""
+        return f"{self.checked} responses verified, {self.mismatched} mismatched{mismatched}, " \
+               f"{self.ns / 1e6:.1f} ms checking ({per_object:.1f} us/object)"
+
+
+class Verifier:
+    def __init__(self, names: list[str], expected: Callable[[str], dict[str, Any]]):
+        """`expected(name)` is the manifest object `name` should come back as."""
+        self.digests: dict[str, int] = {}
+        self.shape: Any = None
+        for name in names:
+            fields = checked_fields(expected(name))
+            if self.shape is None:
+                # Every object has the same structure, only the labels' keys differ by name
+                self.shape = shape_of(fields)
+                self.shape["metadata"]["labels"] = _WHOLE
+            self.digests[name] = hash(tuple(leaves(fields, self.shape, [])))
+        self.stats = VerifyStats()
+
+    def check(self, name: str, obj: Any) -> bool:
+        t0 = time.perf_counter_ns()
+        ok = hash(tuple(leaves(obj, self.shape, []))) == self.digests.get(name)
+        stats = self.stats
+        stats.ns += time.perf_counter_ns() - t0
+        stats.checked += 1
+        if not ok:
+            stats.mismatched += 1
+            if len(stats.examples) < MISMATCH_EXAMPLES:
+                stats.examples.append(name)
+        return ok
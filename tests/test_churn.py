@@ -0,0 +1,36 @@
+import asyncio
+
+from bench.churn import WRITTEN_AT, DeliveryTracker, WatchEvent
+
+
+def test_delivery_tracker_counts():
+    tracker = DeliveryTracker()
+    tracker.expect("ADDED", "a")
+    stamp = tracker.expect("MODIFIED", "a")
+    tracker.expect("ADDED", "b")
+    tracker.expect("DELETED", "a")
+
+    tracker.observe(WatchEvent("ADDED", "a", "1", None))
+    tracker.observe(WatchEvent("ADDED", "a", "1", None))  # redelivered
+    tracker.observe(WatchEvent("MODIFIED", "a", "3", {WRITTEN_AT: stamp}))
+    tracker.observe(WatchEvent("MODIFIED", "a", "4", {}))  # someone else's update
+    tracker.observe(WatchEvent("MODIFIED", "a", "3", {WRITTEN_AT: stamp}))
+    # b's ADDED and a's DELETED never arrive
+    asyncio.run(tracker.drain(timeout=0.01))
+
+    stats = tracker.stats()
+    assert (stats.expected, stats.delivered, stats.dropped, stats.duplicated, stats.foreign) == (4, 2, 2, 2, 1)
+    assert tracker.histogram.count == 2
+    assert stats.summary == "2/4 events delivered, 2 dropped, 2 duplicated, 1 foreign"
+
+
+def test_drain_returns_once_delivered():
+    tracker = DeliveryTracker()
+
+    async def run():
+        tracker.expect("ADDED", "a")
+        asyncio.get_running_loop().call_later(0.01, tracker.observe, WatchEvent("ADDED", "a", "1", None))
+        await asyncio.wait_for(tracker.drain(timeout=5), 1)
+
+    asyncio.run(run())
+    assert tracker.stats().dropped == 0
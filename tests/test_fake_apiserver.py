@@ -0,0 +1,163 @@
+import json
+import asyncio
+import contextlib
+from collections import deque
+
+import pytest
+
+from bench.fake_apiserver import (_REASONS, ApiError, DeploymentStore, FakeApiServer, json_patch, merge_patch,
+                                  strategic_merge_patch)
+from bench.faults import FaultProfile
+
+NS = "bench"
+PREFIX = f"/apis/apps/v1/namespaces/{NS}/deployments"
+
+
+def _deployment(name: str, **labels) -> dict:
+    return {"metadata": {"name": name, "labels": labels or {"app": name}},
+            "spec": {"replicas": 1, "template": {"spec": {"containers": [
+                {"name": "app", "image": "nginx:1", "env": [{"name": "A", "value": "1"}, {"name": "B", "value": "2"}]},
+                {"name": "sidecar", "image": "busybox:1"}]}}}}
+
+
+def _server(*names: str, history: int | None = None) -> FakeApiServer:
+    store = DeploymentStore() if history is None else DeploymentStore(history=deque(maxlen=history))
+    for name in names:
+        store.create(NS, _deployment(name))
+    return FakeApiServer(store=store)
+
+
+def _get(server: FakeApiServer, path: str = PREFIX, **query) -> tuple[int, dict]:
+    code, payload, _ = asyncio.run(server.respond("GET", path, {k: str(v) for k, v in query.items()}, b""))
+    return code, json.loads(payload)
+
+
+def test_merge_patch_null_deletes():
+    target = {"a": 1, "b": {"c": 2, "d": 3}, "l": [1, 2]}
+    assert merge_patch(target, {"a": None, "b": {"c": None, "e": 4}, "l": [3]}) == {"b": {"d": 3, "e": 4}, "l": [3]}
+    assert merge_patch(target, {"missing": None}) == target
+    assert target == {"a": 1, "b": {"c": 2, "d": 3}, "l": [1, 2]}
+
+
+def test_strategic_merge_by_name():
+    spec = _deployment("web")["spec"]
+    patched = strategic_merge_patch(spec, {"template": {"spec": {"containers": [
+        {"name": "app", "image": "nginx:2", "env": [{"name": "B", "value": "3"}, {"name": "C", "value": "4"}]},
+        {"name": "new", "image": "redis:7"}]}}})
+    app, sidecar, new = patched["template"]["spec"]["containers"]
+    assert app["image"] == "nginx:2"
+    assert app["env"] == [{"name": "A", "value": "1"}, {"name": "B", "value": "3"}, {"name": "C", "value": "4"}]
+    assert sidecar == {"name": "sidecar", "image": "busybox:1"}
+    assert new == {"name": "new", "image": "redis:7"}
+
+
+def test_json_patch_ops():
+    doc = {"spec": {"replicas": 1, "list": ["a", "b"]}, "metadata": {"labels": {"x/y": "1"}}}
+    patched = json_patch(doc, [
+        {"op": "test", "path": "/spec/replicas", "value": 1},
+        {"op": "replace", "path": "/spec/replicas", "value": 3},
+        {"op": "add", "path": "/spec/paused", "value": True},
+        {"op": "add", "path": "/spec/list/1", "value": "c"},
+        {"op": "add", "path": "/spec/list/-", "value": "d"},
+        {"op": "remove", "path": "/metadata/labels/x~1y"},
+    ])
+    assert patched == {"spec": {"replicas": 3, "list": ["a", "c", "b", "d"], "paused": True}, "metadata": {"labels": {}}}
+    assert doc["spec"]["replicas"] == 1
+
+
+@pytest.mark.parametrize("op", [
+    {"op": "test", "path": "/spec/replicas", "value": 2},
+    {"op": "replace", "path": "/spec/missing", "value": 1},
+    {"op": "remove", "path": "/spec/missing"},
+    {"op": "move", "path": "/spec/replicas", "from": "/spec/x"},
+])
+def test_json_patch_failure_is_422(op):
+    with pytest.raises(ApiError) as e:
+        json_patch({"spec": {"replicas": 1}}, [op])
+    assert e.value.code == 422
+
+    server = _server("web")
+    code, payload, _ = asyncio.run(server.respond("PATCH", f"{PREFIX}/web", {}, json.dumps([op]).encode(),
+                                                  "application/json-patch+json"))
+    assert code == 422 and json.loads(payload)["reason"] == "Invalid"
+    assert server.store.get(NS, "web").obj["spec"]["replicas"] == 1
+
+
+def test_list_pages():
+    names = [f"d{i:02d}" for i in range(7)]
+    server = _server(*names)
+    seen, cont = [], None
+    while True:
+        code, page = _get(server, limit=3, **({"continue": cont} if cont else {}))
+        assert code == 200
+        seen += [i["metadata"]["name"] for i in page["items"]]
+        if not (cont := page["metadata"].get("continue")):
+            break
+    assert seen == names
+
+
+def test_expired_continue_is_410():
+    server = _server("a", "b", "c", history=3)
+    _, page = _get(server, limit=1)
+    for name in ("d", "e", "f", "g"):
+        server.store.create(NS, _deployment(name))
+    code, status = _get(server, limit=1, **{"continue": page["metadata"]["continue"]})
+    assert (code, status["reason"]) == (410, "Expired")
+    assert _get(server, limit=1, **{"continue": "garbage"})[0] == 400
+
+
+@pytest.mark.parametrize("selector, expected", [
+    ("app=a", ["a"]),
+    ("app==a", ["a"]),
+    ("app!=a", ["b", "c"]),
+    ("tier", ["c"]),
+    ("!tier", ["a", "b"]),
+    ("app!=a,tier=db", ["c"]),
+])
+def test_label_selector(selector, expected):
+    server = _server("a", "b")
+    server.store.create(NS, _deployment("c", app="c", tier="db"))
+    code, body = _get(server, labelSelector=selector)
+    assert code == 200
+    assert [i["metadata"]["name"] for i in body["items"]] == expected
+
+
+def test_unsupported_selector_is_400():
+    code, status = _get(_server("a"), labelSelector="app in (a,b)")
+    assert (code, status["reason"]) == (400, "BadRequest")
+
+
+def test_watch_replays_from_resource_version():
+    server = _server("a")
+    rv = server.store.resource_version
+    server.store.patch(NS, "a", {"spec": {"replicas": 2}})
+    server.store.create(NS, _deployment("b"))
+    server.store.create("other", _deployment("c"))
+    server.store.delete(NS, "a")
+
+    async def replay(**query):
+        query = {"watch": "1", "timeoutSeconds": "0.01", **query}
+        async with contextlib.aclosing(server.watch_batches(PREFIX, query)) as batches:
+            return [json.loads(e) for e in await anext(batches)]
+
+    events = asyncio.run(replay(resourceVersion=str(rv)))
+    assert [(e["type"], e["object"]["metadata"]["name"]) for e in events] == [
+        ("MODIFIED", "a"), ("ADDED", "b"), ("DELETED", "a")]
+    assert [int(e["object"]["metadata"]["resourceVersion"]) for e in events] == [rv + 1, rv + 2, rv + 4]
+    # Without a resourceVersion: the current objects as ADDED
+    events = asyncio.run(replay())
+    assert [(e["type"], e["object"]["metadata"]["name"]) for e in events] == [("ADDED", "b")]
+
+
+@pytest.mark.parametrize("profile, code, reason", [
+    (FaultProfile(throttle=1.0, retry_after=2), 429, "Too Many Requests"),
+    (FaultProfile(server_error=1.0), 500, "Internal Server Error"),
+])
+def test_injected_faults_have_status_lines(profile, code, reason):
+    server = _server("a")
+    server.faults = profile
+    status, payload, headers = asyncio.run(server.respond("GET", f"{PREFIX}/a", {}, b""))
+    assert (status, json.loads(payload)["code"]) == (code, code)
+    assert _REASONS[status] == reason
+    if code == 429:
+        assert dict(headers)["retry-after"] == "2"
@@ -0,0 +1,52 @@
+import math
+import random
+
+import pytest
+
+from bench.histogram import RELATIVE_ERROR, LatencyHistogram
+
+
+def _exact(values_us: list[int], p: float) -> float:
+    """Same rank as LatencyHistogram.percentile, in seconds."""
+    ordered = sorted(values_us)
+    return ordered[max(1, int(p / 100 * len(ordered) + 0.5)) - 1] / 1e6
+
+
+def _histogram(values_us: list[int]) -> LatencyHistogram:
+    h = LatencyHistogram()
+    for us in values_us:
+        h.record_ns(us * 1000)
+    return h
+
+
+@pytest.mark.parametrize("distribution", [
+    lambda r: r.randint(1, 100),  # exact buckets
+    lambda r: r.uniform(100, 1_000_000),
+    lambda r: r.expovariate(1 / 2000),
+    lambda r: r.lognormvariate(math.log(5000), 1.5),
+])
+def test_percentiles_within_relative_error(distribution):
+    rng = random.Random(42)
+    values = [max(0, int(distribution(rng))) for _ in range(20_000)]
+    h = _histogram(values)
+    for p in (1, 10, 50, 90, 95, 99, 99.9):
+        exact = _exact(values, p)
+        assert abs(h.percentile(p) - exact) <= exact * RELATIVE_ERROR + 1e-6, p
+    assert h.percentile(100) == h.max == max(values) / 1e6
+    assert h.count == len(values)
+    assert h.mean == pytest.approx(sum(values) / len(values) / 1e6)
+
+
+def test_merge_equals_union():
+    rng = random.Random(7)
+    a = [int(rng.expovariate(1 / 500)) for _ in range(5000)]
+    b = [int(rng.lognormvariate(math.log(20_000), 1)) for _ in range(3000)]
+    merged = _histogram(a).merge(_histogram(b))
+    union = _histogram(a + b)
+    assert merged.counts == union.counts
+    assert (merged.count, merged.min_us, merged.max_us, merged.total_us) == \
+           (union.count, union.min_us, union.max_us, union.total_us)
+    assert merged.summary_ms() == union.summary_ms()
+    # Merging into or from an empty histogram changes nothing
+    assert LatencyHistogram().merge(union).summary_ms() == union.summary_ms()
+    assert union.merge(LatencyHistogram()).count == len(a) + len(b)
@@ -0,0 +1,51 @@
+import pandas as pd
+
+from bench._null import NullBenchmark
+from bench.benchmark import BenchmarkResult
+from bench.histogram import LatencyHistogram
+from bench.history import compare_runs, load_run, save_run
+
+
+def _latency(ms: float) -> LatencyHistogram:
+    h = LatencyHistogram()
+    for _ in range(100):
+        h.record(ms / 1e3)
+    return h
+
+
+def _run(tmp_path, run_id: str, phases: dict[str, tuple[float, float] | None]) -> pd.DataFrame:
+    """Saves a run with `phase -> (seconds for 1000 requests, p99 ms)`, None for unsupported, and loads it back."""
+    bench = NullBenchmark(benchmark_size=1000)
+    for phase, timing in phases.items():
+        if timing is None:
+            bench.results.append(BenchmarkResult(phase, 0, 0.0, unsupported=True))
+        else:
+            bench.results.append(BenchmarkResult(phase, 1000, timing[0], _latency(timing[1])))
+    meta = {"run_id": run_id, "mode": "test", "event_loop": "asyncio", "python": "CPython 3.11", "cpu": "cpu",
+            "cpu_count": 1, "platform": "linux", "fake_apiserver": True, "isolate": False}
+    return load_run(save_run([bench], tmp_path, meta))
+
+
+def test_round_trip(tmp_path):
+    df = _run(tmp_path, "old", {"CREATE": (2.0, 10.0), "PUT": None})
+    assert list(df["phase"]) == ["CREATE", "PUT"]
+    assert list(df["unsupported"]) == [False, True]
+    create = df.iloc[0]
+    assert (create["client"], create["requests"], create["throughput"]) == ("null (harness)", 1000, 500.0)
+    assert abs(create["p99_ms"] - 10.0) <= 10.0 / 64
+    assert create["loop"] == "asyncio"
+
+
+def test_compare_reports_phase_deltas(tmp_path):
+    old = _run(tmp_path, "old", {"CREATE": (1.0, 10.0), "GET": (1.0, 10.0), "LIST": (1.0, 10.0),
+                                 "DELETE": (1.0, 10.0), "PUT": None})
+    new = _run(tmp_path, "new", {"CREATE": (2.0, 10.0), "GET": (1.05, 10.5), "LIST": (1.0, 30.0),
+                                 "WATCH": (1.0, 10.0), "PUT": None})
+    df = compare_runs(old, new).set_index("Phase")
+    # Only phases both runs have and supported
+    assert list(df.index) == ["CREATE", "GET", "LIST"]
+    assert df.at["CREATE", "Δ throughput %"] == -50.0
+    assert df.at["CREATE", "Flag"] == "REGRESSION (slower)"
+    assert df.at["GET", "Flag"] == ""  # within the threshold
+    assert df.at["LIST", "Δ p99 %"] > 100
+    assert df.at["LIST", "Flag"] == "REGRESSION (p99 up)"
@@ -0,0 +1,21 @@
+import pytest
+
+from bench.open_loop import arrival_offsets
+
+
+@pytest.mark.parametrize("rate, duration, ramp", [(50, 10.0, 0.0), (100, 10.0, 2.0), (800, 1.5, 0.5), (7, 3.0, 1.0)])
+def test_arrival_offsets(rate, duration, ramp):
+    offsets = arrival_offsets(rate, duration, ramp)
+    assert offsets[0] == 0.0
+    assert all(a < b for a, b in zip(offsets, offsets[1:]))
+    # The schedule covers the ramp and the steady part, and ends within one interval of it
+    assert ramp + duration - 1 / rate <= offsets[-1] < ramp + duration
+    assert len(offsets) == int(rate * ramp / 2) + int(rate * duration)
+
+    steady = [t for t in offsets if t >= ramp]
+    assert steady[0] == ramp
+    assert all(b - a == pytest.approx(1 / rate) for a, b in zip(steady, steady[1:]))
+    # Ramping up: the gaps only shrink, and never below the steady interval
+    ramped = [t for t in offsets if t < ramp]
+    gaps = [b - a for a, b in zip(ramped, ramped[1:])]
+    assert all(a >= b >= 1 / rate for a, b in zip(gaps, gaps[1:]))
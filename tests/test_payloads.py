@@ -0,0 +1,76 @@
+import json
+
+import pytest
+
+from bench.payloads import SIZE_SWEEP, PayloadShape, deployment_manifest, large_pod_template, manifest_bytes
+
+
+def _baseline_pod_template(name: str) -> dict:
+    """The hand-written template every client had before PayloadShape."""
+    common_env = [{"name": f"ENV_{i}", "value": f"value_{i}"} for i in range(50)]
+
+    c1 = {
+        "name": "c1",
+        "image": "busybox:stable",
+        "command": ["/bin/sh", "-c"],
+        "args": ["sleep 3600"],
+        "env": common_env + [{"name": "C1_ONLY", "value": "x"}],
+        "volumeMounts": [{"name": "work", "mountPath": "/work"}],
+        "resources": {
+            "limits": {"cpu": "100m", "memory": "128Mi"},
+            "requests": {"cpu": "50m", "memory": "64Mi"},
+        },
+        "livenessProbe": {
+            "exec": {"command": ["/bin/true"]},
+            "initialDelaySeconds": 5,
+            "periodSeconds": 30,
+        },
+    }
+    c2 = {
+        "name": "c2",
+        "image": "busybox:stable",
+        "command": ["/bin/sh", "-c"],
+        "args": ["sleep 3600"],
+        "env": common_env + [{"name": "C2_ONLY", "value": "y"}],
+        "volumeMounts": [{"name": "work", "mountPath": "/data"}],
+        "resources": {
+            "limits": {"cpu": "100m", "memory": "128Mi"},
+            "requests": {"cpu": "50m", "memory": "64Mi"},
+        },
+    }
+    c3 = {
+        "name": "c3",
+        "image": "busybox:stable",
+        "command": ["/bin/sh", "-c"],
+        "args": ["sleep 3600"],
+        "env": [{"name": "IMPORTANT", "value": "bench_value"}] + common_env,
+        "volumeMounts": [{"name": "work", "mountPath": "/cache"}],
+    }
+
+    return {
+        "metadata": {"labels": {"app": name}},
+        "spec": {
+            "containers": [c1, c2, c3],
+            "volumes": [{"name": "work", "emptyDir": {}}],
+        },
+    }
+
+
+def test_default_shape_is_baseline_template():
+    assert json.dumps(large_pod_template("client-bench-000001")) == \
+           json.dumps(_baseline_pod_template("client-bench-000001"))
+
+
+@pytest.mark.parametrize("target", SIZE_SWEEP + [1_500, 3_000, 5_000, 100_000])
+def test_for_size_hits_target(target):
+    shape = PayloadShape.for_size(target)
+    assert manifest_bytes(shape) == target
+    name = "client-bench-000000"
+    manifest = deployment_manifest(name, "default", {f"app/{name}": f"default-{name}"}, shape)
+    assert len(json.dumps(manifest)) == target
+
+
+def test_for_size_below_smallest_object():
+    smallest = PayloadShape(containers=1, env_per_container=0)
+    assert PayloadShape.for_size(100) == smallest
+    assert manifest_bytes(smallest) > 100
@@ -0,0 +1,46 @@
+import math
+
+import pytest
+
+from bench.stats import bootstrap_ci, outliers, summarize
+
+
+def test_bootstrap_ci_is_seeded():
+    values = [100.0, 102.0, 98.0, 101.0, 99.0, 103.0, 97.0]
+    low, high = bootstrap_ci(values, seed=1)
+    assert (low, high) == bootstrap_ci(values, seed=1)
+    assert min(values) <= low <= 100.0 <= high <= max(values)
+    # A narrower confidence level gives a narrower interval
+    low90, high90 = bootstrap_ci(values, confidence=0.5, seed=1)
+    assert low <= low90 <= high90 <= high
+    assert bootstrap_ci([5.0]) == (5.0, 5.0)
+
+
+def test_outliers_by_mad():
+    values = [100.0, 101.0, 99.0, 100.5, 99.5, 100.0, 101.5, 98.5, 100.0, 500.0]
+    assert outliers(values) == [False] * 9 + [True]
+    # No spread, nothing to call an outlier
+    assert outliers([1.0, 1.0, 1.0, 2.0]) == [False] * 4
+    # At most MAX_OUTLIER_SHARE of the trials, the most extreme first
+    assert sum(outliers([100.0, 100.0, 100.5, 99.5, 100.0, 300.0, 400.0, 500.0, 100.0, 100.0])) == 2
+
+
+def test_summarize():
+    values = [100.0, 101.0, 99.0, 100.5, 99.5, 100.0, 101.5, 98.5, 100.0, 500.0]
+    stats = summarize(values)
+    assert (stats.trials, stats.outliers) == (10, 1)
+    assert stats.median == 100.0
+    assert stats.low <= stats.median <= stats.high < 500.0
+    assert stats.half_width == pytest.approx(50 * (stats.high - stats.low) / 100.0)
+    # The outlier is left out of the median, not the spread
+    assert stats.cv > 10
+
+    single = summarize([42.0, math.nan, None])
+    assert (single.trials, single.median, single.low, single.high, single.cv) == (1, 42.0, 42.0, 42.0, 0.0)
+    assert summarize([]).trials == 0 and math.isnan(summarize([]).median)
+
+
+def test_overlaps():
+    a, b, c = summarize([10.0, 11.0, 12.0]), summarize([11.5, 12.5, 13.0]), summarize([20.0, 21.0, 22.0])
+    assert a.overlaps(b) and b.overlaps(a)
+    assert not a.overlaps(c)
@@ -0,0 +1,62 @@
+import time
+import asyncio
+import threading
+
+import pytest
+
+from bench.sync_bridge import SyncStreamBridge
+
+
+def _threads() -> int: return sum(t.name == "test-bridge" for t in threading.enumerate())
+
+
+def _wait_for_threads():
+    deadline = time.monotonic() + 5
+    while _threads() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_drains_then_raises_producer_error():
+    def produce():
+        for i in range(50):
+            if i % 10 == 0:
+                time.sleep(0.001)
+            yield i
+        raise ValueError("stream broke")
+
+    bridge = SyncStreamBridge(produce(), max_pending=8, name="test-bridge")
+    seen = []
+
+    async def consume():
+        async for item in bridge:
+            seen.append(item)
+
+    with pytest.raises(ValueError, match="stream broke"):
+        asyncio.run(consume())
+    assert seen == list(range(50))
+    assert bridge.stats.items == 50
+    assert bridge._closed and bridge._done
+    _wait_for_threads()
+    assert not _threads()
+
+
+def test_closing_stops_a_blocked_producer():
+    produced = []
+
+    def produce():
+        for i in range(10_000):
+            produced.append(i)
+            yield i
+
+    bridge = SyncStreamBridge(produce(), max_pending=4, name="test-bridge")
+
+    async def consume():
+        async for item in bridge:
+            if item == 2:
+                return
+
+    asyncio.run(consume())
+    _wait_for_threads()
+    assert not _threads()
+    # Backpressure kept the producer a few items ahead, and closing stopped it
+    assert len(produced) < 20
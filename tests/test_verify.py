@@ -0,0 +1,58 @@
+import copy
+from types import SimpleNamespace
+
+from bench.payloads import apiserver_response, deployment_manifest
+from bench.verify import Verifier
+
+NAMES = ["client-bench-000000", "client-bench-000001"]
+
+
+def _manifest(name: str) -> dict:
+    return deployment_manifest(name, "default", {f"app/{name}": f"default-{name}", "bench/suite": "test"})
+
+
+def _reordered(obj):
+    if isinstance(obj, dict):
+        return {k: _reordered(obj[k]) for k in reversed(list(obj))}
+    if isinstance(obj, list):
+        return [_reordered(v) for v in obj]
+    return obj
+
+
+def _as_objects(obj):
+    """Attribute access, like a client's models, with labels left a dict."""
+    if isinstance(obj, dict):
+        return SimpleNamespace(**{k: v if k == "labels" else _as_objects(v) for k, v in obj.items()})
+    if isinstance(obj, list):
+        return [_as_objects(v) for v in obj]
+    return obj
+
+
+def test_digest_ignores_key_order_and_server_fields():
+    verifier = Verifier(NAMES, _manifest)
+    name = NAMES[0]
+    response = apiserver_response(_manifest(name))
+    assert verifier.check(name, response)
+    assert verifier.check(name, _reordered(response))
+    assert verifier.check(name, _as_objects(_manifest(name)))
+    # Another object's response doesn't pass for this one
+    assert not verifier.check(name, _manifest(NAMES[1]))
+    assert (verifier.stats.checked, verifier.stats.mismatched, verifier.stats.examples) == (4, 1, [name])
+
+
+def test_mutated_field_changes_digest():
+    verifier = Verifier(NAMES, _manifest)
+    name = NAMES[1]
+    mutations = [
+        lambda m: m["spec"]["template"]["spec"]["containers"][0]["env"][3].update(value="changed"),
+        lambda m: m["spec"]["template"]["spec"]["containers"][2].pop("volumeMounts"),
+        lambda m: m["spec"]["template"]["spec"]["containers"][1]["env"].pop(),
+        lambda m: m["spec"].update(replicas=1),
+        lambda m: m["metadata"]["labels"].update(extra="label"),
+        lambda m: m["spec"]["template"]["spec"]["containers"].reverse(),
+    ]
+    for mutate in mutations:
+        manifest = copy.deepcopy(_manifest(name))
+        mutate(manifest)
+        assert not verifier.check(name, manifest)
+    assert verifier.stats.mismatched == len(mutations)